@@ -1,248 +1,292 @@
 #!/usr/bin/env python3
+"""
+Bulk import menu items from CSV, JSONL or xlsx into a menu JSON file.
+
+Rows are streamed from the input, deduplicated by normalized name against
+the existing menu (and against earlier rows) through a hash index, and all
+inserts are applied in one transaction: if any row is invalid nothing is
+written. The menu is saved as its next version in the menu store
+(menu_store.py), so an import can be rolled back, and replaced atomically
+via a temp file and rename.
+
+Recognised columns (header case and punctuation are ignored, so the sheets
+in Amante_Complete_Menu.xlsx work as-is):
+    Category, Item Name, Description, Price (₹), Bottle Price (₹), Dietary,
+    Spice Level, Chef Special, Recommended, Available, Item ID, Tags
+
+Usage:
+    python3 scripts/add-menu-items.py new-items.csv
+    python3 scripts/add-menu-items.py seasonal.jsonl --menu src/data/menus/bar.json
+    python3 scripts/add-menu-items.py Amante_Complete_Menu.xlsx --sheet "Food Menu" --dry-run
+    python3 scripts/menu_store.py rollback food     # undo the last import
+"""
+
+import argparse
+import csv
 import json
+import math
 import os
+import re
+import sys
+import time
+
+from menu_ids import MenuIdIndex
+from menu_io import atomic_write, dump_menu, read_menu
+from menu_rules import normalize_name
+from menu_store import save
 
 # Paths
 script_dir = os.path.dirname(os.path.abspath(__file__))
 project_dir = os.path.dirname(script_dir)
 menu_path = os.path.join(project_dir, "src/data/menus/food.json")
 
-# Read current menu
-with open(menu_path, 'r') as f:
-    menu = json.load(f)
-
-# Find the last item ID number for each category
-def get_next_id(category_id):
-    max_id = 0
-    for cat in menu['categories']:
-        if cat['id'] == category_id:
-            for item in cat['items']:
-                # Extract number from ID like "food-app-001"
-                parts = item['id'].split('-')
-                if len(parts) >= 3:
-                    try:
-                        num = int(parts[2])
-                        max_id = max(max_id, num)
-                    except:
-                        pass
-    return max_id + 1
-
-# New items to add
-new_starters = [
-    {
-        "name": "Crispy Chilli Baby Corn",
-        "description": "Crispy baby corn tossed in spicy chili sauce",
-        "price": 499,
-        "dietary": ["veg"]
-    },
-    {
-        "name": "Paneer Peshawari Tikka",
-        "description": "Marinated stuffed cottage cheese with Indian spices",
-        "price": 599,
-        "dietary": ["veg"]
-    },
-    {
-        "name": "Hunan Chilli Tofu",
-        "description": "Sliced silken tofu, celery and burnt chili",
-        "price": 699,
-        "dietary": ["veg"]
-    },
-    {
-        "name": "Hunan Chilli Cottage Cheese",
-        "description": "Sliced cottage cheese, celery and burnt chili",
-        "price": 599,
-        "dietary": ["veg"]
-    },
-    {
-        "name": "Soya Chaap Achari",
-        "description": "Yogurt, creamy, garlic, Indian spice with tangy pickle flavor",
-        "price": 599,
-        "dietary": ["veg"]
-    },
-    {
-        "name": "Soya Chaap Malai",
-        "description": "Creamy yogurt and garlic marinated soya chaap with hari chutney",
-        "price": 599,
-        "dietary": ["veg"]
-    },
-    {
-        "name": "Bhutte De Kebab",
-        "description": "Crispy fried corn patties served with dip",
-        "price": 499,
-        "dietary": ["veg"]
-    },
-    {
-        "name": "Lukhnawi Mutton Galouti Kebab",
-        "description": "Mutton mince with Indian spices, smoky flavored, served with warqi paratha",
-        "price": 999,
-        "dietary": ["non-veg"]
-    },
-    {
-        "name": "Mushroom Cream Cheese Dimsum",
-        "description": "Delicate dumplings filled with mushroom and cream cheese",
-        "price": 699,
-        "dietary": ["veg"]
-    }
-]
-
-new_mains = [
-    {
-        "name": "Vilayti Subzi",
-        "description": "Minced cauliflower with exotic vegetables, green chili and coriander",
-        "price": 499,
-        "dietary": ["veg"]
-    },
-    {
-        "name": "Aloo Gobhi Adrak",
-        "description": "Mixed seasonal local vegetables with spinach and Indian spices",
-        "price": 699,
-        "dietary": ["veg"]
-    },
-    {
-        "name": "Paneer Lababdar",
-        "description": "Rich cottage cheese curry in creamy tomato gravy",
-        "price": 699,
-        "dietary": ["veg"]
-    },
-    {
-        "name": "Shahi Paneer",
-        "description": "Cottage cheese in rich, creamy cashew and tomato gravy",
-        "price": 699,
-        "dietary": ["veg"]
-    },
-    {
-        "name": "Paneer Butter Masala",
-        "description": "Cottage cheese in smooth butter tomato sauce",
-        "price": 699,
-        "dietary": ["veg"]
-    },
-    {
-        "name": "Paneer Tikka Masala",
-        "description": "Grilled cottage cheese in spiced tomato curry",
-        "price": 699,
-        "dietary": ["veg"]
-    },
-    {
-        "name": "Lehsuni Palak Paneer",
-        "description": "Cottage cheese in garlic-flavored spinach gravy",
-        "price": 699,
-        "dietary": ["veg"]
-    },
-    {
-        "name": "Chef Special Laal Maas",
-        "description": "Authentic Rajasthani mutton with Indian spices",
-        "price": 1099,
-        "dietary": ["non-veg"],
-        "isChefSpecial": True
-    },
-    {
-        "name": "Home Style Curry Chicken",
-        "description": "Boneless chicken tempered with chilies, coriander seeds and cooked with fresh tomato",
-        "price": 699,
-        "dietary": ["non-veg"]
-    },
-    {
-        "name": "Home Style Curry Egg",
-        "description": "Eggs tempered with chilies, coriander seeds and cooked with fresh tomato",
-        "price": 499,
-        "dietary": ["non-veg"]
-    },
-    {
-        "name": "Wild Mushroom Risotto",
-        "description": "Creamy arborio rice with mushrooms, parmesan and cream",
-        "price": 799,
-        "dietary": ["veg"]
-    },
-    {
-        "name": "Grilled Chicken with Baby Potato",
-        "description": "Tender grilled chicken served with roasted baby potatoes",
-        "price": 799,
-        "dietary": ["non-veg"]
+# Normalized column header -> item field
+COLUMN_FIELDS = {
+    "category": "category",
+    "categoryid": "category",
+    "itemname": "name",
+    "name": "name",
+    "description": "description",
+    "price": "price",
+    "bottleprice": "bottlePrice",
+    "price60ml": "price60ml",
+    "dietary": "dietary",
+    "spicelevel": "spiceLevel",
+    "chefspecial": "isChefSpecial",
+    "ischefspecial": "isChefSpecial",
+    "recommended": "isRecommended",
+    "isrecommended": "isRecommended",
+    "available": "isAvailable",
+    "isavailable": "isAvailable",
+    "itemid": "id",
+    "id": "id",
+    "tags": "tags",
+}
+
+PRICE_FIELDS = ("price", "bottlePrice", "price60ml")
+TRUE_VALUES = {"yes", "y", "true", "1", "x"}
+# A price cell: currency prefix or "/-" suffix around a plain non-negative number
+NUMBER_PATTERN = re.compile(r"\d+(?:\.\d+)?")
+PRICE_MARKS = re.compile(r"^(?:₹|rs\.?|inr)\s*|\s*/-$", re.IGNORECASE)
+
+def normalize_header(header):
+    return re.sub(r"[^a-z0-9]", "", str(header or "").lower().replace("₹", ""))
+
+def rows_from_records(headers, records):
+    """Map positional records onto item fields using the header row"""
+    fields = [COLUMN_FIELDS.get(normalize_header(header)) for header in headers]
+    for record in records:
+        yield {field: value for field, value in zip(fields, record) if field}
+
+def read_csv(path, sheet=None):
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f)
+        headers = next(reader, [])
+        yield from rows_from_records(headers, reader)
+
+def read_jsonl(path, sheet=None):
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                yield {COLUMN_FIELDS.get(normalize_header(key), key): value for key, value in record.items()}
+
+def read_xlsx(path, sheet=None):
+    try:
+        import openpyxl
+    except ImportError:
+        sys.exit("❌ Reading .xlsx needs openpyxl: pip install openpyxl")
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet] if sheet else workbook.worksheets[0]
+        records = worksheet.iter_rows(values_only=True)
+        headers = next(records, [])
+        yield from rows_from_records(headers, records)
+    finally:
+        workbook.close()
+
+READERS = {".csv": read_csv, ".jsonl": read_jsonl, ".ndjson": read_jsonl, ".xlsx": read_xlsx}
+
+def is_blank(value):
+    return value is None or (isinstance(value, str) and not value.strip())
+
+def parse_number(value):
+    """Parse 599, "599", "₹ 1,299", "Rs. 450/-" or "12.5"; raises ValueError for anything else"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        number = value
+        if not math.isfinite(number):
+            raise ValueError(f"not a number: {value!r}")
+    else:
+        text = PRICE_MARKS.sub("", str(value).strip()).replace(",", "").replace(" ", "")
+        if text.startswith("-") and NUMBER_PATTERN.fullmatch(text[1:]):
+            raise ValueError(f"negative: {value!r}")
+        if not NUMBER_PATTERN.fullmatch(text):
+            raise ValueError(f"not a number: {value!r}")
+        number = float(text)
+    if number < 0:
+        raise ValueError(f"negative: {value!r}")
+    return int(number) if float(number).is_integer() else number
+
+def parse_list(value):
+    if isinstance(value, list):
+        return [str(entry).strip() for entry in value if str(entry).strip()]
+    return [entry.strip() for entry in re.split(r"[,;|]", str(value)) if entry.strip()]
+
+def parse_flag(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in TRUE_VALUES
+
+class CategoryIndex:
+    """Resolve a category by id or display name in O(1)"""
+
+    def __init__(self, menu):
+        self.categories = {}
+        for category in menu['categories']:
+            self.categories[category['id']] = category
+            self.categories.setdefault(normalize_name(category.get('name', '')), category)
+
+    def get(self, value):
+        value = str(value).strip()
+        return self.categories.get(value) or self.categories.get(normalize_name(value))
+
+def build_item(row, category):
+    """Turn one input row into a menu item; raises ValueError on bad data"""
+    if is_blank(row.get('name')):
+        raise ValueError("missing item name")
+
+    item = {
+        "name": str(row['name']).strip(),
+        "description": "" if is_blank(row.get('description')) else str(row['description']).strip(),
     }
-]
-
-new_breads = [
-    {
-        "name": "Naan",
-        "description": "Classic Indian flatbread baked in tandoor",
-        "price": 79,
-        "dietary": ["veg"]
-    },
-    {
-        "name": "Garlic Naan",
-        "description": "Naan topped with fresh garlic and butter",
-        "price": 79,
-        "dietary": ["veg"]
-    },
-    {
-        "name": "Butter Naan",
-        "description": "Soft naan brushed with butter",
-        "price": 79,
-        "dietary": ["veg"]
-    },
-    {
-        "name": "Missi Roti",
-        "description": "Traditional Indian flatbread made with gram flour and spices",
-        "price": 79,
-        "dietary": ["veg"]
+    for field in PRICE_FIELDS:
+        if not is_blank(row.get(field)):
+            try:
+                item[field] = parse_number(row[field])
+            except ValueError as e:
+                raise ValueError(f"bad {field}, {e}") from None
+    if "price" not in item and "bottlePrice" not in item:
+        raise ValueError("missing price")
+
+    item["category"] = category['id']
+    if not is_blank(row.get('dietary')):
+        item["dietary"] = parse_list(row['dietary'])
+    if not is_blank(row.get('spiceLevel')):
+        try:
+            # The exported sheets show spice level as a row of chilli emoji
+            chillies = str(row['spiceLevel']).count("🌶")
+            item["spiceLevel"] = chillies or int(parse_number(row['spiceLevel']))
+        except ValueError as e:
+            raise ValueError(f"bad spiceLevel, {e}") from None
+    item["isAvailable"] = True if is_blank(row.get('isAvailable')) else parse_flag(row['isAvailable'])
+    for field in ("isChefSpecial", "isRecommended"):
+        if not is_blank(row.get(field)) and parse_flag(row[field]):
+            item[field] = True
+    if not is_blank(row.get('tags')):
+        tags = parse_list(row['tags'])
+        if any(tag.lower() == "recommended" for tag in tags):
+            item["isRecommended"] = True
+    return item
+
+def plan_import(menu, rows):
+    """
+    Validate and dedupe every row against the menu without modifying it.
+    Returns (inserts, skipped, errors) where inserts is a list of
+    (category, item) pairs ready to apply.
+    """
+    categories = CategoryIndex(menu)
+    id_index = MenuIdIndex(menu)
+    # Hash index of every normalized name already on the menu
+    names = {
+        normalize_name(item['name']): item['id']
+        for category in menu['categories']
+        for item in category['items']
     }
-]
-
-# Add items to appropriate categories
-for cat in menu['categories']:
-    if cat['id'] == 'appetizers':
-        start_id = get_next_id('appetizers')
-        for i, item in enumerate(new_starters):
-            new_item = {
-                "id": f"food-app-{str(start_id + i).zfill(3)}",
-                "name": item["name"],
-                "description": item["description"],
-                "price": item["price"],
-                "category": "appetizers",
-                "dietary": item["dietary"],
-                "isAvailable": True
-            }
-            if "isChefSpecial" in item:
-                new_item["isChefSpecial"] = item["isChefSpecial"]
-            cat['items'].append(new_item)
-        print(f"✅ Added {len(new_starters)} starters")
-
-    elif cat['id'] == 'mains':
-        start_id = get_next_id('mains')
-        for i, item in enumerate(new_mains):
-            new_item = {
-                "id": f"food-main-{str(start_id + i).zfill(3)}",
-                "name": item["name"],
-                "description": item["description"],
-                "price": item["price"],
-                "category": "mains",
-                "dietary": item["dietary"],
-                "isAvailable": True
-            }
-            if "isChefSpecial" in item:
-                new_item["isChefSpecial"] = item["isChefSpecial"]
-            cat['items'].append(new_item)
-        print(f"✅ Added {len(new_mains)} main courses")
-
-    elif cat['id'] == 'breads':
-        start_id = get_next_id('breads')
-        for i, item in enumerate(new_breads):
-            new_item = {
-                "id": f"food-bread-{str(start_id + i).zfill(3)}",
-                "name": item["name"],
-                "description": item["description"],
-                "price": item["price"],
-                "category": "breads",
-                "dietary": item["dietary"],
-                "isAvailable": True
-            }
-            cat['items'].append(new_item)
-        print(f"✅ Added {len(new_breads)} breads")
-
-# Write updated menu
-with open(menu_path, 'w') as f:
-    json.dump(menu, f, indent=2, ensure_ascii=False)
-
-print(f"\n✅ Menu updated successfully!")
-print(f"📄 Location: {menu_path}")
-print(f"📊 Total new items: {len(new_starters) + len(new_mains) + len(new_breads)}")
+
+    inserts, skipped, errors = [], [], []
+    for line, row in enumerate(rows, start=1):
+        if all(is_blank(value) for value in row.values()):
+            continue
+        category = categories.get(row.get('category', ''))
+        if category is None:
+            errors.append(f"row {line}: unknown category {row.get('category')!r}")
+            continue
+        try:
+            item = build_item(row, category)
+        except ValueError as e:
+            errors.append(f"row {line}: {e}")
+            continue
+
+        key = normalize_name(item['name'])
+        if key in names:
+            skipped.append((item['name'], names[key]))
+            continue
+
+        requested_id = None if is_blank(row.get('id')) else str(row['id']).strip()
+        if requested_id:
+            if not id_index.reserve(requested_id):
+                errors.append(f"row {line}: id {requested_id} is already taken")
+                continue
+            item_id = requested_id
+        else:
+            item_id = id_index.next_id(category['id'])
+        names[key] = item_id
+        inserts.append((category, {"id": item_id, **item}))
+
+    return inserts, skipped, errors
+
+def apply_inserts(inserts):
+    for category, item in inserts:
+        category['items'].append(item)
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import menu items from CSV, JSONL or xlsx")
+    parser.add_argument('input', help="items to import (.csv, .jsonl or .xlsx)")
+    parser.add_argument('--menu', default=menu_path, help="menu JSON to import into (default: %(default)s)")
+    parser.add_argument('--sheet', help="worksheet name for .xlsx input (default: first sheet)")
+    parser.add_argument('--skip-invalid', action='store_true',
+                        help="import the valid rows even if some rows are invalid")
+    parser.add_argument('--dry-run', action='store_true', help="report what would change without writing")
+    parser.add_argument('--no-store', action='store_true',
+                        help="overwrite the menu without saving a version in the menu store")
+    args = parser.parse_args()
+
+    extension = os.path.splitext(args.input)[1].lower()
+    if extension not in READERS:
+        sys.exit(f"❌ Unsupported input type {extension!r}; use one of {', '.join(sorted(READERS))}")
+
+    start = time.perf_counter()
+    menu, trailing_newline = read_menu(args.menu)
+    inserts, skipped, errors = plan_import(menu, READERS[extension](args.input, args.sheet))
+
+    for error in errors:
+        print(f"❌ {error}")
+    if errors and not args.skip_invalid:
+        sys.exit(f"\n❌ {len(errors)} invalid rows, nothing written (use --skip-invalid to import the rest)")
+
+    for name, existing_id in skipped:
+        print(f"↷ Skipped {name} (already on the menu as {existing_id})")
+    for category, item in inserts:
+        print(f"✅ {item['id']}  {item['name']} → {category['id']}")
+
+    if args.dry_run:
+        print(f"\n🔍 Dry run: {len(inserts)} items would be added, {len(skipped)} duplicates skipped")
+        return
+    if inserts:
+        # Single transaction: every insert lands in one atomic rewrite of the menu
+        apply_inserts(inserts)
+        data = dump_menu(menu, trailing_newline)
+        if args.no_store:
+            atomic_write(args.menu, data)
+        else:
+            record, _ = save(args.menu, menu, data, f"add-menu-items.py: {len(inserts)} items from "
+                                                    f"{os.path.basename(args.input)}")
+            print(f"   ✓ Saved as {os.path.basename(args.menu)} v{record['version']}")
+
+    print(f"\n✅ Menu updated successfully!")
+    print(f"📄 Location: {args.menu}")
+    print(f"📊 Total new items: {len(inserts)} ({len(skipped)} duplicates skipped) "
+          f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark the single-pass keyword classifier against the old per-keyword
+substring scan, as the keyword lists and the menu text grow.
+
+Usage:
+    python3 scripts/benchmark-classifier.py
+"""
+
+import glob
+import json
+import os
+import random
+import string
+import time
+
+from menu_classifier import DEFAULT_KEYWORDS, KeywordClassifier
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+MENUS_DIR = os.path.join(PROJECT_DIR, "src/data/menus")
+
+KEYWORD_COUNTS = [100, 1000, 10000, 50000]
+TEXT_SCALES = [1, 2, 4, 8]
+
+def load_menu_texts():
+    """(name, description) pairs for every item in the source menus"""
+    texts = []
+    for path in sorted(glob.glob(os.path.join(MENUS_DIR, "*.json"))):
+        if path.endswith("-enhanced.json"):
+            continue
+        with open(path, 'r') as f:
+            menu = json.load(f)
+        for category in menu['categories']:
+            for item in category['items']:
+                texts.append((item['name'], item.get('description', '')))
+    return texts
+
+def synthetic_keywords(count, rng):
+    """The real keyword sets padded with random words up to `count` keywords"""
+    keyword_sets = {flag: list(words) for flag, words in DEFAULT_KEYWORDS.items()}
+    total = sum(len(words) for words in keyword_sets.values())
+    flags = list(keyword_sets)
+    while total < count:
+        word = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10)))
+        keyword_sets[flags[total % len(flags)]].append(word)
+        total += 1
+    return keyword_sets
+
+def naive_classify(keyword_sets, name, description):
+    """The original approach: one substring scan of both strings per keyword"""
+    name_lower = name.lower()
+    desc_lower = description.lower()
+    return {
+        flag for flag, words in keyword_sets.items()
+        if any(word in name_lower or word in desc_lower for word in words)
+    }
+
+def best_of(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    rng = random.Random(42)
+    texts = load_menu_texts()
+    print(f"Classifying {len(texts)} menu items\n")
+
+    print("Scaling with keyword count (same text):")
+    print(f"  {'keywords':>9}  {'compile ms':>10}  {'naive ms':>9}  {'single-pass ms':>14}  {'speed-up':>8}")
+    for count in KEYWORD_COUNTS:
+        keyword_sets = synthetic_keywords(count, rng)
+        start = time.perf_counter()
+        classifier = KeywordClassifier(keyword_sets)
+        compile_time = time.perf_counter() - start
+
+        naive = best_of(lambda: [naive_classify(keyword_sets, n, d) for n, d in texts])
+        single = best_of(lambda: [classifier.classify(n, d) for n, d in texts])
+        print(f"  {len(classifier):>9}  {compile_time * 1000:>10.1f}  {naive * 1000:>9.1f}  "
+              f"{single * 1000:>14.2f}  {naive / single:>7.0f}x")
+
+    print("\nScaling with text size (default keywords):")
+    print(f"  {'items':>9}  {'single-pass ms':>14}  {'us/item':>8}")
+    classifier = KeywordClassifier(DEFAULT_KEYWORDS)
+    for scale in TEXT_SCALES:
+        scaled = texts * scale
+        single = best_of(lambda: [classifier.classify(n, d) for n, d in scaled])
+        print(f"  {len(scaled):>9}  {single * 1000:>14.2f}  {single / len(scaled) * 1e6:>8.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Benchmark the menu scripts on synthetic menus of growing size.
+
+Times enhance_food_menu, enhance_bar_menu and enhance_cafe_menu, the item
+id allocator (MenuIdIndex, which replaced get_next_id), the similar-dishes
+neighbours over a multi-outlet catalogue (OUTLET_ITEMS items per outlet) and
+the sticker render from create-netlify-sticker.py. Every case runs in a fresh process
+so peak RSS and allocation counts are not polluted by earlier cases.
+
+Reported per case and size:
+    seconds         best wall time over --repeat runs
+    items_per_sec   throughput (stickers/sec for the sticker render)
+    peak_rss        high-water RSS while the case ran, in bytes
+    alloc_blocks    net Python memory blocks still allocated after one run
+    traced_peak     peak bytes allocated by Python (only with --tracemalloc)
+
+Results are written as JSON so two commits can be compared.
+
+Usage:
+    python3 scripts/benchmark-menus.py --output bench-before.json
+    python3 scripts/benchmark-menus.py --sizes 100,10000 --compare bench-before.json
+"""
+
+import argparse
+import concurrent.futures
+import datetime
+import gc
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from menu_ids import MenuIdIndex
+from menu_synth import generate_menu, load_script, venue_category_ids
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+
+DEFAULT_SIZES = [100, 10_000, 1_000_000]
+ID_ALLOCATIONS = 1000
+# Items per outlet in the similar_items catalogue; neighbours stay within an outlet
+OUTLET_ITEMS = 1000
+
+def setup_enhance(venue):
+    def setup(size):
+        enhancer = load_script("enhance-menus.py")
+        enhance = getattr(enhancer, f"enhance_{venue}_menu")
+        menu = generate_menu(venue, size, venue_category_ids(venue))
+        return (lambda: enhance(menu)), size
+    return setup
+
+def setup_id_index(size):
+    menu = generate_menu('food', size, venue_category_ids('food'))
+    category_ids = venue_category_ids('food')
+
+    def run():
+        index = MenuIdIndex(menu)
+        for n in range(ID_ALLOCATIONS):
+            index.next_id(category_ids[n % len(category_ids)])
+        return index
+    return run, size
+
+def setup_similar(size):
+    from menu_similar import menu_items, similar_items
+
+    category_ids = venue_category_ids('food')
+    items, groups, categories = [], [], []
+    for outlet in range(-(-size // OUTLET_ITEMS)):
+        count = min(OUTLET_ITEMS, size - outlet * OUTLET_ITEMS)
+        for category_id, item in menu_items(generate_menu('food', count, category_ids, seed=outlet)):
+            items.append(item)
+            groups.append(outlet)
+            categories.append(category_id)
+    return (lambda: similar_items(items, groups=groups, category_ids=categories)), size
+
+def setup_sticker(size):
+    from PIL import Image
+
+    sticker_script = load_script("create-netlify-sticker.py")
+    qr_code = Image.open(sticker_script.qr_path)
+    qr_code.load()
+
+    def run():
+        buffer = io.BytesIO()
+        sticker_script.render_sticker(qr_code).save(buffer, 'PNG')
+        return buffer
+    return run, 1
+
+# name -> (setup(size) returning (run, units), whether the case scales with menu size)
+CASES = {
+    'enhance_food_menu': (setup_enhance('food'), True),
+    'enhance_bar_menu': (setup_enhance('bar'), True),
+    'enhance_cafe_menu': (setup_enhance('cafe'), True),
+    'menu_id_index': (setup_id_index, True),
+    'similar_items': (setup_similar, True),
+    'sticker_render': (setup_sticker, False),
+}
+
+def current_rss():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        return None
+
+def reset_peak_rss():
+    """Reset the kernel's RSS high-water mark; False where that isn't possible"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+def peak_rss(reset):
+    if reset:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    # ru_maxrss is the process lifetime peak: KiB on Linux, bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == 'darwin' else maxrss * 1024
+
+def run_case(name, size, repeat, trace):
+    """Runs in a child process; returns the measurements for one case and size"""
+    setup, _ = CASES[name]
+    run, units = setup(size)
+    gc.collect()
+
+    baseline_rss = current_rss()
+    reset = reset_peak_rss()
+    blocks_before = sys.getallocatedblocks()
+    start = time.perf_counter()
+    result = run()
+    best = time.perf_counter() - start
+    peak = peak_rss(reset)
+    alloc_blocks = sys.getallocatedblocks() - blocks_before
+    del result
+
+    for _ in range(repeat - 1):
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+
+    measurement = {
+        'case': name,
+        'size': size,
+        'seconds': best,
+        'items_per_sec': units / best if best else None,
+        'peak_rss': peak,
+        'baseline_rss': baseline_rss,
+        'alloc_blocks': alloc_blocks,
+    }
+    if trace:
+        gc.collect()
+        tracemalloc.start()
+        run()
+        measurement['traced_peak'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return measurement
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def format_bytes(value):
+    if value is None:
+        return "-"
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(value) < 1024 or unit == "GB":
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+
+def print_row(m):
+    rate = f"{m['items_per_sec']:,.0f}" if m['items_per_sec'] else "-"
+    print(f"  {m['case']:<18} {m['size']:>9,}  {m['seconds'] * 1000:>10.1f}  {rate:>12}  "
+          f"{format_bytes(m['peak_rss']):>9}  {m['alloc_blocks']:>10,}"
+          + (f"  {format_bytes(m['traced_peak']):>9}" if 'traced_peak' in m else ""))
+
+def compare(results, baseline, threshold):
+    """Print time ratios against an older results file; returns the regressions"""
+    old = {(m['case'], m['size']): m for m in baseline['cases']}
+    regressions = []
+    print(f"\n📊 Compared with {baseline.get('revision') or 'baseline'} ({baseline.get('timestamp', '?')}):")
+    for m in results['cases']:
+        previous = old.get((m['case'], m['size']))
+        if previous is None:
+            continue
+        ratio = m['seconds'] / previous['seconds']
+        marker = "⚠️ " if ratio > 1 + threshold else "✓ "
+        print(f"  {marker}{m['case']:<18} {m['size']:>9,}  {previous['seconds'] * 1000:>10.1f} → "
+              f"{m['seconds'] * 1000:>10.1f} ms  ({ratio:.2f}x)")
+        if ratio > 1 + threshold:
+            regressions.append(m)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the menu scripts on synthetic menus")
+    parser.add_argument('--sizes', default=",".join(str(size) for size in DEFAULT_SIZES),
+                        help="comma separated item counts (default: %(default)s)")
+    parser.add_argument('--cases', default=",".join(CASES),
+                        help="comma separated cases to run (default: all)")
+    parser.add_argument('--repeat', type=int, default=3, help="runs per case, best time is kept")
+    parser.add_argument('--tracemalloc', action='store_true',
+                        help="one extra traced run per case to record peak Python allocation")
+    parser.add_argument('--output', help="write results JSON here")
+    parser.add_argument('--compare', metavar='OLD_JSON', help="compare against an earlier results file")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="slow-down ratio that counts as a regression (default: %(default)s)")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    names = args.cases.split(',')
+    unknown = [name for name in names if name not in CASES]
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(unknown)} (choose from {', '.join(CASES)})")
+
+    jobs = []
+    for name in names:
+        _, scales = CASES[name]
+        jobs += [(name, size) for size in sizes] if scales else [(name, 1)]
+
+    results = {
+        'revision': git_revision(),
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'repeat': args.repeat,
+        'cases': [],
+    }
+
+    print(f"  {'case':<18} {'items':>9}  {'best ms':>10}  {'items/sec':>12}  {'peak RSS':>9}  "
+          f"{'blocks':>10}" + (f"  {'traced':>9}" if args.tracemalloc else ""))
+    context = multiprocessing.get_context('spawn')
+    for name, size in jobs:
+        # A fresh interpreter per case keeps RSS and allocation counts independent
+        with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            measurement = pool.submit(run_case, name, size, args.repeat, args.tracemalloc).result()
+        results['cases'].append(measurement)
+        print_row(measurement)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+        print(f"\n✅ Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            sys.exit(f"\n❌ {len(regressions)} cases slower than {1 + args.threshold:.2f}x the baseline")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Build responsive derivatives of the site's photos for the QR menus and gallery.
+
+Sources are every JPEG/PNG/WebP under public/images and public/gallery, the
+hero images, and any item "image" in the menus under src/data/menus. Each
+one gets AVIF, WebP and JPEG versions at the WIDTHS breakpoints (never above
+its own width) in public/img and a blurred placeholder, and everything is
+listed in src/data/image-manifest.json keyed by the image's public URL:
+
+    "/gallery/gallery-12.jpg": {
+      "hash": "...", "width": 1280, "height": 1920,
+      "placeholder": "data:image/webp;base64,...",
+      "sources": {"avif": [{"width": 320, "src": "/img/gallery-12-320w-<key>.avif", "bytes": 9120}, ...],
+                  "webp": [...], "jpeg": [...]}
+    }
+
+so a menu item with "image": "/gallery/gallery-12.jpg" renders a <picture>
+with one srcset per format and the placeholder as its blurred background.
+
+Derivative names include a hash of the source and the transform parameters
+(see image_pipeline.py): existing files are reused as they are and only new
+or edited photos are decoded and encoded. Sources are spread across a
+process pool.
+
+Usage:
+    python3 scripts/build-images.py                       # every source, reusing what exists
+    python3 scripts/build-images.py public/hero1.jpeg     # just these sources
+    python3 scripts/build-images.py --formats webp,jpeg -j 4
+    python3 scripts/build-images.py --prune               # also delete derivatives nothing references
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import contextlib
+import glob
+import json
+import os
+import sys
+import time
+
+from image_pipeline import FORMATS, PIPELINE_VERSION, WIDTHS, build_derivatives, file_hash
+from menu_io import write_if_changed
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+PUBLIC_DIR = os.path.join(PROJECT_DIR, "public")
+MENUS_DIR = os.path.join(PROJECT_DIR, "src/data/menus")
+OUTPUT_DIR = os.path.join(PUBLIC_DIR, "img")
+MANIFEST_PATH = os.path.join(PROJECT_DIR, "src/data/image-manifest.json")
+
+# Source globs, relative to public/
+SOURCE_PATTERNS = ["images/**/*", "gallery/**/*", "hero1.jpeg", "hero2.jpg"]
+SOURCE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
+
+def public_url(path):
+    return "/" + os.path.relpath(os.path.abspath(path), PUBLIC_DIR).replace(os.sep, "/")
+
+def menu_images(menus_dir):
+    """Public URLs of item images referenced by the source menus"""
+    urls = set()
+    for path in glob.glob(os.path.join(menus_dir, "*.json")):
+        if path.endswith(("-enhanced.json", "-index.json")) or os.path.basename(path).startswith("."):
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            menu = json.load(f)
+        if not isinstance(menu, dict):
+            continue
+        for category in menu.get('categories', []):
+            for item in category.get('items', []):
+                if isinstance(item.get('image'), str) and item['image'].startswith("/"):
+                    urls.add(item['image'])
+    return urls
+
+def discover_sources(menus_dir):
+    """Absolute paths of every source image, sorted"""
+    paths = set()
+    for pattern in SOURCE_PATTERNS:
+        for path in glob.glob(os.path.join(PUBLIC_DIR, pattern), recursive=True):
+            if os.path.splitext(path)[1].lower() in SOURCE_EXTENSIONS and os.path.isfile(path):
+                paths.add(os.path.abspath(path))
+    for url in menu_images(menus_dir):
+        path = os.path.join(PUBLIC_DIR, url.lstrip("/"))
+        if os.path.isfile(path):
+            paths.add(os.path.abspath(path))
+        else:
+            print(f"⚠️  Menu image {url} not found under public/")
+    # Never feed our own output back in
+    output_dir = os.path.abspath(OUTPUT_DIR) + os.sep
+    return sorted(path for path in paths if not path.startswith(output_dir))
+
+def load_manifest(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def prune(output_dir, manifest):
+    """Delete derivatives no manifest entry references; returns the count removed"""
+    referenced = {os.path.basename(source['src']) for entry in manifest.values()
+                  for sources in entry['sources'].values() for source in sources}
+    removed = 0
+    for name in os.listdir(output_dir):
+        if name not in referenced and not name.startswith("."):
+            os.remove(os.path.join(output_dir, name))
+            removed += 1
+    return removed
+
+def parse_formats(value):
+    formats = value.split(',')
+    unknown = [fmt for fmt in formats if fmt not in FORMATS]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown formats {', '.join(unknown)}; use {', '.join(FORMATS)}")
+    return formats
+
+def main():
+    parser = argparse.ArgumentParser(description="Build responsive, content-addressed image derivatives")
+    parser.add_argument('sources', nargs='*', help="source images (default: every site photo and menu image)")
+    parser.add_argument('--formats', type=parse_formats, default=list(FORMATS),
+                        help=f"comma separated output formats (default: {','.join(FORMATS)})")
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help="where derivatives go (default: %(default)s)")
+    parser.add_argument('--manifest', default=MANIFEST_PATH, help="manifest to write (default: %(default)s)")
+    parser.add_argument('--menus-dir', default=MENUS_DIR, help="menus to collect item images from")
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1,
+                        help="parallel worker processes; 1 runs inline (default: %(default)s)")
+    parser.add_argument('--prune', action='store_true',
+                        help="delete derivatives in --output-dir that the manifest no longer references")
+    args = parser.parse_args()
+
+    paths = [os.path.abspath(path) for path in args.sources] or discover_sources(args.menus_dir)
+    outside = [path for path in paths if not path.startswith(PUBLIC_DIR + os.sep)]
+    if outside:
+        sys.exit(f"❌ Sources must live under public/ so they have a URL: {', '.join(outside)}")
+    os.makedirs(args.output_dir, exist_ok=True)
+    url_prefix = public_url(args.output_dir)
+
+    previous = load_manifest(args.manifest)
+    manifest = {} if not args.sources else dict(previous)
+    jobs = []
+    for path in paths:
+        url = public_url(path)
+        jobs.append({
+            'path': path,
+            'url': url,
+            'name': os.path.splitext(os.path.basename(path))[0].replace(" ", "-"),
+            'hash': file_hash(path),
+            'output_dir': args.output_dir,
+            'url_prefix': url_prefix,
+            'formats': args.formats,
+            'widths': WIDTHS,
+            'previous': previous.get(url),
+        })
+
+    workers = max(1, min(args.workers, len(jobs)))
+    print(f"Building derivatives of {len(jobs)} images ({', '.join(args.formats)}) with {workers} workers...")
+    start = time.perf_counter()
+    encoded = reused = written = source_bytes = smallest_bytes = 0
+    with ProcessPoolExecutor(max_workers=workers) if workers > 1 else contextlib.nullcontext() as pool:
+        results = pool.map(build_derivatives, jobs) if pool else map(build_derivatives, jobs)
+        for job, (entry, count, data_bytes) in zip(jobs, results):
+            manifest[job['url']] = entry
+            encoded += count
+            reused += sum(len(sources) for sources in entry['sources'].values()) - count
+            written += data_bytes
+            if count:
+                print(f"   ✓ {job['url']}: {count} derivatives ({data_bytes / 1024:.0f} KB)")
+            source_bytes += os.path.getsize(job['path'])
+            # What a phone on a ~400 px wide viewport at 2x downloads: the best format at <= 960 w
+            best = entry['sources'][args.formats[0]]
+            smallest_bytes += max((s for s in best if s['width'] <= 960), key=lambda s: s['width'],
+                                  default=best[0])['bytes']
+    wall = time.perf_counter() - start
+
+    manifest = dict(sorted(manifest.items()))
+    if write_if_changed(args.manifest, (json.dumps(manifest, indent=2) + "\n").encode('utf-8')):
+        print(f"   ✓ Updated {os.path.relpath(args.manifest, PROJECT_DIR)}")
+    if args.prune:
+        print(f"   ✓ Pruned {prune(args.output_dir, manifest)} unreferenced derivatives")
+
+    print(f"\n📊 {encoded} derivatives encoded ({written / 1024 / 1024:.1f} MB), "
+          f"{reused} reused, "
+          f"in {wall:.2f}s (pipeline v{PIPELINE_VERSION})")
+    if jobs:
+        print(f"📊 Originals {source_bytes / 1024 / 1024:.1f} MB; {args.formats[0]} at <= 960 w "
+              f"{smallest_bytes / 1024 / 1024:.1f} MB ({smallest_bytes / source_bytes:.0%})")
+    print("\n✅ Image derivatives ready")
+
+if __name__ == "__main__":
+    main()
@@ -1,157 +1,218 @@
 #!/usr/bin/env python3
-from PIL import Image, ImageDraw, ImageFont
+"""
+Render the printable "SCAN ME" QR sticker.
+
+With no arguments this renders the single Netlify sticker. With --batch it
+renders every sticker in a manifest (one per table, venue or campaign) in
+one go: fonts are loaded and each QR source is decoded and resized once per
+worker process, and the stickers are spread across a process pool.
+
+The layout lives in sticker_render.py in resolution-independent units, so
+--targets can render the same sticker for several outputs in one run:
+
+    print   300 DPI A4 PNG and PDF (2480x3508)
+    web     palette PNG and WebP at 480, 768 and 1240 px wide
+    svg     vector SVG with the QR code embedded
+
+QR codes come either from an image (qr) or are generated from a URL (url,
+with optional ecc and logo). Generated codes are drawn at the exact pixel
+size of every target, and encoded matrices are cached per URL and ECC level,
+so re-rendering 200 table stickers only encodes the URLs that changed.
+--tables renders one sticker per table with its own tracking URL.
+
+The manifest is a JSON list; paths are relative to the manifest file and
+every field except output and one of qr/url is optional. With --targets,
+output is the file name stem the target suffixes are added to:
+
+    [
+      {"url": "https://amante.in/menu/food?table=1", "tagline": "Table 1", "output": "out/table-01.png"},
+      {"qr": "qr/campaign.png", "title": "AMANTE", "button": "SCAN ME",
+       "subtitle": "View Our Menu", "output": "out/campaign.png"}
+    ]
+
+Usage:
+    python3 scripts/create-netlify-sticker.py
+    python3 scripts/create-netlify-sticker.py --targets print,web,svg
+    python3 scripts/create-netlify-sticker.py --url https://amante.in/menu --logo public/logo.png
+    python3 scripts/create-netlify-sticker.py --tables 1-20 --venue bar --targets print
+    python3 scripts/create-netlify-sticker.py --batch stickers.json -j 4
+    python3 scripts/create-netlify-sticker.py --batch stickers.json --no-template-cache
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import json
 import os
+import sys
+import time
+
+from menu_io import atomic_write
+from qr_encode import ECC_LEVELS
+from sticker_render import (DEFAULT_TEXT, PAGE_HEIGHT as height, PAGE_WIDTH as width, QR_ECC, QR_SIZE, TARGETS,
+                            QrCode, encode, load_fonts, load_qr, qr_matrices, render_sticker, render_targets)
 
 # Paths
 script_dir = os.path.dirname(os.path.abspath(__file__))
 project_dir = os.path.dirname(script_dir)
 qr_path = os.path.join(project_dir, "qrchimpX1024 (3).png")
 output_path = os.path.join(project_dir, "public/qr-codes/sticker-netlify.png")
-
-# Create output directory if it doesn't exist
-os.makedirs(os.path.dirname(output_path), exist_ok=True)
-
-# Load the heart-shaped QR code
-qr_code = Image.open(qr_path)
-
-# Create a new image with white background (A4 aspect ratio, portrait)
-# Using 2480 x 3508 pixels (A4 at 300 DPI) but scaling down for web use
-width = 1240
-height = 1754
-sticker = Image.new('RGB', (width, height), 'white')
-draw = ImageDraw.Draw(sticker)
-
-# Brand color
-brand_red = (139, 21, 56)  # #8B1538
-
-# Draw decorative border frame at top
-frame_y = 180
-frame_height = 120
-frame_padding = 200
-
-# Draw rounded rectangle frame
-def draw_rounded_rectangle(draw, xy, radius, outline, width):
-    x1, y1, x2, y2 = xy
-    draw.rounded_rectangle(xy, radius=radius, outline=outline, width=width)
-
-# Draw outer frame
-draw_rounded_rectangle(
-    draw,
-    (frame_padding, frame_y, width - frame_padding, frame_y + frame_height),
-    radius=20,
-    outline=brand_red,
-    width=3
-)
-
-# Draw inner frame
-inner_padding = 10
-draw_rounded_rectangle(
-    draw,
-    (frame_padding + inner_padding, frame_y + inner_padding,
-     width - frame_padding - inner_padding, frame_y + frame_height - inner_padding),
-    radius=15,
-    outline=brand_red,
-    width=2
-)
-
-# Draw diamond decorations
-diamond_size = 15
-def draw_diamond(x, y):
-    points = [
-        (x, y - diamond_size),
-        (x + diamond_size, y),
-        (x, y + diamond_size),
-        (x - diamond_size, y)
-    ]
-    draw.polygon(points, outline=brand_red, width=2)
-
-# Add diamonds at corners
-diamond_positions = [
-    (frame_padding - 25, frame_y + 20),
-    (frame_padding - 25, frame_y + frame_height - 20),
-    (width - frame_padding + 25, frame_y + 20),
-    (width - frame_padding + 25, frame_y + frame_height - 20),
-    (width // 2, frame_y - 25),
-    (width // 2, frame_y + frame_height + 25)
-]
-
-for x, y in diamond_positions:
-    draw_diamond(x, y)
-
-# Try to use a nice font, fall back to default if not available
-try:
-    # Try different serif fonts
-    title_font = ImageFont.truetype("/System/Library/Fonts/Supplemental/Georgia.ttf", 100)
-    tagline_font = ImageFont.truetype("/System/Library/Fonts/Supplemental/Georgia.ttf", 36)
-    button_font = ImageFont.truetype("/System/Library/Fonts/Supplemental/Georgia Bold.ttf", 50)
-    subtitle_font = ImageFont.truetype("/System/Library/Fonts/Supplemental/Georgia.ttf", 32)
-except:
-    try:
-        title_font = ImageFont.truetype("/Library/Fonts/Arial.ttf", 100)
-        tagline_font = ImageFont.truetype("/Library/Fonts/Arial.ttf", 36)
-        button_font = ImageFont.truetype("/Library/Fonts/Arial Bold.ttf", 50)
-        subtitle_font = ImageFont.truetype("/Library/Fonts/Arial.ttf", 32)
-    except:
-        title_font = ImageFont.load_default()
-        tagline_font = ImageFont.load_default()
-        button_font = ImageFont.load_default()
-        subtitle_font = ImageFont.load_default()
-
-# Draw "AMANTE" text in the frame
-title_text = "AMANTE"
-title_bbox = draw.textbbox((0, 0), title_text, font=title_font)
-title_width = title_bbox[2] - title_bbox[0]
-title_x = (width - title_width) // 2
-title_y = frame_y + (frame_height - (title_bbox[3] - title_bbox[1])) // 2
-draw.text((title_x, title_y), title_text, font=title_font, fill=brand_red)
-
-# Draw tagline
-tagline = "A World of Flavor, Just a Scan Away."
-tagline_bbox = draw.textbbox((0, 0), tagline, font=tagline_font)
-tagline_width = tagline_bbox[2] - tagline_bbox[0]
-tagline_x = (width - tagline_width) // 2
-tagline_y = frame_y + frame_height + 80
-draw.text((tagline_x, tagline_y), tagline, font=tagline_font, fill=brand_red)
-
-# Resize and paste QR code
-qr_size = 700
-qr_resized = qr_code.resize((qr_size, qr_size), Image.Resampling.LANCZOS)
-qr_x = (width - qr_size) // 2
-qr_y = tagline_y + 100
-sticker.paste(qr_resized, (qr_x, qr_y), qr_resized if qr_resized.mode == 'RGBA' else None)
-
-# Draw rounded button below QR code
-button_y = qr_y + qr_size + 60
-button_width = 450
-button_height = 90
-button_x = (width - button_width) // 2
-
-# Draw button background
-draw.rounded_rectangle(
-    (button_x, button_y, button_x + button_width, button_y + button_height),
-    radius=45,
-    fill=brand_red
-)
-
-# Draw "SCAN ME" text
-button_text = "SCAN ME"
-button_bbox = draw.textbbox((0, 0), button_text, font=button_font)
-button_text_width = button_bbox[2] - button_bbox[0]
-button_text_height = button_bbox[3] - button_bbox[1]
-button_text_x = button_x + (button_width - button_text_width) // 2
-button_text_y = button_y + (button_height - button_text_height) // 2
-draw.text((button_text_x, button_text_y), button_text, font=button_font, fill='white')
-
-# Draw subtitle below button
-subtitle = "View Our Menu"
-subtitle_bbox = draw.textbbox((0, 0), subtitle, font=subtitle_font)
-subtitle_width = subtitle_bbox[2] - subtitle_bbox[0]
-subtitle_x = (width - subtitle_width) // 2
-subtitle_y = button_y + button_height + 30
-draw.text((subtitle_x, subtitle_y), subtitle, font=subtitle_font, fill=brand_red)
-
-# Save the sticker
-sticker.save(output_path, 'PNG', quality=95)
-print(f"✅ Netlify sticker created successfully!")
-print(f"📄 Location: {output_path}")
-print(f"📊 Size: {width}x{height} pixels")
+tables_dir = os.path.join(project_dir, "public/qr-codes/tables")
+
+# Same production URL as scripts/generate-qr.js
+PRODUCTION_URL = "https://amante-coming-soon-4jdpv85ml-aaryavars-projects.vercel.app"
+TABLE_URL_TEMPLATE = PRODUCTION_URL + "/menu/{venue}?table={table}"
+
+def load_manifest(path):
+    """Read a batch manifest into render jobs with absolute paths"""
+    with open(path, 'r') as f:
+        entries = json.load(f)
+    base_dir = os.path.dirname(os.path.abspath(path))
+    jobs = []
+    for number, entry in enumerate(entries, start=1):
+        if not entry.get('output') or not (entry.get('qr') or entry.get('url')):
+            sys.exit(f"❌ Manifest entry {number} needs an output and either qr or url")
+        if entry.get('url'):
+            logo = os.path.join(base_dir, entry['logo']) if entry.get('logo') else None
+            source = QrCode(entry['url'], entry.get('ecc', QR_ECC), logo)
+        else:
+            source = os.path.join(base_dir, entry['qr'])
+        jobs.append({
+            'texts': {field: entry.get(field, default) for field, default in DEFAULT_TEXT.items()},
+            'qr': source,
+            'output': os.path.join(base_dir, entry['output']),
+        })
+    return jobs
+
+def parse_tables(value):
+    """Table numbers from "12", "1-20" or "1-10,15,20-22" """
+    tables = []
+    for part in value.split(','):
+        first, _, last = part.partition('-')
+        try:
+            tables.extend(range(int(first), int(last or first) + 1))
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"expected table numbers like 1-20,25, got {value!r}")
+    return tables
+
+def table_jobs(tables, venue, url_template, out_dir, ecc, logo):
+    """One sticker per table, each with its own tracking URL"""
+    return [{
+        'texts': dict(DEFAULT_TEXT, tagline=f"Table {table}"),
+        'qr': QrCode(url_template.format(venue=venue, table=table), ecc, logo),
+        'output': os.path.join(out_dir, f"{venue}-table-{table:02d}.png"),
+    } for table in tables]
+
+def encode_qr_codes(jobs):
+    """Encode every URL up front so worker processes only read the matrix cache"""
+    matrices = qr_matrices()
+    for job in jobs:
+        if isinstance(job['qr'], QrCode):
+            matrices.get(job['qr'].url, job['qr'].ecc)
+    matrices.save()
+    if matrices.hits or matrices.misses:
+        print(f"🔳 QR codes: {matrices.misses} encoded, {matrices.hits} from cache")
+
+def render_job(job):
+    """Render and save one sticker; returns (report dicts, seconds)"""
+    start = time.perf_counter()
+    if job['targets']:
+        stem = os.path.splitext(job['output'])[0]
+        reports = render_targets(job['qr'], job['texts'], stem, job['targets'], job['use_disk_cache'])
+    else:
+        sticker = render_sticker(load_qr(job['qr'], QR_SIZE), job['texts'], use_disk_cache=job['use_disk_cache'])
+        os.makedirs(os.path.dirname(job['output']), exist_ok=True)
+        data = encode(sticker, 'png', 'default')
+        atomic_write(job['output'], data)
+        reports = [{'path': job['output'], 'target': 'default', 'format': 'png', 'size': sticker.size,
+                    'bytes': len(data), 'render': None, 'encode': None}]
+    return reports, time.perf_counter() - start
+
+def print_reports(reports):
+    print(f"\n{'File':<44} {'Pixels':>11} {'KB':>8} {'Render ms':>10} {'Encode ms':>10}")
+    for report in reports:
+        render = f"{report['render'] * 1000:.0f}" if report['render'] is not None else "-"
+        encode_ms = f"{report['encode'] * 1000:.0f}" if report['encode'] is not None else "-"
+        pixels = "vector" if report['format'] == 'svg' else "{}x{}".format(*report['size'])
+        print(f"{os.path.relpath(report['path']):<44} {pixels:>11} {report['bytes'] / 1024:>8.1f} "
+              f"{render:>10} {encode_ms:>10}")
+
+def render_batch(jobs, workers, targets, use_disk_cache=True):
+    for job in jobs:
+        job['targets'] = targets
+        job['use_disk_cache'] = use_disk_cache
+    workers = max(1, min(workers, len(jobs)))
+    print(f"Rendering {len(jobs)} stickers with {workers} workers...")
+    encode_qr_codes(jobs)
+
+    start = time.perf_counter()
+    if workers == 1:
+        results = list(map(render_job, jobs))
+    else:
+        # Fonts load in each worker up front; QR sources are decoded once per worker and reused
+        with ProcessPoolExecutor(max_workers=workers, initializer=load_fonts) as pool:
+            results = list(pool.map(render_job, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+    wall = time.perf_counter() - start
+
+    for reports, elapsed in results:
+        print(f"✓ {os.path.relpath(reports[0]['path'])} ({len(reports)} files, {elapsed * 1000:.0f} ms)")
+    if targets:
+        print_reports([report for reports, _ in results for report in reports])
+    print(f"\n✅ {len(results)} stickers rendered in {wall:.2f}s "
+          f"({len(results) / wall:.1f} stickers/sec)")
+
+def parse_targets(value):
+    targets = list(TARGETS) if value == 'all' else value.split(',')
+    unknown = [target for target in targets if target not in TARGETS]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown targets {', '.join(unknown)}; use {', '.join(TARGETS)} or all")
+    return targets
+
+def main():
+    parser = argparse.ArgumentParser(description="Render the QR menu sticker, or a batch of them")
+    sources = parser.add_mutually_exclusive_group()
+    sources.add_argument('--batch', metavar='MANIFEST', help="JSON manifest of stickers to render")
+    sources.add_argument('--url', help="generate the QR code for this URL instead of using the pre-rendered PNG")
+    sources.add_argument('--tables', type=parse_tables, metavar='RANGE',
+                         help="render one sticker per table, e.g. 1-20 or 1-10,15 (see --venue)")
+    parser.add_argument('--venue', default='food', help="venue for --tables URLs and file names (default: %(default)s)")
+    parser.add_argument('--url-template', default=TABLE_URL_TEMPLATE,
+                        help="URL for --tables with {venue} and {table} placeholders (default: %(default)s)")
+    parser.add_argument('--out-dir', default=tables_dir, help="where --tables stickers go (default: %(default)s)")
+    parser.add_argument('--ecc', choices=ECC_LEVELS, default=QR_ECC,
+                        help="error correction for generated QR codes (default: %(default)s)")
+    parser.add_argument('--logo', help="image to overlay in the middle of generated QR codes")
+    parser.add_argument('--targets', type=parse_targets,
+                        help=f"comma separated outputs to render: {', '.join(TARGETS)} or all "
+                             "(default: one 1240x1754 PNG)")
+    parser.add_argument('--output', default=output_path,
+                        help="sticker path, or the file name stem with --targets (default: %(default)s)")
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1,
+                        help="parallel worker processes for --batch; 1 runs inline (default: %(default)s)")
+    parser.add_argument('--no-template-cache', action='store_true',
+                        help="redraw the static layer instead of reading/writing the on-disk template cache")
+    args = parser.parse_args()
+
+    if args.batch or args.tables:
+        if args.batch:
+            jobs = load_manifest(args.batch)
+        else:
+            jobs = table_jobs(args.tables, args.venue, args.url_template, args.out_dir, args.ecc, args.logo)
+        render_batch(jobs, args.workers, args.targets, not args.no_template_cache)
+        return
+
+    source = QrCode(args.url, args.ecc, args.logo) if args.url else qr_path
+    job = {'qr': source, 'texts': DEFAULT_TEXT, 'output': args.output,
+           'targets': args.targets, 'use_disk_cache': not args.no_template_cache}
+    encode_qr_codes([job])
+    reports, _ = render_job(job)
+    if args.targets:
+        print_reports(reports)
+        print(f"\n✅ Netlify sticker rendered to {len(reports)} files")
+        return
+
+    print(f"✅ Netlify sticker created successfully!")
+    print(f"📄 Location: {args.output}")
+    print(f"📊 Size: {width}x{height} pixels")
+
+if __name__ == "__main__":
+    main()
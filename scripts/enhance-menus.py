@@ -2,10 +2,105 @@
 """
 Script to enhance menu JSON files with additional metadata for the new menu experience.
 Adds: cuisine, subcuisine, localDescription, similarTo, tags, etc.
+
+Every menu under src/data/menus is discovered and mapped to its enhancer by
+its `venue` field; files are processed in parallel worker processes. Tags
+are merged as bitmasks and written in the fixed order of menu_tags.py.
+Food items get "spicy" at spiceLevel 3+ and "mild" at 1 or below; an item
+with no spiceLevel is tagged "spicy" when its name or description has a
+spice word (menu_classifier.py: chilli, schezwan, peri peri, ...) and
+"mild" otherwise, unless its own or the mapped tags already say which.
+
+Every menu's validFrom/validTo and the recurring MENU_WINDOWS and
+EVENT_WINDOWS are then compiled into src/data/menus/menu-schedule.json (see
+menu_schedule.py). Everything written under src/data/menus is generated
+and gitignored; only the source menus are committed.
+
+--similar adds similarItems to every item: the ids of its nearest dishes
+on the same menu by name, description, tags, cuisine and price band, veg
+items only pointing at veg ones (menu_similar.py; needs numpy). It sits
+next to the hand-written similarTo hints, which stay as display text.
+
+--watch keeps the process running after the first pass: the compiled rules,
+the manifest and every parsed enhanced menu stay in memory, and each burst
+of saves under --menus-dir re-enhances just the menus that changed.
+
+Each enhanced menu is saved through the menu version store (menu_store.py)
+as the next version of "<menu>-enhanced" rather than overwritten in place,
+and (except with --stream) a source menu edited by hand since it was last
+recorded is committed as a version of its own; menu_store.py rolls either
+back. --no-store writes the files directly.
+
+Every run times its stages (load, hash, deepcopy, enhance, serialize, write,
+store per menu and category; schedule, publish once) and counts items
+enhanced and reused, rule lookups by level, tags added and fields
+defaulted. --metrics writes them as a JSON report and --prometheus in the
+Prometheus text format for a node_exporter textfile collector; --profile
+and --tracemalloc add a cProfile dump and the peak allocations of one run.
+
+Usage:
+    python3 scripts/enhance-menus.py                # full rebuild of every menu
+    python3 scripts/enhance-menus.py --incremental  # only re-enhance what changed
+    python3 scripts/enhance-menus.py --stream       # item-at-a-time, flat memory
+    python3 scripts/enhance-menus.py --columnar     # also write lazy-loadable columnar files
+    python3 scripts/enhance-menus.py --tag-masks    # also write tagMask per item for bitwise filtering
+    python3 scripts/enhance-menus.py --similar      # also write similarItems (5 nearest dishes) per item
+    python3 scripts/enhance-menus.py --publish      # version the output and publish patches for clients
+    python3 scripts/enhance-menus.py --no-store     # write outputs without recording versions
+    python3 scripts/enhance-menus.py --watch        # stay running, re-enhance menus as they are saved
+    python3 scripts/enhance-menus.py --metrics .cache/enhance-metrics.json --prometheus .cache/enhance.prom
+    python3 scripts/enhance-menus.py --profile .cache/enhance.prof --tracemalloc
+    python3 scripts/enhance-menus.py -j 4 src/data/menus/food.json
 """
 
-import json
+import argparse
+import contextlib
 import copy
+import cProfile
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+from menu_classifier import (
+    DEFAULT_CLASSIFIER as CLASSIFIER,
+    DEFAULT_KEYWORDS,
+    JAIN_EXCLUDED,
+    SATVIK_EXCLUDED,
+    allergens_from_flags,
+)
+from menu_columnar import encode_menu
+from menu_diff import patch_summary, publish_version
+from menu_index import SearchIndexBuilder, build_search_index, serialize_index
+from menu_io import atomic_write, remove_temp, temp_file, write_if_changed
+from menu_metrics import Metrics, metric_key
+from menu_rules import CuisineRuleTable
+from menu_schedule import compile_schedule
+from menu_store import TreeBuilder, open_store, save
+from menu_stream import CHUNK_SIZE, insert_field, map_items, read_menu_events, write_menu_events
+from menu_tags import TagVocabulary, is_premium
+from menu_watch import open_watcher, wait_for_changes
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+MENUS_DIR = os.path.join(PROJECT_DIR, "src/data/menus")
+# Versioned enhanced menus and their patch chains, written with --publish
+PUBLISH_DIR = os.path.join(PROJECT_DIR, "public/menus")
+
+# Neighbours per item written by --similar
+DEFAULT_SIMILAR = 5
+
+# Sidecar manifest of per-item content hashes used by --incremental
+MANIFEST_NAME = ".enhance-manifest.json"
+
+# Bump whenever the enhancement logic changes so cached items are rebuilt
+ENHANCER_VERSION = 4
 
 # Define cuisine mappings and local descriptions
 CUISINE_MAPPINGS = {
@@ -102,6 +197,9 @@ CUISINE_MAPPINGS = {
     }
 }
 
+# Compiled once at load: (category id, normalized item name) -> full enrichment
+FOOD_RULES = CuisineRuleTable(CUISINE_MAPPINGS)
+
 # Bar menu - simpler structure
 BAR_TYPES = {
     "signature-cocktails": {"type": "cocktails", "tags": ["signature"]},
@@ -134,131 +232,832 @@ CAFE_TYPES = {
     "add-ons": {"type": "add-ons", "temperature": "n/a", "tags": []},
 }
 
+# One bit per tag the tables or the enhancers can produce; fixes the output tag order
+TAGS = TagVocabulary.from_mappings(CUISINE_MAPPINGS, BAR_TYPES, CAFE_TYPES)
+POPULAR, SPICY, MILD, PREMIUM = (TAGS.bit(tag) for tag in ("popular", "spicy", "mild", "premium"))
+
+# Stage timers and counters for the menu being processed; enhance_file() resets it per file
+METRICS = Metrics()
+# Counter keys, built once so the item enhancers only do a dict increment
+TAG_ADDED = {tag: metric_key('tags_added', tag=tag) for tag in TAGS.tags}
+FIELD_DEFAULTED = {field: metric_key('fields_defaulted', field=field)
+                   for field in ('cuisine', 'subcuisine', 'localDescription', 'similarTo', 'allergens',
+                                 'drinkType', 'beverageType', 'temperature')}
+FLAG_SET = {flag: metric_key('flags_set', flag=flag) for flag in ('isJainFriendly', 'isSatvikFriendly')}
+RULE_LOOKUP = {level: metric_key('rule_lookups', level=level) for level in ('item', 'category', 'default')}
+ITEMS_ENHANCED = metric_key('items', state='enhanced')
+ITEMS_REUSED = metric_key('items', state='reused')
+
+def count_tags_added(added_mask):
+    """Count each tag the rules added on top of the item's own tags"""
+    counters = METRICS.counters
+    for tag in TAGS.tags_for(added_mask):
+        counters[TAG_ADDED[tag]] += 1
+
+def enhance_food_item(item, category_id):
+    """Enhance a single food item in place using the compiled cuisine rules"""
+    # Item override -> category default -> global default; source fields always win
+    counters = METRICS.counters
+    enrichment, level = FOOD_RULES.lookup(category_id, item['name'])
+    counters[RULE_LOOKUP[level]] += 1
+    for field in ('cuisine', 'subcuisine', 'localDescription', 'similarTo'):
+        if field not in item and field in enrichment:
+            item[field] = enrichment[field]
+            counters[FIELD_DEFAULTED[field]] += 1
+    own_mask, extras = TAGS.mask(item.get('tags', ()))
+    mask = own_mask | TAGS.mask(enrichment['tags'])[0]
+
+    # One classifier pass gives every dietary, allergen and spice flag
+    flags = CLASSIFIER.classify_item(item)
+    dietary = item.get('dietary', [])
+    is_veg = 'veg' in dietary and 'contains-egg' not in dietary and 'egg' not in dietary
+    if 'isJainFriendly' not in item:
+        item['isJainFriendly'] = 'jain' in dietary or (is_veg and not flags & JAIN_EXCLUDED)
+        counters[FLAG_SET['isJainFriendly']] += item['isJainFriendly']
+    if 'isSatvikFriendly' not in item:
+        item['isSatvikFriendly'] = is_veg and not flags & SATVIK_EXCLUDED
+        counters[FLAG_SET['isSatvikFriendly']] += item['isSatvikFriendly']
+    if 'allergens' not in item:
+        allergens = allergens_from_flags(flags)
+        if allergens:
+            item['allergens'] = allergens
+            counters[FIELD_DEFAULTED['allergens']] += 1
+
+    # Add popular tag for recommended items
+    if item.get('isRecommended'):
+        mask |= POPULAR
+
+    # Add spicy tag for spicy items, falling back to spice words when no level is set
+    # (so "Hunan Chilli Tofu" is spicy rather than defaulting to mild)
+    spice_level = item.get('spiceLevel') or 0
+    if spice_level >= 3 or (not spice_level and 'spicy' in flags and not mask & MILD):
+        mask |= SPICY
+    elif spice_level <= 1 and not mask & SPICY:
+        # A 'spicy' tag from the mapping rules outranks the missing spice level
+        mask |= MILD
+
+    count_tags_added(mask & ~own_mask)
+    item['tags'] = TAGS.tags_for(mask, extras)
+    return item
+
 def enhance_food_menu(menu_data):
     """Enhance food menu with cuisine and local context"""
     enhanced = copy.deepcopy(menu_data)
 
     for category in enhanced['categories']:
-        cat_id = category['id']
-        cat_mapping = CUISINE_MAPPINGS.get(cat_id, {})
-
         for item in category['items']:
-            # Add base fields if not present
-            if 'cuisine' not in item:
-                item['cuisine'] = cat_mapping.get('default_cuisine', 'fusion')
-            if 'tags' not in item:
-                item['tags'] = []
-            if 'localDescription' not in item:
-                item['localDescription'] = ""
-            if 'isJainFriendly' not in item:
-                item['isJainFriendly'] = False
-
-            # Check if veg and no onion/garlic keywords for Jain
-            if 'veg' in item.get('dietary', []):
-                name_lower = item['name'].lower()
-                desc_lower = item.get('description', '').lower()
-                if not any(word in name_lower or word in desc_lower for word in ['garlic', 'onion', 'lahsuni', 'pyaz']):
-                    item['isJainFriendly'] = True
-
-            # Add popular tag for recommended items
-            if item.get('isRecommended'):
-                if 'popular' not in item['tags']:
-                    item['tags'].append('popular')
-
-            # Add spicy tag for spicy items
-            if item.get('spiceLevel', 0) >= 3:
-                if 'spicy' not in item['tags']:
-                    item['tags'].append('spicy')
-            elif item.get('spiceLevel', 0) <= 1:
-                if 'mild' not in item['tags']:
-                    item['tags'].append('mild')
+            enhance_food_item(item, category['id'])
 
     return enhanced
 
+def enhance_bar_item(item, category_id):
+    """Enhance a single bar item in place using its category mapping"""
+    counters = METRICS.counters
+    cat_mapping = BAR_TYPES.get(category_id)
+    counters[RULE_LOOKUP['category' if cat_mapping is not None else 'default']] += 1
+    cat_mapping = cat_mapping or {}
+    if 'drinkType' not in item:
+        item['drinkType'] = cat_mapping.get('type', 'other')
+        counters[FIELD_DEFAULTED['drinkType']] += 1
+    own_mask, extras = TAGS.mask(item.get('tags', ()))
+    mask = own_mask | TAGS.mask(cat_mapping.get('tags', ()))[0]
+
+    # Add popular tag for recommended items
+    if item.get('isRecommended'):
+        mask |= POPULAR
+
+    if 'allergens' not in item:
+        allergens = allergens_from_flags(CLASSIFIER.classify_item(item))
+        if allergens:
+            item['allergens'] = allergens
+            counters[FIELD_DEFAULTED['allergens']] += 1
+
+    # Add premium tag for expensive items
+    if is_premium(item):
+        mask |= PREMIUM
+
+    count_tags_added(mask & ~own_mask)
+    item['tags'] = TAGS.tags_for(mask, extras)
+    return item
+
 def enhance_bar_menu(menu_data):
     """Enhance bar menu with drink types"""
     enhanced = copy.deepcopy(menu_data)
 
     for category in enhanced['categories']:
-        cat_id = category['id']
-        cat_mapping = BAR_TYPES.get(cat_id, {})
-
         for item in category['items']:
-            if 'drinkType' not in item:
-                item['drinkType'] = cat_mapping.get('type', 'other')
-            if 'tags' not in item:
-                item['tags'] = list(cat_mapping.get('tags', []))
-            else:
-                # Merge tags
-                item['tags'] = list(set(item['tags'] + cat_mapping.get('tags', [])))
+            enhance_bar_item(item, category['id'])
 
-            # Add popular tag for recommended items
-            if item.get('isRecommended'):
-                if 'popular' not in item['tags']:
-                    item['tags'].append('popular')
+    return enhanced
 
-            # Add premium tag for expensive items
-            if item.get('price', 0) >= 1000 or item.get('bottlePrice', 0) >= 15000:
-                if 'premium' not in item['tags']:
-                    item['tags'].append('premium')
+def enhance_cafe_item(item, category_id):
+    """Enhance a single cafe item in place using its category mapping"""
+    counters = METRICS.counters
+    cat_mapping = CAFE_TYPES.get(category_id)
+    counters[RULE_LOOKUP['category' if cat_mapping is not None else 'default']] += 1
+    cat_mapping = cat_mapping or {}
+    if 'beverageType' not in item:
+        item['beverageType'] = cat_mapping.get('type', 'other')
+        counters[FIELD_DEFAULTED['beverageType']] += 1
+    if 'temperature' not in item:
+        item['temperature'] = cat_mapping.get('temperature', 'both')
+        counters[FIELD_DEFAULTED['temperature']] += 1
+    own_mask, extras = TAGS.mask(item.get('tags', ()))
+    mask = own_mask | TAGS.mask(cat_mapping.get('tags', ()))[0]
 
-    return enhanced
+    # Add popular tag for recommended items
+    if item.get('isRecommended'):
+        mask |= POPULAR
+
+    count_tags_added(mask & ~own_mask)
+    item['tags'] = TAGS.tags_for(mask, extras)
+    return item
 
 def enhance_cafe_menu(menu_data):
     """Enhance cafe menu with beverage types"""
     enhanced = copy.deepcopy(menu_data)
 
     for category in enhanced['categories']:
+        for item in category['items']:
+            enhance_cafe_item(item, category['id'])
+
+    return enhanced
+
+# Menus only served during recurring windows (Asia/Kolkata wall clock); others are served all day
+MENU_WINDOWS = {
+    "food-breakfast": [{"days": "daily", "start": "07:00", "end": "12:00"}],
+    # All-day breakfast, served while the cafe is open
+    "breakfast": [{"days": "daily", "start": "08:00", "end": "23:00"}],
+}
+# Named windows layered over an all-day menu
+EVENT_WINDOWS = {
+    "happy-hour": {"menu": "bar", "days": "daily", "start": "17:00", "end": "20:00"},
+}
+
+# Menu `venue` -> (item enhancer, mapping table, compiled rules to report coverage for)
+VENUE_ENHANCERS = {
+    "food": (enhance_food_item, CUISINE_MAPPINGS, FOOD_RULES),
+    "amantesatvik": (enhance_food_item, CUISINE_MAPPINGS, None),
+    "breakfast": (enhance_food_item, CUISINE_MAPPINGS, None),
+    "nye": (enhance_food_item, CUISINE_MAPPINGS, None),
+    "bar": (enhance_bar_item, BAR_TYPES, None),
+    "cafe": (enhance_cafe_item, CAFE_TYPES, None),
+}
+
+ENHANCED_SUFFIX = "-enhanced.json"
+# Compact per-venue search index written next to each enhanced menu
+INDEX_SUFFIX = "-index.json"
+# Columnar, string-interned encoding written with --columnar
+COLUMNAR_SUFFIX = "-columnar.bin"
+# Compiled schedule of every menu's serving windows
+SCHEDULE_NAME = "menu-schedule.json"
+# Generated files that must never be picked up as source menus
+DERIVED_SUFFIXES = (ENHANCED_SUFFIX, INDEX_SUFFIX, SCHEDULE_NAME)
+
+def content_hash(value):
+    """Stable short hash of a JSON-serialisable value (key order independent)"""
+    payload = json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+def bytes_hash(data):
+    return hashlib.sha256(data).hexdigest()[:16]
+
+def serialize_menu(menu_data):
+    """Serialize a menu exactly the way the enhanced files are written"""
+    return json.dumps(menu_data, indent=2).encode('utf-8')
+
+def load_manifest(path):
+    try:
+        with open(path, 'r') as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    if (manifest.get('version') != ENHANCER_VERSION
+            or manifest.get('keywords') != content_hash(DEFAULT_KEYWORDS)
+            or manifest.get('tags') != content_hash(TAGS.tags)):
+        # Enhancement logic, classifier keywords or tag bit order changed since the manifest was written
+        return {}
+    return manifest
+
+def with_tag_masks(enhance_item):
+    """Wrap an item enhancer so every item also carries its tag bitmask"""
+    def enhance(item, category_id):
+        item = enhance_item(item, category_id)
+        item['tagMask'] = TAGS.mask(item['tags'])[0]
+        return item
+    return enhance
+
+def with_tag_vocabulary(menu_data):
+    """Copy of the menu with `tagVocabulary` (bit i -> tag) placed before its categories"""
+    enhanced = {}
+    for key, value in menu_data.items():
+        if key == 'categories':
+            enhanced['tagVocabulary'] = TAGS.tags
+        enhanced[key] = value
+    enhanced.setdefault('tagVocabulary', TAGS.tags)
+    return enhanced
+
+def add_similar_items(menu_data, k):
+    """Set every item's similarItems to the ids of its k nearest dishes (see menu_similar.py)"""
+    from menu_similar import menu_items, similar_items
+
+    pairs = menu_items(menu_data)
+    items = [item for _, item in pairs]
+    indices, _ = similar_items(items, k, category_ids=[category_id for category_id, _ in pairs])
+    for item, neighbours in zip(items, indices.tolist()):
+        item['similarItems'] = [items[i]['id'] for i in neighbours if i >= 0 and items[i].get('id')]
+
+def enhance_venue_incremental(menu_data, enhance_item, mappings, previous_output, previous_entry):
+    """
+    Enhance a venue, reusing items from the previous output whose source
+    content and category mapping are unchanged since the last run.
+    Returns (enhanced menu, manifest entry, stats).
+    """
+    # Index the previous output by (category id, mapping hash, item source hash)
+    reusable = {}
+    previous_categories = previous_entry.get('categories', {})
+    if previous_output is not None:
+        for category in previous_output.get('categories', []):
+            cat_entry = previous_categories.get(category['id'])
+            if not cat_entry or len(cat_entry['items']) != len(category['items']):
+                continue
+            for item_hash, item in zip(cat_entry['items'], category['items']):
+                reusable[(category['id'], cat_entry['mapping'], item_hash)] = item
+
+    stats = {'reused': 0, 'enhanced': 0}
+    categories_entry = {}
+    enhanced = dict(menu_data)
+    enhanced['categories'] = []
+
+    for category in menu_data['categories']:
         cat_id = category['id']
-        cat_mapping = CAFE_TYPES.get(cat_id, {})
+        cat_mapping = mappings.get(cat_id, {})
+        mapping_hash = content_hash(cat_mapping)
+        with METRICS.stage('hash', category=cat_id):
+            item_hashes = [content_hash(item) for item in category['items']]
+            items = [reusable.get((cat_id, mapping_hash, item_hash)) for item_hash in item_hashes]
+        stale = [position for position, cached in enumerate(items) if cached is None]
+        with METRICS.stage('deepcopy', category=cat_id):
+            copies = [copy.deepcopy(category['items'][position]) for position in stale]
+        with METRICS.stage('enhance', category=cat_id):
+            for position, item in zip(stale, copies):
+                items[position] = enhance_item(item, cat_id)
+        stats['enhanced'] += len(stale)
+        stats['reused'] += len(items) - len(stale)
+
+        enhanced_category = dict(category)
+        enhanced_category['items'] = items
+        enhanced['categories'].append(enhanced_category)
+        categories_entry[cat_id] = {'mapping': mapping_hash, 'items': item_hashes}
+
+    METRICS.counters[ITEMS_ENHANCED] += stats['enhanced']
+    METRICS.counters[ITEMS_REUSED] += stats['reused']
+    entry = {'categories': categories_entry}
+    return enhanced, entry, stats
 
+def menu_item_names(menu_data):
+    for category in menu_data['categories']:
         for item in category['items']:
-            if 'beverageType' not in item:
-                item['beverageType'] = cat_mapping.get('type', 'other')
-            if 'temperature' not in item:
-                item['temperature'] = cat_mapping.get('temperature', 'both')
-            if 'tags' not in item:
-                item['tags'] = list(cat_mapping.get('tags', []))
+            yield category['id'], item['name']
+
+def report_unmatched_rules(rules, items):
+    """Print item rules in the mapping table that no (category id, name) pair matched"""
+    unmatched = rules.unmatched_rules(items)
+    if not unmatched:
+        print(f"     All {len(rules)} item rules matched")
+        return
+    print(f"     ⚠ {len(unmatched)} of {len(rules)} item rules never matched:")
+    for cat_id, name in unmatched:
+        print(f"       - {cat_id}: {name}")
+
+# Enhanced menus kept parsed between passes in --watch mode:
+# output path -> ((mtime_ns, size), output hash, menu)
+HOT_OUTPUTS = {}
+
+def file_signature(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def artifact_current(path, recorded_hash):
+    """True if a generated file exists and still matches the manifest"""
+    return recorded_hash is not None and file_hash(path) == recorded_hash
+
+def process_venue(source_path, enhance_item, mappings, rules, previous_entry, incremental, columnar=False,
+                  tag_masks=False, hot=False, similar=0, store=False):
+    """
+    Enhance one venue file and write its search index; returns its new
+    manifest entry. With `hot` the enhanced menu is kept in HOT_OUTPUTS so
+    the next pass can skip reading and parsing it. With `store` the enhanced
+    menu is saved through the menu store.
+    """
+    output_path = derived_path(source_path, ENHANCED_SUFFIX)
+    index_path = derived_path(source_path, INDEX_SUFFIX)
+    columnar_path = derived_path(source_path, COLUMNAR_SUFFIX)
+    output_name = os.path.basename(output_path)
+
+    with METRICS.stage('load'):
+        with open(source_path, 'rb') as f:
+            source_bytes = f.read()
+        source_hash = bytes_hash(source_bytes)
+    mappings_hash = content_hash(mappings)
+    if store:
+        with METRICS.stage('store'):
+            open_store(os.path.dirname(source_path)).track(menu_label(source_path), source_path, source_bytes)
+
+    previous_output = None
+    if previous_entry.get('tagMasks', False) != tag_masks or previous_entry.get('similar', 0) != similar:
+        # Cached items were written with (or without) tagMask or similarItems; rebuild them all
+        previous_entry = {}
+    if previous_entry:
+        output_bytes = None
+        cached = HOT_OUTPUTS.get(output_path)
+        if cached is not None and cached[:2] == (file_signature(output_path), previous_entry.get('output')):
+            previous_output = cached[2]
+            trusted = True
+        else:
+            try:
+                with open(output_path, 'rb') as f:
+                    output_bytes = f.read()
+            except FileNotFoundError:
+                pass
+            # Only trust the previous output if nobody edited it since the last run
+            trusted = output_bytes is not None and bytes_hash(output_bytes) == previous_entry.get('output')
+        if trusted:
+            if (previous_entry.get('source') == source_hash
+                    and previous_entry.get('mappings') == mappings_hash
+                    and artifact_current(index_path, previous_entry.get('index'))
+                    and (not columnar or artifact_current(columnar_path, previous_entry.get('columnar')))):
+                print(f"   ✓ {output_name} is up to date (source and mappings unchanged)")
+                return previous_entry
+            if previous_output is None:
+                with METRICS.stage('load'):
+                    previous_output = json.loads(output_bytes)
+        else:
+            previous_entry = {}
+
+    with METRICS.stage('load'):
+        menu_data = json.loads(source_bytes)
+    if rules is not None:
+        report_unmatched_rules(rules, menu_item_names(menu_data))
+    enhanced, entry, stats = enhance_venue_incremental(
+        menu_data, enhance_item, mappings, previous_output, previous_entry
+    )
+    if similar:
+        # Neighbours depend on the whole menu, so every item is recomputed
+        with METRICS.stage('similar'):
+            add_similar_items(enhanced, similar)
+    if tag_masks:
+        enhanced = with_tag_vocabulary(enhanced)
+    with METRICS.stage('serialize'):
+        output_bytes = serialize_menu(enhanced)
+        index_bytes = serialize_index(build_search_index(enhanced))
+        outputs = [(output_path, output_bytes), (index_path, index_bytes)]
+        if columnar:
+            columnar_bytes = encode_menu(enhanced)
+            outputs.append((columnar_path, columnar_bytes))
+
+    with METRICS.stage('write'):
+        for path, data in outputs:
+            if store and path == output_path:
+                written = save(path, enhanced, data, f"enhanced from {os.path.basename(source_path)} {source_hash}")[1]
+            else:
+                written = write_if_changed(path, data)
+            if written:
+                print(f"   ✓ Created {os.path.basename(path)}")
             else:
-                # Merge tags
-                item['tags'] = list(set(item['tags'] + cat_mapping.get('tags', [])))
+                print(f"   ✓ {os.path.basename(path)} unchanged, skipped write")
+    if incremental:
+        print(f"     {stats['enhanced']} items enhanced, {stats['reused']} reused")
+    if columnar:
+        print(f"     {len(output_bytes) / 1024:.1f} KB JSON -> {len(columnar_bytes) / 1024:.1f} KB columnar")
+        entry['columnar'] = bytes_hash(columnar_bytes)
 
-            # Add popular tag for recommended items
-            if item.get('isRecommended'):
-                if 'popular' not in item['tags']:
-                    item['tags'].append('popular')
+    entry.update({
+        'source': source_hash,
+        'mappings': mappings_hash,
+        'output': bytes_hash(output_bytes),
+        'index': bytes_hash(index_bytes),
+    })
+    if tag_masks:
+        entry['tagMasks'] = True
+    if similar:
+        entry['similar'] = similar
+    if hot:
+        HOT_OUTPUTS[output_path] = (file_signature(output_path), entry['output'], enhanced)
+    return entry
 
-    return enhanced
+def file_hash(path):
+    """bytes_hash of a file read in chunks, or None if it does not exist"""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()[:16]
+
+def stream_venue(source_path, venue, enhance_item, mappings, rules, tag_masks=False, store=False):
+    """
+    Enhance one venue file item by item: categories and items are read as a
+    stream, enriched in place and written straight to a temp file, so the
+    parsed menu is never held in memory. With `store` each item goes into
+    the menu store as it passes and the output is committed as a tree of
+    their keys. Returns its manifest entry.
+    """
+    output_path = derived_path(source_path, ENHANCED_SUFFIX)
+    index_path = derived_path(source_path, INDEX_SUFFIX)
+    output_name = os.path.basename(output_path)
+    index_builder = SearchIndexBuilder(venue)
+
+    source_digest = hashlib.sha256()
+    output_digest = hashlib.sha256()
+    output_size = 0
+    builder = TreeBuilder(open_store(os.path.dirname(source_path))) if store else None
+    categories_entry = {}
+    seen_names = []
+    current = {'id': None, 'entry': None}
+
+    def enhance(item, category_id):
+        if category_id != current['id'] or current['entry'] is None:
+            current['id'] = category_id
+            current['entry'] = categories_entry[category_id] = {
+                'mapping': content_hash(mappings.get(category_id, {})),
+                'items': [],
+            }
+        current['entry']['items'].append(content_hash(item))
+        seen_names.append((category_id, item['name']))
+        METRICS.counters[ITEMS_ENHANCED] += 1
+        enhanced = enhance_item(item, category_id)
+        index_builder.add(enhanced, category_id)
+        return enhanced
+
+    def write(text):
+        nonlocal output_size
+        data = text.encode('utf-8')
+        output_digest.update(data)
+        output_size += len(data)
+        out.write(data)
+
+    # Written like menu_io.atomic_write, but one item at a time
+    out, tmp_path = temp_file(output_path)
+    try:
+        with METRICS.stage('stream'), open(source_path, 'r', encoding='utf-8', newline='') as src, out:
+            events = read_menu_events(src, on_chunk=lambda chunk: source_digest.update(chunk.encode('utf-8')))
+            events = map_items(events, enhance)
+            if tag_masks:
+                events = insert_field(events, 'tagVocabulary', TAGS.tags)
+            if builder is not None:
+                events = builder(events)
+            write_menu_events(events, write)
+            out.flush()
+            os.fsync(out.fileno())
+
+        output_hash = output_digest.hexdigest()[:16]
+        if builder is not None:
+            with METRICS.stage('store'):
+                # Keep an unrecorded edit of the old output before it is replaced
+                builder.store.track(menu_label(output_path), output_path)
+        if file_hash(output_path) == output_hash:
+            os.remove(tmp_path)
+            print(f"   ✓ {output_name} unchanged, skipped write")
+        else:
+            os.replace(tmp_path, output_path)
+            print(f"   ✓ Created {output_name}")
+    except BaseException:
+        remove_temp(tmp_path)
+        raise
+    if builder is not None:
+        with METRICS.stage('store'):
+            builder.store.commit_tree(menu_label(output_path), builder.tree, output_hash, output_size,
+                                      f"enhanced from {os.path.basename(source_path)} {source_digest.hexdigest()[:16]}")
+
+    index_bytes = serialize_index(index_builder.build())
+    if write_if_changed(index_path, index_bytes):
+        print(f"   ✓ Created {os.path.basename(index_path)}")
+    else:
+        print(f"   ✓ {os.path.basename(index_path)} unchanged, skipped write")
+
+    if rules is not None:
+        report_unmatched_rules(rules, seen_names)
+
+    entry = {
+        'categories': categories_entry,
+        'source': source_digest.hexdigest()[:16],
+        'mappings': content_hash(mappings),
+        'output': output_hash,
+        'index': bytes_hash(index_bytes),
+    }
+    if tag_masks:
+        entry['tagMasks'] = True
+    return entry
+
+def read_header(path):
+    """A menu's top-level fields that come before its categories, without parsing them"""
+    header = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for event in read_menu_events(f):
+            if event[0] == 'categories_start':
+                break
+            header[event[1]] = event[2]
+    return header
+
+def read_venue(path):
+    """Read a menu's `venue` field without parsing its categories"""
+    return read_header(path).get('venue')
+
+def is_source_menu(name):
+    """True for file names that are source menus rather than generated files"""
+    return name.endswith('.json') and not name.endswith(DERIVED_SUFFIXES) and not name.startswith('.')
+
+def discover_menus(menus_dir):
+    """Source menu files under menus_dir as sorted (path, venue) pairs"""
+    menus = []
+    for name in sorted(os.listdir(menus_dir)):
+        if not is_source_menu(name):
+            continue
+        path = os.path.join(menus_dir, name)
+        menus.append((path, read_venue(path)))
+    return menus
+
+def derived_path(source_path, suffix):
+    """food.json -> food-enhanced.json, food-index.json, ..."""
+    return source_path[:-len('.json')] + suffix
+
+def menu_label(source_path):
+    return os.path.basename(source_path)[:-len('.json')]
+
+def enhance_file(job):
+    """Process-pool worker: enhance one menu file, capturing its log output"""
+    source_path, venue, previous_entry, options = job
+    enhance_item, mappings, rules = VENUE_ENHANCERS[venue]
+    if options['tag_masks']:
+        enhance_item = with_tag_masks(enhance_item)
+
+    METRICS.reset()
+    log = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(log):
+        if options['stream']:
+            entry = stream_venue(source_path, venue, enhance_item, mappings, rules, options['tag_masks'],
+                                 options['store'])
+        else:
+            entry = process_venue(source_path, enhance_item, mappings, rules, previous_entry,
+                                  options['incremental'], options['columnar'], options['tag_masks'],
+                                  options.get('hot', False), options['similar'], options['store'])
+    return entry, log.getvalue(), time.perf_counter() - start, METRICS.snapshot()
+
+def write_schedule(menus_dir):
+    """Compile the serving windows of every menu under menus_dir into SCHEDULE_NAME"""
+    menus = []
+    for path, venue in discover_menus(menus_dir):
+        if venue not in VENUE_ENHANCERS:
+            continue
+        header = read_header(path)
+        menus.append({
+            'menu': menu_label(path),
+            'venue': venue,
+            'artifact': os.path.basename(derived_path(path, ENHANCED_SUFFIX)),
+            'validFrom': header.get('validFrom'),
+            'validTo': header.get('validTo'),
+        })
+    schedule = compile_schedule(menus, MENU_WINDOWS, EVENT_WINDOWS)
+    path = os.path.join(menus_dir, SCHEDULE_NAME)
+    written = write_if_changed(path, json.dumps(schedule, indent=2).encode('utf-8'))
+    print(f"   ✓ {'Created' if written else 'Unchanged'} {SCHEDULE_NAME}: {len(schedule['rows'])} windows, "
+          f"{len(schedule['boundaries'])} change-overs")
+
+def publish_menu(label, output_path, publish_dir):
+    """Publish an enhanced menu as its next version; prints what changed"""
+    with open(output_path, 'rb') as f:
+        menu_bytes = f.read()
+    version, patch = publish_version(os.path.join(publish_dir, label), menu_bytes)
+    if patch is None:
+        print(f"   ✓ {label} v{version} published")
+    else:
+        print(f"   ✓ {label} v{version} published ({patch_summary(patch)})")
+
+def enhance_menus(menus, args, options, manifest, manifest_path, metrics=None):
+    """
+    One enhancement pass over `menus`, then the schedule, manifest and
+    publishing steps. Returns (new manifest, per-file timings, wall seconds).
+    Stage timers and counters are merged into `metrics`, labelled by menu.
+    """
+    metrics = metrics if metrics is not None else Metrics()
+    venues_entry = dict(manifest.get('venues', {}))
+    jobs = []
+    for path, venue in menus:
+        if venue not in VENUE_ENHANCERS:
+            print(f"\n   ⚠ Skipping {os.path.basename(path)}: no enhancer for venue {venue!r}")
+            continue
+        previous_entry = venues_entry.get(menu_label(path), {}) if args.incremental else {}
+        jobs.append((path, venue, previous_entry, options))
+
+    workers = max(1, min(args.workers, len(jobs)))
+    start = time.perf_counter()
+    timings = []
+    # A single worker runs in this process, where --watch and --profile can see it
+    with ProcessPoolExecutor(max_workers=workers) if workers > 1 else contextlib.nullcontext() as pool:
+        results = pool.map(enhance_file, jobs) if pool else map(enhance_file, jobs)
+        for index, (job, (entry, log, elapsed, snapshot)) in enumerate(zip(jobs, results), start=1):
+            path, venue = job[0], job[1]
+            print(f"\n{index}. Processing {os.path.basename(path)} ({venue})...")
+            print(log, end='')
+            metrics.merge(snapshot, menu=menu_label(path))
+            venues_entry[menu_label(path)] = entry
+            item_count = sum(len(category['items']) for category in entry['categories'].values())
+            timings.append((os.path.basename(path), venue, item_count, elapsed))
+    wall = time.perf_counter() - start
+
+    print("\nCompiling menu schedule...")
+    with metrics.stage('schedule'):
+        write_schedule(args.menus_dir)
+
+    manifest = {'version': ENHANCER_VERSION, 'keywords': content_hash(DEFAULT_KEYWORDS),
+                'tags': content_hash(TAGS.tags), 'venues': venues_entry}
+    write_if_changed(manifest_path, json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+
+    if args.publish:
+        print(f"\nPublishing to {os.path.relpath(args.publish_dir, PROJECT_DIR)}...")
+        with metrics.stage('publish'):
+            for path, _, _, _ in jobs:
+                publish_menu(menu_label(path), derived_path(path, ENHANCED_SUFFIX), args.publish_dir)
+    return manifest, timings, wall
+
+def export_metrics(args, metrics, **extra):
+    """Write the --metrics JSON report and the --prometheus textfile, if asked for"""
+    for path in (args.metrics, args.prometheus):
+        if path and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+    if args.metrics:
+        atomic_write(args.metrics, json.dumps(metrics.to_report(**extra), indent=2).encode('utf-8'))
+    if args.prometheus:
+        atomic_write(args.prometheus, metrics.to_prometheus().encode('utf-8'))
+
+def print_stage_totals(metrics):
+    totals = metrics.stage_totals()
+    if not totals:
+        return
+    print(f"\n{'Stage':<24} {'Calls':>6} {'Wall (ms)':>10} {'CPU (ms)':>10}")
+    for name, (wall, cpu, calls) in sorted(totals.items(), key=lambda row: -row[1][0]):
+        print(f"{name:<24} {calls:>6} {wall * 1000:>10.1f} {cpu * 1000:>10.1f}")
+    counters = {}
+    for (name, labels), value in metrics.counters.items():
+        key = (name, dict(labels).get('state') or dict(labels).get('level'))
+        counters[key] = counters.get(key, 0) + value
+    if counters:
+        print("📊 " + ", ".join(f"{name}{f' ({kind})' if kind else ''} {value}"
+                              for (name, kind), value in sorted(counters.items())))
+
+def watch(args, options, manifest, manifest_path, metrics):
+    """Re-enhance menus under --menus-dir as they change, until interrupted"""
+    watcher = open_watcher(args.menus_dir, polling=args.poll)
+    watched = {os.path.abspath(path) for path in args.files}
+    print(f"\n👀 Watching {os.path.relpath(args.menus_dir)} ({watcher.kind}), Ctrl+C to stop")
+    try:
+        while True:
+            names = wait_for_changes(watcher)
+            if names is None:
+                # The event queue overflowed: treat every menu as changed
+                names = set(os.listdir(args.menus_dir))
+            paths = [os.path.join(args.menus_dir, name) for name in sorted(names) if is_source_menu(name)]
+            paths = [path for path in paths
+                     if os.path.exists(path) and (not watched or os.path.abspath(path) in watched)]
+            if not paths:
+                continue
+            started = time.perf_counter()
+            log = io.StringIO()
+            try:
+                with contextlib.redirect_stdout(log):
+                    menus = [(path, read_venue(path)) for path in paths]
+                    manifest, _, wall = enhance_menus(menus, args, options, manifest, manifest_path, metrics)
+            except (ValueError, KeyError, OSError) as e:
+                # Usually a save caught half-written or invalid JSON; the next save retries
+                print(f"❌ {', '.join(os.path.basename(path) for path in paths)}: {e}")
+                continue
+            elapsed = time.perf_counter() - started
+            changed = [line.strip() for line in log.getvalue().splitlines() if '✓ Created' in line]
+            print(f"⟳ {', '.join(os.path.basename(path) for path in paths)} in {elapsed * 1000:.1f} ms"
+                  + (f" ({len(changed)} files written)" if changed else " (no output changes)"))
+            # Counters keep growing across passes, as Prometheus counters should
+            export_metrics(args, metrics, wall_seconds=wall, workers=1, watch=True)
+    except KeyboardInterrupt:
+        print("\n✅ Stopped watching")
+    finally:
+        watcher.close()
 
 def main():
-    print("Enhancing menu files...")
-
-    # Enhance food menu
-    print("\n1. Processing food menu...")
-    with open('src/data/menus/food.json', 'r') as f:
-        food_menu = json.load(f)
-    enhanced_food = enhance_food_menu(food_menu)
-    with open('src/data/menus/food-enhanced.json', 'w') as f:
-        json.dump(enhanced_food, f, indent=2)
-    print("   ✓ Created food-enhanced.json")
-
-    # Enhance bar menu
-    print("\n2. Processing bar menu...")
-    with open('src/data/menus/bar.json', 'r') as f:
-        bar_menu = json.load(f)
-    enhanced_bar = enhance_bar_menu(bar_menu)
-    with open('src/data/menus/bar-enhanced.json', 'w') as f:
-        json.dump(enhanced_bar, f, indent=2)
-    print("   ✓ Created bar-enhanced.json")
-
-    # Enhance cafe menu
-    print("\n3. Processing cafe menu...")
-    with open('src/data/menus/cafe.json', 'r') as f:
-        cafe_menu = json.load(f)
-    enhanced_cafe = enhance_cafe_menu(cafe_menu)
-    with open('src/data/menus/cafe-enhanced.json', 'w') as f:
-        json.dump(enhanced_cafe, f, indent=2)
-    print("   ✓ Created cafe-enhanced.json")
+    parser = argparse.ArgumentParser(description="Enhance menu JSON files with metadata for the menu experience")
+    parser.add_argument('files', nargs='*',
+                        help="menu files to enhance (default: every menu under --menus-dir)")
+    parser.add_argument('--menus-dir', default=MENUS_DIR,
+                        help="directory to discover menus in (default: %(default)s)")
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count() or 1,
+                        help="parallel worker processes; 1 runs inline (default: %(default)s)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument('--incremental', action='store_true',
+                      help="only re-enhance items whose source or mapping changed since the last run")
+    mode.add_argument('--stream', action='store_true',
+                      help="read, enhance and write one item at a time to keep memory flat on large menus")
+    parser.add_argument('--columnar', action='store_true',
+                        help="also write <menu>-columnar.bin for lazy per-category loading (not with --stream)")
+    parser.add_argument('--tag-masks', action='store_true',
+                        help="also write each item's tagMask and the menu's tagVocabulary (bit i -> tag)")
+    parser.add_argument('--similar', type=int, nargs='?', const=DEFAULT_SIMILAR, default=0, metavar='K',
+                        help=f"also write each item's similarItems: ids of its K nearest dishes "
+                             f"(default K: {DEFAULT_SIMILAR}; needs numpy)")
+    parser.add_argument('--no-store', action='store_true',
+                        help="write the enhanced menus directly instead of saving versions in the menu store")
+    parser.add_argument('--publish', action='store_true',
+                        help="publish each enhanced menu as a new version with a patch from the previous one")
+    parser.add_argument('--publish-dir', default=PUBLISH_DIR,
+                        help="where --publish writes version.json, snapshots and patches (default: %(default)s)")
+    parser.add_argument('--watch', action='store_true',
+                        help="stay running and re-enhance menus as they are saved (implies --incremental)")
+    parser.add_argument('--poll', action='store_true',
+                        help="with --watch, poll for changes instead of using inotify")
+    parser.add_argument('--manifest',
+                        help="sidecar manifest of per-item content hashes (default: .enhance-manifest.json in --menus-dir)")
+    parser.add_argument('--metrics', metavar='FILE',
+                        help="write per-stage timings and counters as a JSON report")
+    parser.add_argument('--prometheus', metavar='FILE',
+                        help="write the same metrics in Prometheus text format (e.g. for node_exporter)")
+    parser.add_argument('--profile', metavar='FILE',
+                        help="run under cProfile, save the stats to FILE and print the top functions (implies -j 1)")
+    parser.add_argument('--tracemalloc', action='store_true',
+                        help="trace allocations and print the peak and the largest allocation sites (implies -j 1)")
+    args = parser.parse_args()
+    if args.columnar and args.stream:
+        parser.error("--columnar needs the whole enhanced menu and cannot be combined with --stream")
+    if args.similar and args.stream:
+        parser.error("--similar compares every item of a menu and cannot be combined with --stream")
+    if args.similar and importlib.util.find_spec("numpy") is None:
+        sys.exit("❌ --similar needs numpy: pip install numpy")
+    options = {'incremental': args.incremental, 'stream': args.stream, 'columnar': args.columnar,
+               'tag_masks': args.tag_masks, 'similar': args.similar, 'store': not args.no_store}
+
+    if args.watch:
+        if args.stream:
+            parser.error("--watch keeps enhanced menus in memory and cannot be combined with --stream")
+        # Watch mode reuses everything it can and stays in this process
+        args.incremental = True
+        args.workers = 1
+        options.update(incremental=True, hot=True)
+    if args.profile or args.tracemalloc:
+        # Neither hook sees into worker processes
+        args.workers = 1
+
+    if args.files:
+        menus = [(path, read_venue(path)) for path in args.files]
+    else:
+        menus = discover_menus(args.menus_dir)
+    manifest_path = args.manifest or os.path.join(args.menus_dir, MANIFEST_NAME)
+
+    print(f"Enhancing {len(menus)} menu files...")
+    manifest = load_manifest(manifest_path)
+    metrics = Metrics()
+    profiler = cProfile.Profile() if args.profile else None
+    if args.tracemalloc:
+        tracemalloc.start()
+    if profiler:
+        profiler.enable()
+    manifest, timings, wall = enhance_menus(menus, args, options, manifest, manifest_path, metrics)
+    if profiler:
+        profiler.disable()
+
+    print(f"\n{'File':<24} {'Venue':<14} {'Items':>6} {'Time (ms)':>10}")
+    for name, venue, item_count, elapsed in timings:
+        print(f"{name:<24} {venue:<14} {item_count:>6} {elapsed * 1000:>10.1f}")
+    slowest = max((elapsed for *_, elapsed in timings), default=0)
+    total = sum(elapsed for *_, elapsed in timings)
+    print(f"Wall {wall * 1000:.1f} ms with {max(1, min(args.workers, len(timings)))} workers "
+          f"(slowest file {slowest * 1000:.1f} ms, sum {total * 1000:.1f} ms)")
+    print_stage_totals(metrics)
+
+    extra = {'wall_seconds': wall, 'workers': max(1, min(args.workers, len(timings)))}
+    if args.tracemalloc:
+        current, peak = tracemalloc.get_traced_memory()
+        top = tracemalloc.take_snapshot().statistics('lineno')[:10]
+        tracemalloc.stop()
+        extra['peak_bytes'] = peak
+        print(f"\n📊 Peak traced memory {peak / 1024 / 1024:.1f} MB ({current / 1024 / 1024:.1f} MB still held)")
+        for stat in top:
+            frame = stat.traceback[0]
+            print(f"   {os.path.relpath(frame.filename)}:{frame.lineno:<6} {stat.size / 1024:>10.1f} KB {stat.count:>8} blocks")
+    if profiler:
+        if os.path.dirname(args.profile):
+            os.makedirs(os.path.dirname(args.profile), exist_ok=True)
+        profiler.dump_stats(args.profile)
+        print(f"\n📊 Profile written to {args.profile}; top functions by cumulative time:")
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(15)
+    export_metrics(args, metrics, **extra)
+
+    if args.watch:
+        watch(args, options, manifest, manifest_path, metrics)
+        return
 
     print("\n✅ All menus enhanced successfully!")
     print("\nNext steps:")
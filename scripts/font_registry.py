@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Font discovery for the image scripts.
+
+Fonts bundled in the repo (fonts/, public/fonts/) and the platform font
+directories (/usr/share/fonts and friends on Linux, /Library/Fonts on macOS)
+are scanned once. Each file's family and style names are read with PIL, and
+the resulting path index is cached in .cache/font-index.json. Later runs only
+stat the directories recorded in the cache and rescan if one of them changed.
+ImageFont objects are memoized per (file, size).
+
+    from font_registry import get_font
+    title_font = get_font(["Georgia", "serif"], 100)
+    button_font = get_font("serif", 50, weight=700)
+
+Running the module lists the index:
+
+    python3 scripts/font_registry.py
+    python3 scripts/font_registry.py --rescan
+"""
+
+import argparse
+import json
+import os
+import sys
+from functools import lru_cache
+
+from PIL import ImageFont
+
+from menu_io import atomic_write
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+INDEX_PATH = os.path.join(PROJECT_DIR, ".cache/font-index.json")
+INDEX_VERSION = 1
+
+FONT_DIRS = [
+    # Bundled with the repo, checked first
+    os.path.join(PROJECT_DIR, "fonts"),
+    os.path.join(PROJECT_DIR, "public/fonts"),
+    # Linux
+    os.path.expanduser("~/.local/share/fonts"),
+    os.path.expanduser("~/.fonts"),
+    "/usr/local/share/fonts",
+    "/usr/share/fonts",
+    # macOS
+    os.path.expanduser("~/Library/Fonts"),
+    "/Library/Fonts",
+    "/System/Library/Fonts",
+    # Windows
+    os.path.join(os.environ.get("WINDIR", "C:\\Windows"), "Fonts"),
+]
+
+FONT_EXTENSIONS = (".ttf", ".otf", ".ttc")
+
+# Generic names expand to the families tried in order
+GENERIC_FAMILIES = {
+    'serif': ["Georgia", "DejaVu Serif", "Liberation Serif", "Noto Serif", "Times New Roman"],
+    'sans-serif': ["Arial", "Helvetica", "DejaVu Sans", "Liberation Sans", "Noto Sans"],
+    'monospace': ["Menlo", "DejaVu Sans Mono", "Liberation Mono", "Courier New"],
+}
+
+# Style words -> CSS-like weights
+STYLE_WEIGHTS = {
+    'thin': 100, 'extralight': 200, 'ultralight': 200, 'light': 300, 'book': 400,
+    'regular': 400, 'normal': 400, 'roman': 400, 'medium': 500, 'semibold': 600,
+    'demibold': 600, 'bold': 700, 'extrabold': 800, 'ultrabold': 800, 'black': 900, 'heavy': 900,
+}
+
+def parse_style(style):
+    """(weight, italic) from a style name like "Bold Italic" or "SemiBold" """
+    compact = "".join(style.lower().replace('-', ' ').split())
+    italic = 'italic' in compact or 'oblique' in compact
+    # Longest match first so "semibold" is not read as "bold"
+    for name in sorted(STYLE_WEIGHTS, key=len, reverse=True):
+        if name in compact:
+            return STYLE_WEIGHTS[name], italic
+    return 400, italic
+
+def describe_font(path):
+    """Index entries for every face in a font file (collections hold several)"""
+    entries = []
+    for face_index in range(64):
+        try:
+            font = ImageFont.truetype(path, 12, index=face_index)
+        except OSError:
+            break
+        family, style = font.getname()
+        weight, italic = parse_style(style or "Regular")
+        entries.append({'family': family, 'style': style, 'weight': weight,
+                        'italic': italic, 'path': path, 'index': face_index})
+        if not path.lower().endswith('.ttc'):
+            break
+    return entries
+
+def scan(font_dirs):
+    """Walk the font directories; returns (faces, {directory: mtime})"""
+    faces, directories = [], {}
+    for root_dir in font_dirs:
+        for directory, _, files in os.walk(root_dir):
+            directories[directory] = os.stat(directory).st_mtime
+            for filename in sorted(files):
+                if filename.lower().endswith(FONT_EXTENSIONS):
+                    faces.extend(describe_font(os.path.join(directory, filename)))
+    return faces, directories
+
+def index_is_current(index, font_dirs):
+    if index.get('version') != INDEX_VERSION or index.get('roots') != font_dirs:
+        return False
+    for root_dir in font_dirs:
+        # A font directory that appeared since the last scan means new fonts
+        if os.path.isdir(root_dir) and root_dir not in index['directories']:
+            return False
+    for directory, mtime in index['directories'].items():
+        try:
+            if os.stat(directory).st_mtime != mtime:
+                return False
+        except OSError:
+            return False
+    return True
+
+@lru_cache(maxsize=None)
+def load_index(index_path=INDEX_PATH, rescan=False):
+    """The font index from the cache file, rescanning only when directories changed"""
+    font_dirs = list(FONT_DIRS)
+    if not rescan:
+        try:
+            with open(index_path, 'r') as f:
+                index = json.load(f)
+            if index_is_current(index, font_dirs):
+                return index
+        except (OSError, ValueError, KeyError):
+            pass
+
+    faces, directories = scan(font_dirs)
+    index = {'version': INDEX_VERSION, 'roots': font_dirs, 'directories': directories, 'faces': faces}
+    try:
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        atomic_write(index_path, json.dumps(index, indent=2).encode('utf-8'))
+    except OSError as e:
+        print(f"⚠️  Could not cache the font index at {index_path}: {e}", file=sys.stderr)
+    return index
+
+@lru_cache(maxsize=None)
+def faces_by_family():
+    families = {}
+    for face in load_index()['faces']:
+        families.setdefault(face['family'].lower(), []).append(face)
+    return families
+
+def expand_families(families):
+    names = [families] if isinstance(families, str) else list(families)
+    expanded = []
+    for name in names:
+        expanded.extend(GENERIC_FAMILIES.get(name.lower(), [name]))
+    return expanded
+
+def find_face(families, weight=400, italic=False):
+    """The closest face of the first installed family, or None"""
+    by_family = faces_by_family()
+    for family in expand_families(families):
+        faces = by_family.get(family.lower())
+        if faces:
+            return min(faces, key=lambda face: (face['italic'] != italic, abs(face['weight'] - weight)))
+    return None
+
+@lru_cache(maxsize=None)
+def _truetype(path, index, size):
+    return ImageFont.truetype(path, size, index=index)
+
+def get_font(families, size, weight=400, italic=False):
+    """
+    A memoized ImageFont for the first installed family in `families` (a name,
+    a generic like "serif", or a list of either). Falls back to PIL's default
+    font when nothing matches.
+    """
+    face = find_face(families, weight, italic)
+    if face is None:
+        return _default_font(size)
+    return _truetype(face['path'], face['index'], size)
+
+@lru_cache(maxsize=None)
+def _default_font(size):
+    print(f"⚠️  No matching font installed, using PIL's default font", file=sys.stderr)
+    try:
+        return ImageFont.load_default(size)
+    except TypeError:
+        # Pillow < 10.1 only has the fixed-size bitmap font
+        return ImageFont.load_default()
+
+def main():
+    parser = argparse.ArgumentParser(description="List the fonts the image scripts can use")
+    parser.add_argument('--rescan', action='store_true', help="ignore the cached index and rescan")
+    parser.add_argument('families', nargs='*', help="only show how these families resolve")
+    args = parser.parse_args()
+
+    index = load_index(rescan=args.rescan)
+    if args.families:
+        for family in args.families:
+            for weight in (400, 700):
+                face = find_face(family, weight)
+                resolved = f"{face['family']} {face['style']} ({face['path']})" if face else "not found"
+                print(f"{family} {weight}: {resolved}")
+        return
+
+    for face in sorted(index['faces'], key=lambda face: (face['family'], face['weight'], face['italic'])):
+        print(f"{face['family']:<28} {face['style']:<16} {face['path']}")
+    print(f"\n📊 {len(index['faces'])} faces in {len(index['directories'])} directories")
+
+if __name__ == "__main__":
+    main()
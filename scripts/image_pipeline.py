@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Responsive image derivatives.
+
+Every source photo is turned into a set of derivatives, one per (format,
+width) in FORMATS x WIDTHS, plus a tiny blurred placeholder that the page
+can inline as a data URI while the real image loads. Widths above the
+source width are dropped and the source width itself is added, so nothing
+is ever upscaled.
+
+Derivatives are content addressed: a file's name carries a hash of the
+source bytes and of every transform parameter (format, width, encoder
+settings, PIPELINE_VERSION), e.g.
+
+    public/img/gallery-12-640w-3f9a1c0d2b7e.webp
+
+so a derivative that already exists is by definition up to date and is
+never re-encoded, and the names can be served with an immutable cache
+header. A source is only decoded when at least one of its derivatives is
+missing, and then JPEGs are decoded straight at the reduced scale the
+largest derivative needs (Image.draft) and each smaller width is resampled
+from the previous one.
+"""
+
+import base64
+import hashlib
+import io
+import json
+import os
+
+from PIL import Image, ImageFilter, ImageOps
+
+from menu_io import atomic_write
+
+# Bump when the resampling or encoding changes so every derivative is rebuilt
+PIPELINE_VERSION = 1
+
+# Breakpoints for srcset; close to next.config's deviceSizes without the 4K tail
+WIDTHS = (320, 640, 960, 1280, 1920)
+
+# format -> (file extension, PIL format, encoder options); listed best first
+FORMATS = {
+    'avif': ('avif', 'AVIF', {'quality': 50, 'speed': 6}),
+    'webp': ('webp', 'WEBP', {'quality': 75, 'method': 6}),
+    'jpeg': ('jpg', 'JPEG', {'quality': 78, 'optimize': True, 'progressive': True}),
+}
+
+# Placeholder: a blurred thumbnail this wide, inlined as a WebP data URI (~200-400 bytes)
+PLACEHOLDER_WIDTH = 16
+PLACEHOLDER_OPTIONS = {'quality': 40, 'method': 6}
+
+def file_hash(path):
+    """Short content hash of a source image"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+def derivative_key(source_hash, fmt, width):
+    """Hash of the source and every parameter that shapes the derivative"""
+    params = json.dumps([PIPELINE_VERSION, source_hash, fmt, width, FORMATS[fmt][2]], sort_keys=True)
+    return hashlib.sha256(params.encode('utf-8')).hexdigest()[:12]
+
+def target_widths(source_width, widths=WIDTHS):
+    """Widths to render for a source: the breakpoints below it plus its own width"""
+    return sorted({width for width in widths if width < source_width} | {source_width})
+
+def plan(name, source_hash, source_size, formats, widths=WIDTHS):
+    """[(format, width, height, file name)] for one source, largest width first"""
+    source_width, source_height = source_size
+    outputs = []
+    for width in sorted(target_widths(source_width, widths), reverse=True):
+        height = max(1, round(source_height * width / source_width))
+        for fmt in formats:
+            extension = FORMATS[fmt][0]
+            outputs.append((fmt, width, height, f"{name}-{width}w-{derivative_key(source_hash, fmt, width)}.{extension}"))
+    return outputs
+
+def flatten(image):
+    """RGB copy of `image` with any transparency composited over white (for JPEG)"""
+    if image.mode == 'RGB':
+        return image
+    if 'A' in image.getbands() or 'transparency' in image.info:
+        rgba = image.convert('RGBA')
+        background = Image.new('RGB', rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+def encode(image, fmt):
+    extension, pil_format, options = FORMATS[fmt]
+    buffer = io.BytesIO()
+    (flatten(image) if pil_format == 'JPEG' else image).save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+def placeholder(image):
+    """Blurred PLACEHOLDER_WIDTH-wide thumbnail as a data URI"""
+    height = max(1, round(image.height * PLACEHOLDER_WIDTH / image.width))
+    thumb = image.resize((PLACEHOLDER_WIDTH, height), Image.Resampling.BOX).filter(ImageFilter.GaussianBlur(1))
+    buffer = io.BytesIO()
+    thumb.save(buffer, 'WEBP', **PLACEHOLDER_OPTIONS)
+    return "data:image/webp;base64," + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+def open_source(path, largest_width=None):
+    """Decode a source upright, at a reduced JPEG scale when only `largest_width` is needed"""
+    image = Image.open(path)
+    if largest_width and image.format == 'JPEG':
+        # libjpeg scales by 1/2, 1/4 or 1/8 while decoding, never below the requested size
+        orientation = image.getexif().get(0x0112, 1)
+        width, height = image.size
+        if orientation in (5, 6, 7, 8):
+            width, height = height, width
+        scale = largest_width / width
+        request = (round(width * scale), round(height * scale))
+        if orientation in (5, 6, 7, 8):
+            request = request[::-1]
+        image.draft('RGB', request)
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+    return image
+
+def source_size(path):
+    """Upright (width, height) of a source without decoding its pixels"""
+    with Image.open(path) as image:
+        width, height = image.size
+        if image.getexif().get(0x0112, 1) in (5, 6, 7, 8):
+            width, height = height, width
+    return width, height
+
+def build_derivatives(job):
+    """
+    Write the missing derivatives of one source. `job` holds the source
+    path, its URL, manifest name, content hash, the output directory, the
+    formats and the previous manifest entry. Returns (manifest entry,
+    number of files encoded, bytes written).
+    """
+    path, output_dir = job['path'], job['output_dir']
+    previous = job.get('previous') or {}
+    if previous.get('hash') == job['hash'] and previous.get('version') == PIPELINE_VERSION:
+        size = (previous['width'], previous['height'])
+    else:
+        size = source_size(path)
+    outputs = plan(job['name'], job['hash'], size, job['formats'], job.get('widths', WIDTHS))
+    missing = [output for output in outputs if not os.path.exists(os.path.join(output_dir, output[3]))]
+    blur = previous.get('placeholder') if previous.get('hash') == job['hash'] else None
+
+    encoded = written = 0
+    if missing or blur is None:
+        largest = max((width for _, width, _, _ in missing), default=PLACEHOLDER_WIDTH)
+        image = open_source(path, largest)
+        if blur is None:
+            blur = placeholder(image)
+        resized = {}
+        for fmt, width, height, file_name in missing:
+            if width not in resized:
+                # Resample from the smallest already-resized image that is still large enough
+                base = min((img for w, img in resized.items() if w > width), key=lambda img: img.width,
+                           default=image)
+                resized[width] = base if base.size == (width, height) else base.resize(
+                    (width, height), Image.Resampling.LANCZOS, reducing_gap=3.0)
+            data = encode(resized[width], fmt)
+            atomic_write(os.path.join(output_dir, file_name), data)
+            encoded += 1
+            written += len(data)
+        image.close()
+
+    sources = {fmt: [] for fmt in job['formats']}
+    for fmt, width, height, file_name in sorted(outputs, key=lambda output: output[1]):
+        sources[fmt].append({
+            'width': width,
+            'src': f"{job['url_prefix']}/{file_name}",
+            'bytes': os.path.getsize(os.path.join(output_dir, file_name)),
+        })
+    entry = {
+        'hash': job['hash'],
+        'version': PIPELINE_VERSION,
+        'width': size[0],
+        'height': size[1],
+        'placeholder': blur,
+        'sources': sources,
+    }
+    return entry, encoded, written
+
+def srcset(entry, fmt):
+    """The srcset attribute for one format of a manifest entry"""
+    return ", ".join(f"{source['src']} {source['width']}w" for source in entry['sources'][fmt])
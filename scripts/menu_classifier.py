@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Single-pass keyword classifier for dietary, allergen and spice flags.
+
+Every keyword from every set is compiled into one word-boundary regex whose
+alternation is factored as a trie, so scanning an item costs one pass over
+its text no matter how many keywords are loaded. Keywords match whole words
+only (with an optional plural "s"/"es"), and spaces or hyphens inside a
+keyword match any run of whitespace or hyphens ("peri peri" == "peri-peri").
+
+Keyword sets can be overridden with a JSON file of {flag: [keywords]}.
+"""
+
+import json
+import re
+
+# Allergen flags use the same labels as the `allergens` field in the menus
+ALLERGEN_FLAGS = ("dairy", "eggs", "gluten", "nuts", "shellfish")
+
+DEFAULT_KEYWORDS = {
+    "onion-garlic": [
+        "onion", "pyaz", "pyaaz", "kanda", "shallot", "leek", "scallion", "chive",
+        "garlic", "lahsun", "lahsuni", "lehsun", "lehsuni", "lasun", "lasuni", "lasooni",
+    ],
+    "root-vegetable": [
+        "potato", "aloo", "alu", "sweet potato", "shakarkandi", "carrot", "gajar",
+        "beetroot", "beet", "radish", "mooli", "turnip", "shalgam", "yam", "arbi",
+        "ginger", "adrak", "lotus stem", "kamal kakdi", "fries",
+    ],
+    "fungi": ["mushroom", "shiitake", "morel", "gucchi", "truffle"],
+    "dairy": [
+        "milk", "cream", "creamy", "cheese", "cream cheese", "cottage cheese", "paneer", "butter",
+        "ghee", "yogurt", "yoghurt", "curd", "dahi", "malai", "khoya", "mawa", "rabri",
+        "ricotta", "mozzarella", "parmesan", "mascarpone", "burrata", "feta", "cheddar",
+        "makhani", "latte", "cappuccino", "shake", "frappe", "kulfi", "ice cream",
+    ],
+    "eggs": ["egg", "omelette", "omelet", "mayo", "mayonnaise", "meringue", "egg white"],
+    "gluten": [
+        "wheat", "flour", "maida", "atta", "semolina", "sooji", "suji", "rava", "barley",
+        "bread", "naan", "roti", "paratha", "kulcha", "bun", "bao", "toast", "bruschetta",
+        "croissant", "pasta", "spaghetti", "penne", "fettuccine", "linguine", "lasagna",
+        "ravioli", "noodle", "ramen", "udon", "pizza", "tempura", "panko", "crumb",
+        "gyoza", "dumpling", "wonton", "dimsum", "dim sum", "momo", "cake", "pastry",
+        "cookie", "brownie", "waffle", "pancake", "tortilla", "taco", "burger",
+        "sandwich", "vol au vent", "puff", "beer", "lager", "stout",
+    ],
+    "nuts": [
+        "nut", "cashew", "kaju", "almond", "badam", "pistachio", "pista", "walnut",
+        "akhrot", "peanut", "hazelnut", "pecan", "macadamia", "praline", "nutella",
+        "dry nuts", "amaretto", "frangelico",
+    ],
+    "shellfish": [
+        "prawn", "shrimp", "jhinga", "crab", "lobster", "scallop", "oyster", "mussel",
+        "clam", "squid", "calamari", "octopus",
+    ],
+    "spicy": [
+        "chili", "chilli", "chile", "mirchi", "spicy", "schezwan", "szechuan", "sichuan",
+        "hunan", "peri peri", "piri piri", "angara", "jalapeno", "sriracha", "habanero",
+        "kolhapuri", "chettinad", "laal maas", "vindaloo", "togarashi", "gochujang",
+    ],
+}
+
+# Flags that rule an item out of each dietary style
+JAIN_EXCLUDED = frozenset({"onion-garlic", "root-vegetable", "fungi", "eggs"})
+SATVIK_EXCLUDED = frozenset({"onion-garlic", "fungi", "eggs"})
+
+_SEPARATOR = re.compile(r"[\s\-]+")
+# Joins the texts of one item for the single regex pass; a keyword's separator
+# cannot match it, so no multi-word keyword spans two texts
+_TEXT_BOUNDARY = " | "
+
+def normalize_keyword(keyword):
+    return _SEPARATOR.sub(" ", keyword.strip().lower())
+
+def _trie_pattern(node):
+    """Render a character trie as a regex with shared prefixes factored out"""
+    terminal = "" in node
+    branches = []
+    for char in sorted(key for key in node if key != ""):
+        atom = r"[\s\-]+" if char == " " else re.escape(char)
+        branches.append(atom + _trie_pattern(node[char]))
+
+    if not branches:
+        return ""
+    if len(branches) == 1 and not terminal:
+        return branches[0]
+    pattern = "(?:" + "|".join(branches) + ")"
+    return pattern + "?" if terminal else pattern
+
+class KeywordClassifier:
+    """Map free text to the set of flags whose keywords it mentions"""
+
+    def __init__(self, keyword_sets):
+        self.keyword_flags = {}
+        for flag, keywords in keyword_sets.items():
+            for keyword in keywords:
+                key = normalize_keyword(keyword)
+                if key:
+                    self.keyword_flags.setdefault(key, set()).add(flag)
+        self.keyword_flags = {key: frozenset(flags) for key, flags in self.keyword_flags.items()}
+        self.flags = frozenset(flag for flags in self.keyword_flags.values() for flag in flags)
+
+        trie = {}
+        for key in self.keyword_flags:
+            node = trie
+            for char in key:
+                node = node.setdefault(char, {})
+            node[""] = True
+        # Group 1 is the keyword itself; a trailing plural is allowed but not captured
+        self.pattern = re.compile(r"\b(" + _trie_pattern(trie) + r")(?:e?s)?\b", re.IGNORECASE)
+
+    @classmethod
+    def from_json(cls, path):
+        """Load keyword sets from a JSON file of {flag: [keywords]}"""
+        with open(path, 'r') as f:
+            return cls(json.load(f))
+
+    def __len__(self):
+        return len(self.keyword_flags)
+
+    def classify(self, *texts):
+        """Return every flag mentioned in the given texts, in one regex pass"""
+        text = _TEXT_BOUNDARY.join(text for text in texts if text)
+        found = set()
+        for match in self.pattern.finditer(text):
+            found |= self.keyword_flags[normalize_keyword(match.group(1))]
+        return found
+
+    def classify_item(self, item):
+        return self.classify(item.get('name', ''), item.get('description', ''))
+
+def allergens_from_flags(flags):
+    return sorted(flag for flag in ALLERGEN_FLAGS if flag in flags)
+
+DEFAULT_CLASSIFIER = KeywordClassifier(DEFAULT_KEYWORDS)
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Columnar, string-interned encoding of an enhanced menu with lazy
+per-category decoding.
+
+File layout (all integers little-endian):
+
+    0   4 bytes   magic b"AMC1"
+    4   u32       header length H
+    8   H bytes   header, UTF-8 JSON
+    8+H ...       category blocks, UTF-8 JSON, back to back
+
+The header carries the menu-level fields, the shared string table, the item
+"shapes" (ordered field lists, so key order survives the round trip), the
+encoding of each column and an offset table locating every category block.
+A client reads the header once, then fetches (e.g. with an HTTP Range
+request) and decodes only the category it needs.
+
+Column encodings:
+    str      index into the string table
+    strlist  list of indices into the string table
+    id       [format index, sequence] pairs: "food-app-007" -> ("food-app-{:03d}", 7)
+    raw      the JSON value itself (prices and other numbers stay integer arrays)
+
+Usage:
+    python3 scripts/menu_columnar.py src/data/menus/food-enhanced.json [...]
+"""
+
+import argparse
+import gzip
+import json
+import os
+import re
+import struct
+import time
+
+from menu_io import atomic_write
+
+MAGIC = b"AMC1"
+FORMAT_VERSION = 1
+_PREAMBLE = struct.Struct("<4sI")
+_ID = re.compile(r"^(.*?)(\d+)$")
+
+def _dumps(value):
+    return json.dumps(value, separators=(',', ':'), ensure_ascii=False)
+
+def _id_format(value):
+    """'food-app-007' -> ('food-app-{:03d}', 7), or None if it would not round-trip"""
+    match = _ID.match(value) if isinstance(value, str) else None
+    if match is None:
+        return None
+    prefix, digits = match.groups()
+    fmt = prefix.replace("{", "{{").replace("}", "}}") + "{:0%dd}" % len(digits)
+    return (fmt, int(digits)) if fmt.format(int(digits)) == value else None
+
+def _column_encoding(field, values):
+    """Choose an encoding for one column from every value it holds in the venue"""
+    if field == "id" and all(_id_format(value) for value in values):
+        return "id"
+    if all(isinstance(value, str) for value in values):
+        # Intern repetitive strings (cuisine, category, drinkType...), keep prose raw
+        return "str" if len(set(values)) * 2 <= len(values) else "raw"
+    if all(isinstance(value, list) and all(isinstance(entry, str) for entry in value) for value in values):
+        return "strlist"
+    return "raw"
+
+class _Interner:
+    def __init__(self):
+        self.strings = []
+        self.index = {}
+
+    def __call__(self, value):
+        position = self.index.get(value)
+        if position is None:
+            position = self.index[value] = len(self.strings)
+            self.strings.append(value)
+        return position
+
+def encode_menu(menu_data):
+    """Encode an enhanced menu into the columnar container (bytes)"""
+    categories = menu_data['categories']
+
+    # Pass 1: pick one encoding per column across the whole venue
+    column_values = {}
+    for category in categories:
+        for item in category['items']:
+            for field, value in item.items():
+                column_values.setdefault(field, []).append(value)
+    encodings = {field: _column_encoding(field, values) for field, values in column_values.items()}
+
+    # Pass 2: encode every category into its own block
+    intern = _Interner()
+    shapes, shape_index = [], {}
+    blocks, table = [], []
+    offset = 0
+    for category in categories:
+        item_shapes = []
+        columns = {}
+        for item in category['items']:
+            shape = tuple(item)
+            if shape not in shape_index:
+                shape_index[shape] = len(shapes)
+                shapes.append([intern(field) for field in shape])
+            item_shapes.append(shape_index[shape])
+
+            for field, value in item.items():
+                encoding = encodings[field]
+                column = columns.setdefault(field, [])
+                if encoding == "str":
+                    column.append(intern(value))
+                elif encoding == "strlist":
+                    column.append([intern(entry) for entry in value])
+                elif encoding == "id":
+                    fmt, seq = _id_format(value)
+                    column.extend((intern(fmt), seq))
+                else:
+                    column.append(value)
+
+        block = _dumps({'shapes': item_shapes, 'columns': columns}).encode('utf-8')
+        blocks.append(block)
+        table.append({
+            'fields': {key: value for key, value in category.items() if key != 'items'},
+            'keys': list(category),
+            'count': len(category['items']),
+            'offset': offset,
+            'length': len(block),
+        })
+        offset += len(block)
+
+    header = {
+        'version': FORMAT_VERSION,
+        'keys': list(menu_data),
+        'menu': {key: value for key, value in menu_data.items() if key != 'categories'},
+        'strings': intern.strings,
+        'shapes': shapes,
+        'encodings': encodings,
+        'categories': table,
+    }
+    header_bytes = _dumps(header).encode('utf-8')
+    return _PREAMBLE.pack(MAGIC, len(header_bytes)) + header_bytes + b"".join(blocks)
+
+def read_header(data):
+    """Decode just the header; returns (header, offset of the first block)"""
+    magic, length = _PREAMBLE.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a columnar menu file")
+    start = _PREAMBLE.size
+    return json.loads(data[start:start + length]), start + length
+
+def decode_block(header, block):
+    """Rebuild the items of one category from its block bytes"""
+    strings = header['strings']
+    encodings = header['encodings']
+    decoded = json.loads(block)
+    cursors = {}
+    items = []
+    for shape in decoded['shapes']:
+        item = {}
+        for field_index in header['shapes'][shape]:
+            field = strings[field_index]
+            column = decoded['columns'][field]
+            position = cursors.get(field, 0)
+            encoding = encodings[field]
+            if encoding == "str":
+                item[field] = strings[column[position]]
+            elif encoding == "strlist":
+                item[field] = [strings[entry] for entry in column[position]]
+            elif encoding == "id":
+                item[field] = strings[column[position]].format(column[position + 1])
+                position += 1
+            else:
+                item[field] = column[position]
+            cursors[field] = position + 1
+        items.append(item)
+    return items
+
+def decode_category(data, index, header=None, blocks_start=None):
+    """Decode a single category without touching the other blocks"""
+    if header is None:
+        header, blocks_start = read_header(data)
+    entry = header['categories'][index]
+    start = blocks_start + entry['offset']
+    items = decode_block(header, data[start:start + entry['length']])
+    return {key: (items if key == 'items' else entry['fields'][key]) for key in entry['keys']}
+
+def decode_menu(data):
+    """Decode the whole container back into the enhanced menu dict"""
+    header, blocks_start = read_header(data)
+    categories = [decode_category(data, i, header, blocks_start) for i in range(len(header['categories']))]
+    return {key: (categories if key == 'categories' else header['menu'][key]) for key in header['keys']}
+
+def _best_of(fn, repeat=20):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def compare(json_bytes, columnar_bytes):
+    """Size and parse-time comparison between the JSON and columnar forms"""
+    header, blocks_start = read_header(columnar_bytes)
+    first = header['categories'][0] if header['categories'] else None
+    first_end = blocks_start + (first['offset'] + first['length'] if first else 0)
+    return {
+        'jsonBytes': len(json_bytes),
+        'jsonGzipBytes': len(gzip.compress(json_bytes)),
+        'columnarBytes': len(columnar_bytes),
+        'columnarGzipBytes': len(gzip.compress(columnar_bytes)),
+        # Bytes a client needs before it can render the first category
+        'firstCategoryBytes': first_end,
+        'jsonParseMs': _best_of(lambda: json.loads(json_bytes)),
+        'columnarDecodeMs': _best_of(lambda: decode_menu(columnar_bytes)),
+        'firstCategoryDecodeMs': _best_of(lambda: decode_category(columnar_bytes[:first_end], 0)) if first else 0.0,
+    }
+
+def print_comparison(name, stats):
+    print(f"   {name}: JSON {stats['jsonBytes'] / 1024:.1f} KB ({stats['jsonGzipBytes'] / 1024:.1f} KB gz), "
+          f"columnar {stats['columnarBytes'] / 1024:.1f} KB ({stats['columnarGzipBytes'] / 1024:.1f} KB gz), "
+          f"first category {stats['firstCategoryBytes'] / 1024:.1f} KB")
+    print(f"   {' ' * len(name)}  parse {stats['jsonParseMs']:.2f} ms JSON vs {stats['columnarDecodeMs']:.2f} ms "
+          f"columnar, first category {stats['firstCategoryDecodeMs']:.2f} ms")
+
+def columnar_path(enhanced_path):
+    """food-enhanced.json -> food-columnar.bin"""
+    base = enhanced_path[:-len(".json")]
+    if base.endswith("-enhanced"):
+        base = base[:-len("-enhanced")]
+    return base + "-columnar.bin"
+
+def main():
+    parser = argparse.ArgumentParser(description="Write columnar versions of enhanced menus and compare them with JSON")
+    parser.add_argument('files', nargs='+', help="enhanced menu JSON files")
+    args = parser.parse_args()
+
+    for path in args.files:
+        with open(path, 'rb') as f:
+            json_bytes = f.read()
+        menu_data = json.loads(json_bytes)
+        columnar_bytes = encode_menu(menu_data)
+        if decode_menu(columnar_bytes) != menu_data:
+            raise SystemExit(f"❌ Columnar round trip failed for {path}")
+
+        output_path = columnar_path(path)
+        atomic_write(output_path, columnar_bytes)
+        print(f"✓ Created {os.path.basename(output_path)}")
+        print_comparison(os.path.basename(path), compare(json_bytes, columnar_bytes))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Patches between two versions of a menu, and the published patch chain.
+
+diff_menus() joins both versions by item id in one pass (a dict of the old
+items, probed once per new item) and records only what changed:
+
+    {
+      "format": 1,
+      "from": "<hash of old>", "to": "<hash of new>",
+      "menu":       {field patch},              top-level fields, not categories
+      "categories": {id: {field patch}},        changed or added category headers
+      "removedCategories": [id, ...],
+      "categoryOrder": [id, ...],               only when categories moved/came/went
+      "items": {
+        "added":   {key: item},
+        "removed": [key, ...],
+        "changed": {key: {field patch}}
+      },
+      "layout": {category id: [key, ...]}       item order, only where it changed
+    }
+
+A field patch is {"set": {field: value}, "unset": [field], "keys": [...]},
+each part present only when needed; "keys" is the full field order and is
+written only when the new order is not simply "old order minus unset, plus
+new fields at the end". Item keys are the item ids; a repeated id gets
+"#2", "#3", ... in document order, and an item without an id is keyed by
+category and name. apply_patch() replays a patch on the old version and
+gives a menu that serializes byte for byte like the new one.
+
+publish_version() keeps the client-facing chain for one menu:
+
+    <publish dir>/<menu>/version.json     {"version": 7, "hash": ..., "menu": "v7.json",
+                                           "patches": [{"from": 6, "to": 7, "path": ...}, ...]}
+    <publish dir>/<menu>/v7.json          the latest full menu
+    <publish dir>/<menu>/patches/6-7.json
+
+A client holding version 5 fetches patches 5-6 and 6-7 and checks the
+result against "hash"; one older than the chain fetches the full menu.
+
+Usage:
+    python3 scripts/menu_diff.py diff old.json new.json -o patch.json
+    python3 scripts/menu_diff.py apply old.json patch.json -o new.json
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+
+from menu_io import atomic_write, write_if_changed
+
+FORMAT_VERSION = 1
+# Patches kept per menu; clients further behind download the full menu
+PATCH_CHAIN_LIMIT = 30
+
+def serialize_menu(menu_data):
+    """Serialize a menu exactly the way the enhanced files are written"""
+    return json.dumps(menu_data, indent=2).encode('utf-8')
+
+def menu_hash(data):
+    """Short content hash of serialized menu bytes"""
+    return hashlib.sha256(data).hexdigest()[:16]
+
+def serialize_patch(patch):
+    return json.dumps(patch, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def keyed_items(menu_data):
+    """(category id, join key, item) for every item in document order"""
+    seen = {}
+    for category in menu_data.get('categories', []):
+        for item in category.get('items', []):
+            key = item.get('id') or f"{category['id']}/{item.get('name')}"
+            seen[key] = seen.get(key, 0) + 1
+            if seen[key] > 1:
+                key = f"{key}#{seen[key]}"
+            yield category['id'], key, item
+
+def identical(a, b):
+    """Equal and serializing the same: key order and int/float/bool type matter, unlike =="""
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, dict):
+        return list(a) == list(b) and all(identical(value, b[key]) for key, value in a.items())
+    if isinstance(a, list):
+        return len(a) == len(b) and all(identical(x, y) for x, y in zip(a, b))
+    return a == b
+
+def _patched_keys(old, patch):
+    removed = set(patch.get('unset', ()))
+    keys = [key for key in old if key not in removed]
+    keys.extend(key for key in patch.get('set', {}) if key not in old)
+    return keys
+
+def diff_fields(old, new, skip=()):
+    """Field patch turning dict `old` into `new`; values under `skip` are left to the caller"""
+    patch = {}
+    changed = {key: value for key, value in new.items()
+               if key not in skip and (key not in old or not identical(old[key], value))}
+    removed = [key for key in old if key not in new]
+    if changed:
+        patch['set'] = changed
+    if removed:
+        patch['unset'] = removed
+    if list(new) != _patched_keys(old, patch):
+        patch['keys'] = list(new)
+    return patch
+
+def apply_fields(old, patch, values=None):
+    """Apply a field patch; `values` supplies the fields diff_fields skipped"""
+    changed = patch.get('set', {})
+    values = values or {}
+    result = {}
+    for key in patch.get('keys') or _patched_keys(old, patch):
+        if key in values:
+            result[key] = values[key]
+        elif key in changed:
+            result[key] = changed[key]
+        else:
+            result[key] = old[key]
+    return result
+
+def diff_menus(old, new, old_hash=None, new_hash=None):
+    """
+    Patch from menu `old` to menu `new` (parsed JSON). Pass the menu_hash()
+    of each version's bytes when they are at hand to skip re-serializing.
+    """
+    old_items = {}
+    old_layout = {category['id']: [] for category in old.get('categories', [])}
+    for category_id, key, item in keyed_items(old):
+        old_items[key] = item
+        old_layout[category_id].append(key)
+
+    added, changed = {}, {}
+    new_layout = {category['id']: [] for category in new.get('categories', [])}
+    for category_id, key, item in keyed_items(new):
+        new_layout[category_id].append(key)
+        previous = old_items.pop(key, None)
+        if previous is None:
+            added[key] = item
+        elif not identical(previous, item):
+            changed[key] = diff_fields(previous, item)
+
+    old_categories = {category['id']: category for category in old.get('categories', [])}
+    new_order = [category['id'] for category in new.get('categories', [])]
+    categories = {}
+    for category in new.get('categories', []):
+        category_patch = diff_fields(old_categories.get(category['id'], {}), category, skip=('items',))
+        if category_patch:
+            categories[category['id']] = category_patch
+
+    patch = {
+        'format': FORMAT_VERSION,
+        'from': old_hash or menu_hash(serialize_menu(old)),
+        'to': new_hash or menu_hash(serialize_menu(new)),
+    }
+    menu_patch = diff_fields(old, new, skip=('categories',))
+    if menu_patch:
+        patch['menu'] = menu_patch
+    if categories:
+        patch['categories'] = categories
+    kept = set(new_order)
+    removed_categories = [category_id for category_id in old_categories if category_id not in kept]
+    if removed_categories:
+        patch['removedCategories'] = removed_categories
+    if new_order != [category_id for category_id in old_categories if category_id not in removed_categories]:
+        patch['categoryOrder'] = new_order
+
+    items = {}
+    if added:
+        items['added'] = added
+    if old_items:
+        # Whatever the join did not consume is gone from the new version
+        items['removed'] = list(old_items)
+    if changed:
+        items['changed'] = changed
+    if items:
+        patch['items'] = items
+    layout = {category_id: keys for category_id, keys in new_layout.items()
+              if old_layout.get(category_id) != keys}
+    if layout:
+        patch['layout'] = layout
+    return patch
+
+def apply_patch(old, patch):
+    """The new menu from `old` and a diff_menus() patch (shares unchanged values with `old`)"""
+    if patch.get('format') != FORMAT_VERSION:
+        raise ValueError(f"unsupported patch format {patch.get('format')!r}")
+    items = {}
+    old_layout = {category['id']: [] for category in old.get('categories', [])}
+    for category_id, key, item in keyed_items(old):
+        items[key] = item
+        old_layout[category_id].append(key)
+
+    item_patch = patch.get('items', {})
+    for key in item_patch.get('removed', ()):
+        del items[key]
+    for key, fields in item_patch.get('changed', {}).items():
+        items[key] = apply_fields(items[key], fields)
+    items.update(item_patch.get('added', {}))
+
+    old_categories = {category['id']: category for category in old.get('categories', [])}
+    removed = set(patch.get('removedCategories', ()))
+    order = patch.get('categoryOrder') or [category_id for category_id in old_categories
+                                           if category_id not in removed]
+    layout = patch.get('layout', {})
+    categories = []
+    for category_id in order:
+        keys = layout.get(category_id, old_layout.get(category_id, []))
+        categories.append(apply_fields(old_categories.get(category_id, {}),
+                                       patch.get('categories', {}).get(category_id, {}),
+                                       {'items': [items[key] for key in keys]}))
+    return apply_fields(old, patch.get('menu', {}), {'categories': categories})
+
+def patch_summary(patch):
+    items = patch.get('items', {})
+    return (f"{len(items.get('added', {}))} added, {len(items.get('removed', []))} removed, "
+            f"{len(items.get('changed', {}))} changed items; {len(patch.get('categories', {}))} category headers, "
+            f"{len(patch.get('layout', {}))} reordered categories")
+
+def load_version(menu_dir):
+    try:
+        with open(os.path.join(menu_dir, "version.json"), 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def publish_version(menu_dir, menu_bytes):
+    """
+    Publish serialized menu bytes as the next version under menu_dir, with a
+    patch from the previous version. Returns (version, patch or None); the
+    version is unchanged when the menu is.
+    """
+    digest = menu_hash(menu_bytes)
+    current = load_version(menu_dir)
+    if current is not None and current['hash'] == digest:
+        return current['version'], None
+
+    os.makedirs(os.path.join(menu_dir, "patches"), exist_ok=True)
+    patches, expired = [], []
+    patch = None
+    version = 1
+    if current is not None:
+        version = current['version'] + 1
+        try:
+            with open(os.path.join(menu_dir, current['menu']), 'rb') as f:
+                previous_bytes = f.read()
+        except FileNotFoundError:
+            previous_bytes = None
+        if previous_bytes is not None and menu_hash(previous_bytes) == current['hash']:
+            patch = diff_menus(json.loads(previous_bytes), json.loads(menu_bytes), current['hash'], digest)
+            patch_bytes = serialize_patch(patch)
+            patch_path = f"patches/{current['version']}-{version}.json"
+            atomic_write(os.path.join(menu_dir, patch_path), patch_bytes)
+            patches = current['patches'] + [{'from': current['version'], 'to': version,
+                                             'path': patch_path, 'bytes': len(patch_bytes)}]
+            expired, patches = patches[:-PATCH_CHAIN_LIMIT], patches[-PATCH_CHAIN_LIMIT:]
+        else:
+            # A missing or edited snapshot breaks the chain; clients refetch the full menu
+            expired = current['patches']
+    for entry in expired:
+        try:
+            os.remove(os.path.join(menu_dir, entry['path']))
+        except FileNotFoundError:
+            pass
+
+    snapshot = f"v{version}.json"
+    atomic_write(os.path.join(menu_dir, snapshot), menu_bytes)
+    write_if_changed(os.path.join(menu_dir, "version.json"), json.dumps(
+        {'version': version, 'hash': digest, 'menu': snapshot, 'bytes': len(menu_bytes), 'patches': patches},
+        indent=2).encode('utf-8'))
+    if current is not None and current['menu'] != snapshot:
+        try:
+            os.remove(os.path.join(menu_dir, current['menu']))
+        except FileNotFoundError:
+            pass
+    return version, patch
+
+def read_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def write_output(path, data):
+    if path:
+        atomic_write(path, data)
+    else:
+        sys.stdout.buffer.write(data + b"\n")
+
+def main():
+    parser = argparse.ArgumentParser(description="Diff two menu versions or apply a patch")
+    commands = parser.add_subparsers(dest='command', required=True)
+    diff_parser = commands.add_parser('diff', help="write the patch from OLD to NEW")
+    diff_parser.add_argument('old')
+    diff_parser.add_argument('new')
+    diff_parser.add_argument('-o', '--output', help="patch file (default: stdout)")
+    apply_parser = commands.add_parser('apply', help="apply PATCH to BASE")
+    apply_parser.add_argument('base')
+    apply_parser.add_argument('patch')
+    apply_parser.add_argument('-o', '--output', help="patched menu (default: stdout)")
+    args = parser.parse_args()
+
+    if args.command == 'diff':
+        with open(args.new, 'rb') as f:
+            new_bytes = f.read()
+        patch = diff_menus(read_json(args.old), json.loads(new_bytes))
+        patch_bytes = serialize_patch(patch)
+        write_output(args.output, patch_bytes)
+        print(f"📊 {patch_summary(patch)}; {len(patch_bytes) / 1024:.1f} KB patch "
+              f"vs {len(new_bytes) / 1024:.1f} KB menu", file=sys.stderr)
+        return
+
+    patch = read_json(args.patch)
+    with open(args.base, 'rb') as f:
+        base_bytes = f.read()
+    if menu_hash(base_bytes) != patch['from']:
+        print(f"⚠️  {args.base} is not the version this patch was made from", file=sys.stderr)
+    menu_bytes = serialize_menu(apply_patch(json.loads(base_bytes), patch))
+    if menu_hash(menu_bytes) != patch['to']:
+        sys.exit("❌ Patched menu does not match the patch's target hash")
+    write_output(args.output, menu_bytes)
+
+if __name__ == "__main__":
+    main()
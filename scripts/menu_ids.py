@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Menu item ID index and allocator.
+
+Item ids look like "<prefix>-<sequence>" ("food-app-007", "bar-malt-019").
+MenuIdIndex scans a menu once, records each category's prefix and the
+highest sequence number used per prefix anywhere in the menu, and flags
+duplicate or malformed ids up front. Allocating new ids is then O(1) each.
+
+It doubles as a JSON-emitting CLI so the JS scripts can use it too:
+
+    python3 scripts/menu_ids.py src/data/menus/food.json
+    python3 scripts/menu_ids.py src/data/menus/food.json --allocate appetizers=3 --allocate breads=1
+
+    // from node
+    const { allocated } = JSON.parse(execFileSync('python3',
+        ['scripts/menu_ids.py', menuPath, '--allocate', 'appetizers=3']));
+"""
+
+import argparse
+import json
+import re
+import sys
+from collections import Counter
+
+ID_PATTERN = re.compile(r"^(?P<prefix>[a-z0-9]+(?:-[a-z0-9]+)*)-(?P<seq>\d+)$")
+DEFAULT_WIDTH = 3
+
+class MenuIdIndex:
+    """One pass over a menu's item ids; allocates fresh ids without rescanning"""
+
+    def __init__(self, menu):
+        self.venue = menu.get('venue', 'menu')
+        self.category_prefixes = {}
+        self.max_seq = {}
+        self.widths = {}
+        self.ids = set()
+        self.duplicates = []
+        self.malformed = []
+        self.mixed_prefixes = {}
+
+        for category in menu['categories']:
+            prefixes = Counter()
+            for item in category['items']:
+                item_id = item.get('id')
+                if item_id in self.ids:
+                    self.duplicates.append(item_id)
+                self.ids.add(item_id)
+
+                match = ID_PATTERN.match(item_id) if isinstance(item_id, str) else None
+                if match is None:
+                    self.malformed.append((category['id'], item_id))
+                    continue
+                prefix, seq = match.group('prefix'), match.group('seq')
+                prefixes[prefix] += 1
+                self.max_seq[prefix] = max(self.max_seq.get(prefix, 0), int(seq))
+                self.widths.setdefault(prefix, len(seq))
+
+            if prefixes:
+                # Most common prefix wins; Counter keeps first-seen order on ties
+                self.category_prefixes[category['id']] = prefixes.most_common(1)[0][0]
+            if len(prefixes) > 1:
+                self.mixed_prefixes[category['id']] = sorted(prefixes)
+
+    def prefix_for(self, category_id):
+        if category_id in self.category_prefixes:
+            return self.category_prefixes[category_id]
+        if len(self.max_seq) == 1:
+            # Menus numbered from one shared sequence ("nye-001") keep using it
+            return next(iter(self.max_seq))
+        return f"{self.venue}-{category_id}"
+
+    def reserve(self, item_id):
+        """Claim a given id; False if it is already taken. Later allocations continue after it."""
+        if item_id in self.ids:
+            return False
+        self.ids.add(item_id)
+        match = ID_PATTERN.match(item_id)
+        if match is not None:
+            prefix, seq = match.group('prefix'), match.group('seq')
+            self.max_seq[prefix] = max(self.max_seq.get(prefix, 0), int(seq))
+            self.widths.setdefault(prefix, len(seq))
+        return True
+
+    def allocate(self, category_id, count=1):
+        """Reserve `count` new ids for a category"""
+        prefix = self.prefix_for(category_id)
+        width = self.widths.get(prefix, DEFAULT_WIDTH)
+        allocated = []
+        seq = self.max_seq.get(prefix, 0)
+        while len(allocated) < count:
+            seq += 1
+            item_id = f"{prefix}-{str(seq).zfill(width)}"
+            # Only a reserved id written at another width can already be taken
+            if item_id not in self.ids:
+                allocated.append(item_id)
+        self.max_seq[prefix] = seq
+        self.ids.update(allocated)
+        return allocated
+
+    def next_id(self, category_id):
+        return self.allocate(category_id)[0]
+
+    def problems(self):
+        """Human readable descriptions of duplicate, malformed and mixed ids"""
+        problems = [f"duplicate id {item_id}" for item_id in self.duplicates]
+        problems += [f"malformed id {item_id!r} in {category_id}" for category_id, item_id in self.malformed]
+        problems += [
+            f"mixed id prefixes in {category_id}: {', '.join(prefixes)}"
+            for category_id, prefixes in self.mixed_prefixes.items()
+        ]
+        return problems
+
+    def to_dict(self):
+        return {
+            'venue': self.venue,
+            'categories': {
+                category_id: {'prefix': prefix, 'maxSeq': self.max_seq[prefix]}
+                for category_id, prefix in self.category_prefixes.items()
+            },
+            'duplicates': self.duplicates,
+            'malformed': [{'category': category_id, 'id': item_id} for category_id, item_id in self.malformed],
+            'mixedPrefixes': self.mixed_prefixes,
+        }
+
+def parse_allocation(value):
+    category_id, _, count = value.partition('=')
+    if not category_id:
+        raise argparse.ArgumentTypeError(f"expected CATEGORY[=COUNT], got {value!r}")
+    try:
+        return category_id, int(count or 1)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"count must be an integer in {value!r}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Index menu item ids and allocate new ones (JSON output)")
+    parser.add_argument('menu', help="path to a menu JSON file")
+    parser.add_argument('--allocate', action='append', default=[], type=parse_allocation,
+                        metavar='CATEGORY[=COUNT]', help="allocate COUNT new ids in CATEGORY (repeatable)")
+    parser.add_argument('--strict', action='store_true',
+                        help="exit with status 1 if duplicate or malformed ids are found")
+    args = parser.parse_args()
+
+    with open(args.menu, 'r') as f:
+        index = MenuIdIndex(json.load(f))
+
+    result = index.to_dict()
+    result['allocated'] = {}
+    for category_id, count in args.allocate:
+        result['allocated'].setdefault(category_id, []).extend(index.allocate(category_id, count))
+
+    json.dump(result, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    if args.strict and (index.duplicates or index.malformed):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Precomputed search index for an enhanced menu.
+
+The index is a compact JSON document the menu page can load once and answer
+filters from without scanning every item:
+
+    items       item ids; every other list refers to items by position
+    categories  {category id: [first position, end position)}
+    facets      inverted index {facet: {value: [positions]}} for tags,
+                cuisine, subcuisine, dietary, allergens, spiceLevel,
+                drinkType and beverageType
+    price       {"values": [...], "positions": [...]} sorted by price, so a
+                price band is two binary searches; an item sold in sizes
+                has one entry per size price, so a band can list its
+                position more than once
+    terms       sorted tokens from name, description and localDescription
+    postings    positions for each entry of `terms`; a prefix search is a
+                binary search for the first term >= prefix
+"""
+
+import json
+import re
+
+INDEX_VERSION = 1
+
+FACET_FIELDS = ("tags", "cuisine", "subcuisine", "dietary", "allergens", "spiceLevel",
+                "drinkType", "beverageType")
+TEXT_FIELDS = ("name", "description", "localDescription")
+
+STOPWORDS = frozenset({"a", "an", "and", "in", "of", "on", "or", "the", "to", "with"})
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+def tokenize(text):
+    return [token for token in _TOKEN.findall(text.lower()) if len(token) > 1 and token not in STOPWORDS]
+
+class SearchIndexBuilder:
+    """Accumulate items one at a time (tree or streaming mode), then build()"""
+
+    def __init__(self, venue):
+        self.venue = venue
+        self.ids = []
+        self.categories = {}
+        self.facets = {field: {} for field in FACET_FIELDS}
+        self.prices = []
+        self.postings = {}
+
+    def add(self, item, category_id):
+        position = len(self.ids)
+        self.ids.append(item['id'])
+
+        span = self.categories.setdefault(category_id, [position, position])
+        span[1] = position + 1
+
+        for field in FACET_FIELDS:
+            value = item.get(field)
+            if value is None or value == "":
+                continue
+            values = value if isinstance(value, list) else [value]
+            facet = self.facets[field]
+            for entry in values:
+                postings = facet.setdefault(str(entry), [])
+                if not postings or postings[-1] != position:
+                    postings.append(position)
+
+        prices = [item.get('price')]
+        if isinstance(item.get('sizes'), list):
+            prices.extend(size.get('price') for size in item['sizes'] if isinstance(size, dict))
+        for price in set(prices):
+            if isinstance(price, (int, float)) and not isinstance(price, bool):
+                self.prices.append((price, position))
+
+        tokens = set()
+        for field in TEXT_FIELDS:
+            tokens.update(tokenize(item.get(field) or ""))
+        for token in tokens:
+            self.postings.setdefault(token, []).append(position)
+
+    def build(self):
+        self.prices.sort()
+        terms = sorted(self.postings)
+        return {
+            'version': INDEX_VERSION,
+            'venue': self.venue,
+            'items': self.ids,
+            'categories': self.categories,
+            # Drop empty facets and sort values so the output is deterministic
+            'facets': {
+                field: {value: values[value] for value in sorted(values)}
+                for field, values in self.facets.items() if values
+            },
+            'price': {
+                'values': [price for price, _ in self.prices],
+                'positions': [position for _, position in self.prices],
+            },
+            'terms': terms,
+            'postings': [self.postings[term] for term in terms],
+        }
+
+def build_search_index(menu_data):
+    """Index a whole enhanced menu"""
+    builder = SearchIndexBuilder(menu_data.get('venue'))
+    for category in menu_data['categories']:
+        for item in category['items']:
+            builder.add(item, category['id'])
+    return builder.build()
+
+def serialize_index(index):
+    """Compact, deterministic bytes for the index file"""
+    return json.dumps(index, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Shared file helpers for the menu scripts.
+
+All menu writes go through atomic_write(): data lands in a temp file in the
+same directory, is fsynced, and is renamed over the target, so a crash
+mid-write never leaves a truncated menu behind.
+"""
+
+import json
+import os
+import tempfile
+
+def _file_mode(path):
+    """Mode to give the replacement: the existing file's, else the umask default"""
+    try:
+        return os.stat(path).st_mode & 0o777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+def temp_file(path):
+    """
+    A new temp file in the same directory as `path`, to be renamed over it:
+    (binary file object, temp path). The caller fsyncs, renames and removes it.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        # mkstemp creates files as 0600; keep menus readable like any other file
+        os.fchmod(fd, _file_mode(path))
+        return os.fdopen(fd, 'wb'), tmp_path
+    except BaseException:
+        os.close(fd)
+        os.remove(tmp_path)
+        raise
+
+def remove_temp(tmp_path):
+    try:
+        os.remove(tmp_path)
+    except FileNotFoundError:
+        pass
+
+def atomic_write(path, data):
+    """Atomically replace `path` with `data` (bytes)"""
+    f, tmp_path = temp_file(path)
+    try:
+        with f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        remove_temp(tmp_path)
+        raise
+
+def write_if_changed(path, data):
+    """Atomically write bytes, skipping the write when the file already matches"""
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+    atomic_write(path, data)
+    return True
+
+def read_menu(path):
+    """Load a source menu, remembering whether the file ended with a newline"""
+    with open(path, 'r', encoding='utf-8') as f:
+        raw = f.read()
+    return json.loads(raw), raw.endswith("\n")
+
+def dump_menu(menu, trailing_newline=False):
+    """Serialize a source menu the way the hand-edited menu files are written"""
+    text = json.dumps(menu, indent=2, ensure_ascii=False)
+    return (text + "\n" if trailing_newline else text).encode('utf-8')
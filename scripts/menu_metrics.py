@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Lightweight instrumentation for the menu pipeline.
+
+Metrics holds two things:
+
+    timers    wall and CPU seconds plus a call count per (stage, labels)
+    counters  integers per (name, labels)
+
+Counter keys are plain tuples so hot loops can precompute them once and
+bump `metrics.counters[key] += 1` without building labels per item:
+
+    from menu_metrics import Metrics, metric_key
+    metrics = Metrics()
+    ITEMS = metric_key("items", state="enhanced")
+    with metrics.stage("enhance", category="appetizers"):
+        ...
+        metrics.counters[ITEMS] += 1
+
+snapshot() gives a JSON-friendly copy that can cross a process boundary;
+merge() adds one (with extra labels such as the menu) into another
+Metrics. to_report() and to_prometheus() export the result.
+"""
+
+import datetime
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+PROMETHEUS_PREFIX = "menu_enhance"
+
+def metric_key(name, **labels):
+    """Hashable (name, sorted label pairs) key for Metrics.counters"""
+    return name, tuple(sorted(labels.items()))
+
+class Metrics:
+    """Stage timers and counters for one run (or one worker's share of it)"""
+
+    def __init__(self):
+        self.timers = defaultdict(lambda: [0.0, 0.0, 0])
+        self.counters = Counter()
+
+    def reset(self):
+        self.timers.clear()
+        self.counters.clear()
+
+    @contextmanager
+    def stage(self, name, **labels):
+        """Add the wall and CPU time of the block to the (stage, labels) timer"""
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            timer = self.timers[metric_key(name, **labels)]
+            timer[0] += time.perf_counter() - wall
+            timer[1] += time.process_time() - cpu
+            timer[2] += 1
+
+    def count(self, name, value=1, **labels):
+        self.counters[metric_key(name, **labels)] += value
+
+    def snapshot(self):
+        return {
+            'timers': [[name, list(labels), *timer] for (name, labels), timer in self.timers.items()],
+            'counters': [[name, list(labels), value] for (name, labels), value in self.counters.items()],
+        }
+
+    def merge(self, snapshot, **labels):
+        """Add a snapshot() into these metrics, with `labels` added to every series"""
+        for name, series_labels, wall, cpu, calls in snapshot['timers']:
+            timer = self.timers[metric_key(name, **dict(map(tuple, series_labels)), **labels)]
+            timer[0] += wall
+            timer[1] += cpu
+            timer[2] += calls
+        for name, series_labels, value in snapshot['counters']:
+            self.counters[metric_key(name, **dict(map(tuple, series_labels)), **labels)] += value
+
+    def stage_totals(self, **match):
+        """{stage: [wall, cpu, calls]} summed over every series whose labels include `match`"""
+        totals = defaultdict(lambda: [0.0, 0.0, 0])
+        for (name, labels), (wall, cpu, calls) in self.timers.items():
+            if set(match.items()) <= set(labels):
+                total = totals[name]
+                total[0] += wall
+                total[1] += cpu
+                total[2] += calls
+        return dict(totals)
+
+    def to_report(self, **extra):
+        """JSON report: one row per timer and counter series, labels flattened in"""
+        stages = [dict(labels, stage=name, wall=wall, cpu=cpu, calls=calls)
+                  for (name, labels), (wall, cpu, calls) in sorted(self.timers.items())]
+        counters = [dict(labels, name=name, value=value)
+                    for (name, labels), value in sorted(self.counters.items())]
+        report = {'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds')}
+        report.update(extra)
+        report.update({'stages': stages, 'counters': counters})
+        return report
+
+    def to_prometheus(self, prefix=PROMETHEUS_PREFIX):
+        """Prometheus text exposition format (for a node_exporter textfile collector)"""
+        lines = []
+        timer_metrics = (
+            ("stage_seconds_total", "Wall-clock seconds spent per pipeline stage", 0),
+            ("stage_cpu_seconds_total", "CPU seconds spent per pipeline stage", 1),
+            ("stage_calls_total", "Times each pipeline stage ran", 2),
+        )
+        for suffix, help_text, field in timer_metrics:
+            lines.append(f"# HELP {prefix}_{suffix} {help_text}")
+            lines.append(f"# TYPE {prefix}_{suffix} counter")
+            for (name, labels), timer in sorted(self.timers.items()):
+                lines.append(f"{prefix}_{suffix}{_labels((('stage', name),) + labels)} {timer[field]:g}")
+
+        by_name = defaultdict(list)
+        for (name, labels), value in sorted(self.counters.items()):
+            by_name[name].append((labels, value))
+        for name, series in by_name.items():
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            for labels, value in series:
+                lines.append(f"{prefix}_{name}_total{_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in sorted(pairs)) + "}"
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Vectorized repricing of menu prices.
+
+PriceTable flattens every price field of every item of a set of menus into
+NumPy arrays, one entry per (item, field), with the menu, venue, category,
+field and tag bitmask of each entry alongside. A rule set is applied as a
+sequence of masked array operations over the whole table:
+
+    {
+      "round": "x9",                               default ending for changed prices
+      "rules": [
+        {"venue": "bar", "percent": 6},
+        {"venue": "bar", "fields": ["bottlePrice"], "percent": 4, "round": "x99"},
+        {"category": ["signature-cocktails"], "percent": 5, "cap": 999},
+        {"tag": "premium", "percent": 3},
+        {"menu": "food", "category": ["indian-mains"], "percent": 4, "floor": 249}
+      ]
+    }
+
+Selectors (all optional, every given one must match; a list matches any of
+its values): menu (file stem), venue, category, tag, id, and fields (the
+price fields a rule touches, default PRICE_FIELDS; "sizes" selects the
+per-size prices of items sold in sizes). Actions: percent
+(compounds with earlier rules), add (rupees), floor, cap and round. A
+later rule's floor, cap or rounding replaces an earlier one's for the
+entries it selects. Floors and caps are bounds on the final price: every
+price a rule selects ends up at or above its floor and at or below its
+cap, so a floor lifts a cheaper price to it and a cap cuts a dearer one.
+
+Tags are matched as they were before repricing: the item's enhanced tags
+when an enhanced file is at hand (else its own tags), plus the derived
+"premium" tag wherever the current prices earn it. premium() gives the
+price-derived tag for any price array, so a run can report which items
+cross PREMIUM_PRICES; the enhancer recomputes the stored tags afterwards.
+
+Changed prices are rounded to the nearest price ending in 9 ("x9", e.g.
+549) or 99 ("x99", e.g. 14999), or to whole rupees ("none"), and then moved
+to the nearest such ending inside their floor and cap. Prices no rule
+touches are never rounded.
+"""
+
+import numpy as np
+
+from menu_tags import PREMIUM_PRICES, TagVocabulary
+
+# "sizes" stands for the price of every entry of an item's sizes list
+PRICE_FIELDS = ("price", "bottlePrice", "price60ml", "sizes")
+SIZES_FIELD = "sizes"
+# Rounding mode -> step; a rounded price ends in step - 1
+ROUNDING = {"none": 0, "x9": 10, "x99": 100}
+# Venues whose items get the price-derived "premium" tag (see enhance_bar_item)
+PREMIUM_VENUES = ("bar",)
+
+SELECTORS = ("menu", "venue", "category", "tag", "id", "fields")
+ACTIONS = ("percent", "add", "floor", "cap", "round")
+
+def as_list(value):
+    return list(value) if isinstance(value, (list, tuple)) else [value]
+
+def validate_rules(rule_set):
+    """Raise ValueError for anything in a rule set that apply_rules() would not understand"""
+    if not isinstance(rule_set, dict) or not isinstance(rule_set.get('rules'), list):
+        raise ValueError('a rule set is an object with a "rules" list')
+    if rule_set.get('round', 'none') not in ROUNDING:
+        raise ValueError(f"unknown rounding {rule_set['round']!r}; use {', '.join(ROUNDING)}")
+    for number, rule in enumerate(rule_set['rules'], start=1):
+        unknown = [key for key in rule if key not in SELECTORS + ACTIONS and key != 'note']
+        if unknown:
+            raise ValueError(f"rule {number}: unknown keys {', '.join(unknown)}")
+        if not any(key in rule for key in ACTIONS):
+            raise ValueError(f"rule {number}: no action ({', '.join(ACTIONS)})")
+        for key in ("percent", "add", "floor", "cap"):
+            if key in rule and (isinstance(rule[key], bool) or not isinstance(rule[key], (int, float))):
+                raise ValueError(f"rule {number}: {key} must be a number")
+        if rule.get('round', 'none') not in ROUNDING:
+            raise ValueError(f"rule {number}: unknown rounding {rule['round']!r}")
+        bad_fields = [field for field in as_list(rule.get('fields', [])) if field not in PRICE_FIELDS]
+        if bad_fields:
+            raise ValueError(f"rule {number}: unknown price fields {', '.join(bad_fields)}")
+        if 'floor' in rule and 'cap' in rule and rule['floor'] > rule['cap']:
+            raise ValueError(f"rule {number}: floor is above cap")
+
+def round_endings(values, steps):
+    """Nearest price ending in step - 1 for each entry; a step of 0 rounds to whole rupees"""
+    steps = np.asarray(steps, dtype=np.float64)
+    stepped = steps > 0
+    safe = np.where(stepped, steps, 1)
+    ending = np.maximum(np.rint((values + 1) / safe) * safe - 1, safe - 1)
+    return np.where(stepped, ending, np.rint(values))
+
+def clamp_endings(values, steps, floors, caps):
+    """Move rounded prices inside [floor, cap], keeping their ending where one fits"""
+    steps = np.asarray(steps, dtype=np.float64)
+    safe = np.where(steps > 0, steps, 1)
+    # Largest ending <= cap and smallest ending >= floor
+    below_cap = np.where(steps > 0, np.floor((caps + 1) / safe) * safe - 1, np.floor(caps))
+    above_floor = np.where(steps > 0, np.ceil((floors + 1) / safe) * safe - 1, np.ceil(floors))
+    values = np.where(values > caps, below_cap, values)
+    values = np.where(values < floors, above_floor, values)
+    # A window too narrow for any ending gets the plain bound
+    return np.clip(values, floors, caps)
+
+def item_prices(item):
+    """(field code, size index or -1, price) for every numeric price of an item"""
+    for field_code, field in enumerate(PRICE_FIELDS):
+        if field == SIZES_FIELD:
+            sizes = item.get(field)
+            candidates = [(index, size.get('price')) for index, size in enumerate(sizes)
+                          if isinstance(size, dict)] if isinstance(sizes, list) else []
+        else:
+            candidates = [(-1, item.get(field))]
+        for size_index, value in candidates:
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                yield field_code, size_index, value
+
+class PriceTable:
+    """Every price of a set of menus as flat arrays, one entry per (item, price field or size)"""
+
+    def __init__(self, menus):
+        """
+        `menus` is a list of (label, venue, menu data, {item id: tags}); the
+        tag map overrides the items' own tags (pass the enhanced tags).
+        """
+        self.menus = menus
+        self.items = []
+        item_tags = []
+        refs = {'menu': [], 'category': [], 'field': [], 'size': [], 'item': []}
+        values = []
+        category_codes = {}
+        for menu_index, (label, venue, menu_data, tags_by_id) in enumerate(menus):
+            for category in menu_data['categories']:
+                category_code = category_codes.setdefault(category['id'], len(category_codes))
+                for item in category['items']:
+                    item_index = len(self.items)
+                    self.items.append(item)
+                    item_tags.append(tags_by_id.get(item.get('id'), item.get('tags', ())))
+                    for field_code, size_index, value in item_prices(item):
+                        refs['menu'].append(menu_index)
+                        refs['category'].append(category_code)
+                        refs['field'].append(field_code)
+                        refs['size'].append(size_index)
+                        refs['item'].append(item_index)
+                        values.append(value)
+        self.category_codes = category_codes
+        self.menu = np.asarray(refs['menu'], dtype=np.int32)
+        self.category = np.asarray(refs['category'], dtype=np.int32)
+        self.field = np.asarray(refs['field'], dtype=np.int8)
+        self.size = np.asarray(refs['size'], dtype=np.int32)
+        self.item = np.asarray(refs['item'], dtype=np.int64)
+        self.prices = np.asarray(values, dtype=np.float64)
+
+        # Tag bitmask per item, plus "premium" wherever the current prices earn it
+        self.tags = TagVocabulary(["premium", *(tag for tags in item_tags for tag in tags)])
+        if len(self.tags) > 63:
+            raise ValueError(f"{len(self.tags)} distinct tags do not fit a 64-bit mask")
+        masks = np.array([self.tags.mask(tags)[0] for tags in item_tags], dtype=np.int64)
+        masks[self.premium(self.prices)] |= self.tags.bit("premium")
+        self.item_masks = masks
+
+    def __len__(self):
+        return len(self.prices)
+
+    def premium(self, prices):
+        """Per item: whether `prices` earn it the derived premium tag"""
+        premium = np.zeros(len(self.items), dtype=bool)
+        eligible = np.isin(self.menu, [i for i, menu in enumerate(self.menus) if menu[1] in PREMIUM_VENUES])
+        for field, threshold in PREMIUM_PRICES.items():
+            hit = eligible & (self.field == PRICE_FIELDS.index(field)) & (prices >= threshold)
+            premium[self.item[hit]] = True
+        return premium
+
+    def select(self, rule):
+        """Boolean mask of the entries a rule's selectors match"""
+        mask = np.ones(len(self), dtype=bool)
+        if 'menu' in rule:
+            labels = set(as_list(rule['menu']))
+            mask &= np.isin(self.menu, [i for i, menu in enumerate(self.menus) if menu[0] in labels])
+        if 'venue' in rule:
+            venues = set(as_list(rule['venue']))
+            mask &= np.isin(self.menu, [i for i, menu in enumerate(self.menus) if menu[1] in venues])
+        if 'category' in rule:
+            mask &= np.isin(self.category, [self.category_codes[category] for category in as_list(rule['category'])
+                                            if category in self.category_codes])
+        if 'fields' in rule:
+            mask &= np.isin(self.field, [PRICE_FIELDS.index(field) for field in as_list(rule['fields'])])
+        if 'tag' in rule:
+            bits = 0
+            for tag in as_list(rule['tag']):
+                bits |= self.tags.bits.get(tag, 0)
+            mask &= (self.item_masks[self.item] & bits) != 0
+        if 'id' in rule:
+            ids = set(as_list(rule['id']))
+            mask &= np.isin(self.item, [i for i, item in enumerate(self.items) if item.get('id') in ids])
+        return mask
+
+    def apply_rules(self, rule_set):
+        """New prices (int64, same order as self.prices) after applying a validated rule set"""
+        n = len(self)
+        prices = self.prices.copy()
+        steps = np.full(n, ROUNDING[rule_set.get('round', 'none')], dtype=np.int64)
+        floors = np.full(n, -np.inf)
+        caps = np.full(n, np.inf)
+        touched = np.zeros(n, dtype=bool)
+        for rule in rule_set['rules']:
+            mask = self.select(rule)
+            if 'percent' in rule:
+                prices[mask] *= 1 + rule['percent'] / 100
+            if 'add' in rule:
+                prices[mask] += rule['add']
+            if 'round' in rule:
+                steps[mask] = ROUNDING[rule['round']]
+            if 'floor' in rule:
+                floors[mask] = rule['floor']
+            if 'cap' in rule:
+                caps[mask] = rule['cap']
+            touched |= mask
+
+        old = self.prices
+        target = np.clip(prices, floors, caps)
+        new = clamp_endings(round_endings(target, steps), steps, floors, caps)
+        # Rounding inside a tight bound must not turn an increase into a cut or back
+        new = np.where(((target > old) & (new < old)) | ((target < old) & (new > old)), old, new)
+        new = np.where(touched, new, old)
+        return np.rint(new).astype(np.int64)
+
+    def field_name(self, index):
+        """Display name of an entry's price field: the field, or sizes[i] for a size"""
+        field = PRICE_FIELDS[self.field[index]]
+        return f"{field}[{self.size[index]}]" if field == SIZES_FIELD else field
+
+    def changes(self, new_prices):
+        """Indices of the entries whose price changed"""
+        return np.flatnonzero(new_prices != self.prices)
+
+    def write_back(self, new_prices):
+        """Store new prices in the menu dicts; returns the indices of the menus that changed"""
+        changed = self.changes(new_prices)
+        for index in changed:
+            item = self.items[self.item[index]]
+            field = PRICE_FIELDS[self.field[index]]
+            if field == SIZES_FIELD:
+                item[field][self.size[index]]['price'] = int(new_prices[index])
+            else:
+                item[field] = int(new_prices[index])
+        return sorted(set(self.menu[changed].tolist()))
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Compiled rule table for the CUISINE_MAPPINGS used by enhance-menus.py.
+
+The mapping table is compiled once into a dict keyed by
+(category id, normalized item name) so each item resolves its full
+enrichment in a single lookup. Precedence, highest first:
+
+    item override  ->  category default  ->  global default
+
+Fields already present on the source item are never overwritten; that
+check lives in the enhancer, not here.
+"""
+
+import re
+
+# Fields the rule table can contribute to an item
+ENRICHMENT_FIELDS = ("cuisine", "subcuisine", "localDescription", "similarTo", "tags")
+
+# Used when neither the item nor its category has a mapping
+GLOBAL_DEFAULTS = {
+    "cuisine": "fusion",
+    "localDescription": "",
+    "tags": [],
+}
+
+# Category-level keys in CUISINE_MAPPINGS and the item field they feed
+CATEGORY_KEYS = {
+    "default_cuisine": "cuisine",
+    "subcuisine": "subcuisine",
+    "localDescription": "localDescription",
+    "similarTo": "similarTo",
+    "tags": "tags",
+}
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+def normalize_name(name):
+    """Lowercase and collapse punctuation/whitespace: 'Chilli-Paneer ' -> 'chilli paneer'"""
+    return _NON_ALNUM.sub(" ", name.lower()).strip()
+
+class CuisineRuleTable:
+    """CUISINE_MAPPINGS compiled into an indexed lookup table"""
+
+    def __init__(self, mappings, defaults=GLOBAL_DEFAULTS):
+        self.defaults = dict(defaults)
+        self.category_defaults = {}
+        self.rules = {}
+        self.rule_names = {}
+
+        for cat_id, cat_mapping in mappings.items():
+            category = dict(self.defaults)
+            for key, field in CATEGORY_KEYS.items():
+                if key in cat_mapping:
+                    category[field] = cat_mapping[key]
+            self.category_defaults[cat_id] = category
+
+            for name, override in cat_mapping.get("items", {}).items():
+                key = (cat_id, normalize_name(name))
+                if key in self.rules:
+                    raise ValueError(f"Duplicate mapping rule for '{name}' in category '{cat_id}'")
+                resolved = dict(category)
+                resolved.update((field, override[field]) for field in ENRICHMENT_FIELDS if field in override)
+                self.rules[key] = resolved
+                self.rule_names[key] = name
+
+    def __len__(self):
+        return len(self.rules)
+
+    def lookup(self, category_id, name):
+        """
+        (enrichment, level) where level is the rule that matched: "item",
+        "category" or "default". The caller owns the returned dict.
+        """
+        resolved = self.rules.get((category_id, normalize_name(name)))
+        level = "item"
+        if resolved is None:
+            resolved = self.category_defaults.get(category_id)
+            level = "category"
+            if resolved is None:
+                resolved, level = self.defaults, "default"
+        enrichment = dict(resolved)
+        enrichment["tags"] = list(resolved.get("tags", []))
+        return enrichment, level
+
+    def unmatched_rules(self, items):
+        """Item rules that none of the given (category id, item name) pairs matched"""
+        seen = {(category_id, normalize_name(name)) for category_id, name in items}
+        return sorted((key[0], self.rule_names[key]) for key in self.rules if key not in seen)
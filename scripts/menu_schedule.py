@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Compiled schedule of which menus are being served when.
+
+compile_schedule() turns every menu's validity into one sorted interval
+table of (start, end, venue, menu, artifact) rows:
+
+    - a menu with validFrom / validTo (nye.json) is served inside that
+      window; a date without a time means the whole day, so
+      "validTo": "2026-01-01" runs until midnight at the end of Jan 1
+    - a menu with recurring windows (breakfast 07:00-12:00) is expanded
+      into one row per day over the schedule horizon
+    - named event windows (happy hour) are rows layered over a menu that is
+      otherwise served all day; they carry a "window" name
+    - every other menu is served all the time (start and end are null)
+
+All row edges are then merged into one sorted list of change-over
+boundaries with the set of active rows between each pair, so finding the
+active menus for a timestamp is one binary search and the next change-over
+is the boundary after it. The horizon end is itself a boundary: caches
+never outlive the expanded recurring windows, and the schedule has to be
+rebuilt (the enhancer does so on every run) before then.
+
+Times are Unix seconds; recurring windows use wall-clock time in TIMEZONE.
+
+Usage:
+    python3 scripts/menu_schedule.py src/data/menus/menu-schedule.json
+    python3 scripts/menu_schedule.py src/data/menus/menu-schedule.json --at 2025-12-31T21:00
+"""
+
+import argparse
+import bisect
+import datetime
+import json
+import sys
+import time
+from zoneinfo import ZoneInfo
+
+SCHEDULE_VERSION = 1
+TIMEZONE = "Asia/Kolkata"
+# Days of recurring windows expanded ahead of the build day
+HORIZON_DAYS = 35
+
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+def parse_days(days):
+    """Weekday numbers from "daily" or a list like ["fri", "sat"]"""
+    if days == "daily":
+        return set(range(7))
+    return {WEEKDAYS.index(day[:3].lower()) for day in days}
+
+def parse_clock(value):
+    hour, minute = value.split(":")
+    return datetime.time(int(hour), int(minute))
+
+def parse_bound(value, tz, end=False):
+    """Unix time for a validFrom/validTo value; date-only ends cover the whole day"""
+    if len(value) == 10:
+        day = datetime.date.fromisoformat(value)
+        if end:
+            day += datetime.timedelta(days=1)
+        moment = datetime.datetime.combine(day, datetime.time(), tz)
+    else:
+        moment = datetime.datetime.fromisoformat(value)
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=tz)
+    return int(moment.timestamp())
+
+def expand_recurring(window, first_day, days, tz):
+    """(start, end) Unix times for a recurring window on each day of the horizon"""
+    weekdays = parse_days(window.get("days", "daily"))
+    opens, closes = parse_clock(window["start"]), parse_clock(window["end"])
+    for offset in range(days):
+        day = first_day + datetime.timedelta(days=offset)
+        if day.weekday() not in weekdays:
+            continue
+        start = datetime.datetime.combine(day, opens, tz)
+        # An end at or before the start runs past midnight
+        end_day = day + datetime.timedelta(days=1) if closes <= opens else day
+        end = datetime.datetime.combine(end_day, closes, tz)
+        yield int(start.timestamp()), int(end.timestamp())
+
+def clip(start, end, valid_from, valid_to):
+    if valid_from is not None:
+        start = valid_from if start is None else max(start, valid_from)
+    if valid_to is not None:
+        end = valid_to if end is None else min(end, valid_to)
+    return start, end
+
+def compile_schedule(menus, menu_windows=None, event_windows=None, now=None,
+                     timezone=TIMEZONE, horizon_days=HORIZON_DAYS):
+    """
+    Schedule for `menus`, a list of {"menu", "venue", "artifact", "validFrom",
+    "validTo"} dicts. menu_windows maps a menu label to the recurring windows it
+    is limited to; event_windows maps a window name to a recurring window with
+    the "menu" it belongs to.
+    """
+    tz = ZoneInfo(timezone)
+    menu_windows = menu_windows or {}
+    event_windows = event_windows or {}
+    now = time.time() if now is None else now
+    # Start the horizon at the previous local midnight so rebuilds on one day agree
+    first_day = datetime.datetime.fromtimestamp(now, tz).date() - datetime.timedelta(days=1)
+    horizon_start = int(datetime.datetime.combine(first_day, datetime.time(), tz).timestamp())
+    horizon_end = int(datetime.datetime.combine(first_day + datetime.timedelta(days=horizon_days + 1),
+                                                datetime.time(), tz).timestamp())
+
+    rows = []
+    for menu in menus:
+        valid_from = parse_bound(menu["validFrom"], tz) if menu.get("validFrom") else None
+        valid_to = parse_bound(menu["validTo"], tz, end=True) if menu.get("validTo") else None
+        base = {"venue": menu["venue"], "menu": menu["menu"], "artifact": menu["artifact"], "window": None}
+        spans = [(name, start, end)
+                 for name, window in event_windows.items() if window["menu"] == menu["menu"]
+                 for start, end in expand_recurring(window, first_day, horizon_days + 1, tz)]
+        if menu["menu"] in menu_windows:
+            spans.extend((None, start, end) for window in menu_windows[menu["menu"]]
+                         for start, end in expand_recurring(window, first_day, horizon_days + 1, tz))
+        else:
+            spans.append((None, None, None))
+        # Validity bounds every row of the menu, including its event windows
+        for name, start, end in spans:
+            start, end = clip(start, end, valid_from, valid_to)
+            if start is None or end is None or start < end:
+                rows.append(dict(base, window=name, start=start, end=end))
+    rows.sort(key=lambda row: (row["start"] is not None, row["start"] or 0, row["menu"], row["window"] or ""))
+
+    # Sweep the row edges into boundaries and the active rows between them;
+    # the horizon end is always a boundary so caches expire before it
+    edges = {horizon_end: ([], [])}
+    active = set()
+    for index, row in enumerate(rows):
+        if row["start"] is None:
+            active.add(index)
+        else:
+            edges.setdefault(row["start"], ([], []))[0].append(index)
+        if row["end"] is not None:
+            edges.setdefault(row["end"], ([], []))[1].append(index)
+    boundaries, segments = [], [sorted(active)]
+    for boundary in sorted(edges):
+        opened, closed = edges[boundary]
+        active.difference_update(closed)
+        active.update(opened)
+        boundaries.append(boundary)
+        segments.append(sorted(active))
+
+    return {
+        "version": SCHEDULE_VERSION,
+        "timezone": timezone,
+        "horizon": [horizon_start, horizon_end],
+        "rows": rows,
+        "boundaries": boundaries,
+        "segments": segments,
+    }
+
+class MenuSchedule:
+    """Lookups over a compiled schedule"""
+
+    def __init__(self, schedule):
+        self.schedule = schedule
+        self.rows = schedule["rows"]
+        self.boundaries = schedule["boundaries"]
+        self.segments = schedule["segments"]
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def active(self, ts):
+        """Rows active at Unix time ts"""
+        return [self.rows[index] for index in self.segments[bisect.bisect_right(self.boundaries, ts)]]
+
+    def next_change(self, ts):
+        """Unix time of the next change-over after ts, or None if nothing changes again"""
+        index = bisect.bisect_right(self.boundaries, ts)
+        return self.boundaries[index] if index < len(self.boundaries) else None
+
+    def max_age(self, ts):
+        """Seconds a response built at ts stays valid, for Cache-Control max-age"""
+        change = self.next_change(ts)
+        return None if change is None else change - int(ts)
+
+def parse_at(value, tz):
+    moment = datetime.datetime.fromisoformat(value)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=tz)
+    return moment.timestamp()
+
+def main():
+    parser = argparse.ArgumentParser(description="Show which menus a compiled schedule serves at a time")
+    parser.add_argument("schedule", help="menu-schedule.json written by enhance-menus.py")
+    parser.add_argument("--at", help="local time like 2025-12-31T21:00 (default: now)")
+    args = parser.parse_args()
+
+    schedule = MenuSchedule.load(args.schedule)
+    tz = ZoneInfo(schedule.schedule["timezone"])
+    ts = parse_at(args.at, tz) if args.at else time.time()
+    if not schedule.schedule["horizon"][0] <= ts < schedule.schedule["horizon"][1]:
+        print("⚠️  Outside the schedule horizon; recurring windows are not expanded there", file=sys.stderr)
+
+    print(f"Menus at {datetime.datetime.fromtimestamp(ts, tz):%Y-%m-%d %H:%M %Z}:")
+    for row in schedule.active(ts):
+        label = f"{row['menu']} ({row['window']})" if row["window"] else row["menu"]
+        print(f"   ✓ {label:<28} {row['venue']:<14} {row['artifact']}")
+    change = schedule.next_change(ts)
+    if change is None:
+        print("📊 No further change-overs")
+    else:
+        print(f"📊 Next change-over {datetime.datetime.fromtimestamp(change, tz):%Y-%m-%d %H:%M} "
+              f"(max-age {schedule.max_age(ts)} s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+"Similar dishes" by nearest neighbours over item feature vectors.
+
+Every item becomes one row of a NumPy matrix with two unit-length blocks:
+
+    text         TF-IDF over name (counted twice), description,
+                 localDescription and tags
+    categorical  one-hot category, cuisine, subcuisine, drink/beverage type,
+                 temperature and price band (PRICE_BANDS quantiles of the menu)
+
+scaled by TEXT_WEIGHT and CATEGORY_WEIGHT, so one matrix product gives the
+weighted sum of both cosine similarities for every pair. Neighbours are
+taken within a group (a menu, or an outlet in a multi-outlet catalogue),
+in row blocks of at most BLOCK_CELLS scores at a time: each block is one
+matrix product, a mask and an argpartition, with no Python loop over pairs.
+
+Only available items are recommended, never an item with the same name
+(menus list some dishes twice, once per variant), and the dietary
+constraint is a mask over the block: a veg item only gets veg neighbours, a
+veg item with egg gets veg ones, and a non-veg item may get anything.
+
+Terms that occur in a single item of a group count towards that item's
+norm but cannot make two items similar, so they get no column; this keeps
+the matrix narrow without changing any score.
+
+Usage:
+    python3 scripts/menu_similar.py src/data/menus/food-enhanced.json
+    python3 scripts/menu_similar.py src/data/menus/bar-enhanced.json -k 3 --item "GIN SLING"
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+
+import numpy as np
+
+DEFAULT_K = 5
+TEXT_WEIGHT = 0.6
+CATEGORY_WEIGHT = 0.4
+PRICE_BANDS = 5
+# Neighbours need at least this combined similarity
+MIN_SCORE = 0.05
+# Terms kept per group, most frequent first; only very large single menus hit it
+MAX_TERMS = 4096
+# Scores computed per block (rows x group size): 4M float32 is 16 MB
+BLOCK_CELLS = 1 << 22
+
+TEXT_FIELDS = (('name', 2), ('description', 1), ('localDescription', 1))
+CATEGORICAL_FIELDS = ('category', 'cuisine', 'subcuisine', 'drinkType', 'beverageType', 'temperature')
+STOPWORDS = frozenset("a an and the of with in on or to for our served".split())
+TOKEN = re.compile(r"[a-z0-9]{2,}")
+
+# Dietary rank: an item only recommends items of its rank or lower
+VEG, VEG_WITH_EGG, ANY = 0, 1, 2
+
+def diet_rank(item):
+    dietary = item.get('dietary')
+    if not isinstance(dietary, list) or 'veg' not in dietary:
+        return ANY
+    return VEG_WITH_EGG if 'contains-egg' in dietary else VEG
+
+def item_terms(item):
+    """Term -> count for the text block"""
+    counts = {}
+    get = counts.get
+    for field, weight in TEXT_FIELDS:
+        value = item.get(field)
+        if value and isinstance(value, str):
+            for token in TOKEN.findall(value.lower()):
+                if token not in STOPWORDS:
+                    counts[token] = get(token, 0) + weight
+    for tag in item.get('tags', ()):
+        counts["tag:" + tag] = get("tag:" + tag, 0) + 1
+    return counts
+
+def text_block(items):
+    """Row-normalised TF-IDF matrix for one group"""
+    rows, terms, counts = [], [], []
+    vocabulary = {}
+    for row, item in enumerate(items):
+        item_counts = item_terms(item)
+        rows.extend([row] * len(item_counts))
+        for term in item_counts:
+            terms.append(vocabulary.setdefault(term, len(vocabulary)))
+        counts.extend(item_counts.values())
+    n = len(items)
+    if not vocabulary:
+        return np.zeros((n, 0), dtype=np.float32)
+    rows = np.asarray(rows, dtype=np.int64)
+    terms = np.asarray(terms, dtype=np.int64)
+    df = np.bincount(terms, minlength=len(vocabulary))
+    idf = np.log((1 + n) / (1 + df)) + 1
+    values = np.asarray(counts, dtype=np.float64) * idf[terms]
+    norms = np.sqrt(np.bincount(rows, weights=values * values, minlength=n))
+    norms[norms == 0] = 1
+
+    # Only shared terms get a column; singletons already went into the norms
+    shared = np.flatnonzero(df > 1)
+    if len(shared) > MAX_TERMS:
+        shared = shared[np.argsort(-df[shared], kind='stable')[:MAX_TERMS]]
+    columns = np.full(len(vocabulary), -1, dtype=np.int64)
+    columns[shared] = np.arange(len(shared))
+    keep = columns[terms] >= 0
+    block = np.zeros((n, len(shared)), dtype=np.float32)
+    block[rows[keep], columns[terms[keep]]] = values[keep] / norms[rows[keep]]
+    return block
+
+def price_bands(items):
+    """Quantile band of each item's price within the group, -1 where it has none"""
+    prices = np.array([item['price'] if isinstance(item.get('price'), (int, float)) else np.nan
+                       for item in items], dtype=np.float64)
+    bands = np.full(len(items), -1, dtype=np.int64)
+    priced = ~np.isnan(prices)
+    if priced.any():
+        edges = np.quantile(prices[priced], np.linspace(0, 1, PRICE_BANDS + 1)[1:-1])
+        bands[priced] = np.searchsorted(edges, prices[priced], side='right')
+    return bands
+
+def categorical_block(items, category_ids=None):
+    """Row-normalised one-hot matrix for one group"""
+    columns = {}
+    rows, cols = [], []
+    for row, item in enumerate(items):
+        for field in CATEGORICAL_FIELDS:
+            value = category_ids[row] if field == 'category' and category_ids else item.get(field)
+            if isinstance(value, str) and value:
+                rows.append(row)
+                cols.append(columns.setdefault((field, value), len(columns)))
+    bands = price_bands(items)
+    for row in np.flatnonzero(bands >= 0):
+        rows.append(int(row))
+        cols.append(columns.setdefault(('price', int(bands[row])), len(columns)))
+    block = np.zeros((len(items), len(columns)), dtype=np.float32)
+    block[rows, cols] = 1
+    norms = np.linalg.norm(block, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return block / norms
+
+def feature_matrix(items, category_ids=None):
+    """One row per item; the dot product of two rows is their combined similarity"""
+    return np.hstack([
+        text_block(items) * np.float32(np.sqrt(TEXT_WEIGHT)),
+        categorical_block(items, category_ids) * np.float32(np.sqrt(CATEGORY_WEIGHT)),
+    ])
+
+def top_k(features, ranks, available, names, k, min_score=MIN_SCORE):
+    """
+    (indices, scores) of each row's k best allowed neighbours, -1 / 0 where
+    there are fewer. `names` holds an integer code per distinct item name.
+    """
+    n = len(features)
+    indices = np.full((n, k), -1, dtype=np.int64)
+    scores = np.zeros((n, k), dtype=np.float32)
+    if n < 2 or k == 0:
+        return indices, scores
+    take = min(k, n - 1)
+    block_rows = max(1, BLOCK_CELLS // n)
+    # Candidates that are never allowed: unavailable items, and every repeat of
+    # a name after its first available occurrence so a name is listed once
+    positions = np.arange(n)
+    first = np.full(names.max() + 1, n, dtype=np.int64)
+    np.minimum.at(first, names[available], positions[available])
+    blocked = ~available | (first[names] != positions)
+    for start in range(0, n, block_rows):
+        stop = min(n, start + block_rows)
+        block = features[start:stop] @ features.T
+        # Unavailable, dietary-incompatible and same-name candidates (which includes self)
+        block[:, blocked] = -np.inf
+        block[ranks[None, :] > ranks[start:stop, None]] = -np.inf
+        block[names[None, :] == names[start:stop, None]] = -np.inf
+        best = np.argpartition(-block, take - 1, axis=1)[:, :take]
+        best_scores = np.take_along_axis(block, best, axis=1)
+        # Highest score first, ties by position in the menu
+        order = np.lexsort((best, -best_scores), axis=1)
+        best = np.take_along_axis(best, order, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        weak = ~(best_scores >= min_score)
+        best[weak] = -1
+        best_scores[weak] = 0
+        indices[start:stop, :take] = best
+        scores[start:stop, :take] = best_scores
+    return indices, scores
+
+def similar_items(items, k=DEFAULT_K, groups=None, category_ids=None):
+    """
+    Top-k neighbours of every item, as (indices, scores) arrays of shape
+    (len(items), k) with -1 where an item has fewer. Neighbours come from the
+    item's own group when `groups` (one label per item) is given.
+    `category_ids` supplies each item's category where items lack one.
+    """
+    n = len(items)
+    indices = np.full((n, k), -1, dtype=np.int64)
+    scores = np.zeros((n, k), dtype=np.float32)
+    labels = np.zeros(n, dtype=np.int64) if groups is None else np.unique(groups, return_inverse=True)[1]
+    for label in np.unique(labels):
+        members = np.flatnonzero(labels == label)
+        group = [items[i] for i in members]
+        ranks = np.array([diet_rank(item) for item in group], dtype=np.int8)
+        available = np.array([item.get('isAvailable', True) is not False for item in group])
+        names = np.unique([str(item.get('name', '')).strip().lower() for item in group], return_inverse=True)[1]
+        features = feature_matrix(group, [category_ids[i] for i in members] if category_ids else None)
+        local, local_scores = top_k(features, ranks, available, names, k)
+        indices[members] = np.where(local >= 0, members[np.maximum(local, 0)], -1)
+        scores[members] = local_scores
+    return indices, scores
+
+def menu_items(menu_data):
+    """(category id, item) for every item of a menu in document order"""
+    return [(category['id'], item) for category in menu_data.get('categories', []) for item in category['items']]
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the similar dishes computed for a menu")
+    parser.add_argument('menu', help="menu JSON (source or enhanced)")
+    parser.add_argument('-k', type=int, default=DEFAULT_K, help="neighbours per item (default: %(default)s)")
+    parser.add_argument('--item', help="only show this item (by name or id)")
+    args = parser.parse_args()
+
+    with open(args.menu, 'r', encoding='utf-8') as f:
+        pairs = menu_items(json.load(f))
+    items = [item for _, item in pairs]
+    start = time.perf_counter()
+    indices, scores = similar_items(items, args.k, category_ids=[category_id for category_id, _ in pairs])
+    elapsed = time.perf_counter() - start
+
+    shown = 0
+    for row, item in enumerate(items):
+        if args.item and args.item not in (item.get('name'), item.get('id')):
+            continue
+        shown += 1
+        neighbours = ", ".join(f"{items[i]['name']} ({score:.2f})"
+                               for i, score in zip(indices[row], scores[row]) if i >= 0)
+        print(f"{item['name']}: {neighbours or '-'}")
+    if args.item and not shown:
+        sys.exit(f"❌ No item named {args.item!r}")
+    print(f"\n📊 {len(items)} items in {elapsed * 1000:.1f} ms", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,464 @@
+#!/usr/bin/env python3
+"""
+Content-addressed, copy-on-write version store for menu files.
+
+Every category and item of a menu is stored once, keyed by the hash of its
+JSON, and a menu version is a small tree: the menu's own fields with
+"categories" replaced by category keys, each category holding item keys.
+Saving a menu where one price changed writes one new item, one category and
+one tree; everything else is shared with earlier versions and with every
+other menu (outlets listing the same dish share its object).
+
+    <menus dir>/.menu-store/objects/3f/9a1c0d2b7e5a41   zlib-compressed compact JSON
+    <menus dir>/.menu-store/refs/food/HEAD                "7"
+    <menus dir>/.menu-store/refs/food/7.json              {"version": 7, "parent": 6, "tree": ...,
+                                                           "hash": ..., "bytes": ..., "ascii": false,
+                                                           "newline": true, "time": ..., "message": ...}
+
+A menu is labelled by its file stem ("food", "food-enhanced"). HEAD is the
+published version, and the menu file next to the store is always its
+materialization: publishing and rolling back move HEAD (one small atomic
+write, whatever the size of the menu) and then rewrite the file from the
+tree. Versions are never deleted, so a rollback can be undone with another
+checkout.
+
+Files are restored byte for byte. A version is rendered with
+json.dumps(indent=2) in the style it was saved with (ASCII escapes or not,
+trailing newline or not); a hand-formatted file that no rendering
+reproduces also keeps its exact bytes as one extra object. Editing a file
+by hand is not lost either: the next save or checkout first records the
+file as it is on disk ("edited outside the store").
+
+The scripts that write menus save through here (add-menu-items.py,
+reprice-menus.py, and enhance-menus.py for the enhanced menus, which also
+records hand edits of each source menu it reads). Search indexes, columnar
+files and the schedule are rebuilt from the enhanced menus and are not
+stored.
+
+Usage:
+    python3 scripts/menu_store.py log food
+    python3 scripts/menu_store.py show food 3 -o /tmp/food-v3.json
+    python3 scripts/menu_store.py diff food-enhanced 4 6
+    python3 scripts/menu_store.py rollback food           # back to the version before HEAD
+    python3 scripts/menu_store.py checkout food 7         # any version, including a rolled-back one
+    python3 scripts/menu_store.py import                  # record every menu file as it is now
+    python3 scripts/menu_store.py stats
+"""
+
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import sys
+import zlib
+
+from menu_io import atomic_write, write_if_changed
+
+STORE_DIR_NAME = ".menu-store"
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+MENUS_DIR = os.path.join(PROJECT_DIR, "src/data/menus")
+
+# Generated files that are rebuilt from the enhanced menus rather than stored
+UNSTORED_NAMES = ("-index.json", "menu-schedule.json")
+
+def bytes_hash(data):
+    """Object keys and version hashes; the same short hash the enhancer's manifest uses"""
+    return hashlib.sha256(data).hexdigest()[:16]
+
+def render(menu_data, ascii, newline):
+    """Serialize a menu the way a version in this style was written"""
+    text = json.dumps(menu_data, indent=2, ensure_ascii=ascii)
+    return (text + "\n" if newline else text).encode('utf-8')
+
+def is_tree_menu(menu_data):
+    """True for menus whose categories and items can be stored as separate objects"""
+    return (isinstance(menu_data, dict) and isinstance(menu_data.get('categories'), list)
+            and all(isinstance(category, dict) and isinstance(category.get('items', []), list)
+                    for category in menu_data['categories']))
+
+def label_for(path):
+    """food.json -> food"""
+    return os.path.basename(path)[:-len('.json')]
+
+class TreeBuilder:
+    """
+    Build a version tree from menu_stream events as they go past, so a
+    streamed menu is stored without ever being held whole in memory.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.tree = {}
+        self.categories = None
+        self.category = None
+
+    def __call__(self, events):
+        """Generator stage: store every category and item, passing the events through"""
+        for event in events:
+            kind = event[0]
+            if kind == "field":
+                self.tree[event[1]] = event[2]
+            elif kind == "categories_start":
+                self.categories = self.tree['categories'] = []
+            elif kind == "category_start":
+                self.category = dict(event[1], items=[])
+            elif kind == "item":
+                self.category['items'].append(self.store.put(event[1]))
+            elif kind == "category_end":
+                trailer, has_items = event[1], event[2]
+                if not has_items:
+                    del self.category['items']
+                self.category.update(trailer)
+                self.categories.append(self.store.put(self.category))
+            yield event
+
+class MenuStore:
+    """Objects and version refs under one store directory"""
+
+    def __init__(self, root):
+        self.root = root
+        self.known = set()
+
+    # Objects
+
+    def _object_path(self, key):
+        return os.path.join(self.root, "objects", key[:2], key[2:])
+
+    def put_bytes(self, data):
+        """Store raw bytes once; returns their key"""
+        key = bytes_hash(data)
+        if key not in self.known:
+            path = self._object_path(key)
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                atomic_write(path, zlib.compress(data))
+            self.known.add(key)
+        return key
+
+    def put(self, value):
+        """Store a JSON value once; returns its key"""
+        return self.put_bytes(json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+    def get_bytes(self, key):
+        with open(self._object_path(key), 'rb') as f:
+            data = zlib.decompress(f.read())
+        if bytes_hash(data) != key:
+            raise ValueError(f"object {key} is corrupt")
+        return data
+
+    def get(self, key):
+        return json.loads(self.get_bytes(key))
+
+    def store_menu(self, menu_data):
+        """Store a menu's categories and items; returns its tree key"""
+        categories = []
+        for category in menu_data['categories']:
+            if 'items' in category:
+                category = dict(category, items=[self.put(item) for item in category['items']])
+            categories.append(self.put(category))
+        return self.put(dict(menu_data, categories=categories))
+
+    def load_tree(self, key):
+        """The menu a tree key stands for"""
+        tree = self.get(key)
+        categories = []
+        for category in (self.get(category_key) for category_key in tree['categories']):
+            if 'items' in category:
+                category['items'] = [self.get(item_key) for item_key in category['items']]
+            categories.append(category)
+        tree['categories'] = categories
+        return tree
+
+    # Versions
+
+    def _ref_dir(self, label):
+        return os.path.join(self.root, "refs", label)
+
+    def labels(self):
+        try:
+            return sorted(os.listdir(os.path.join(self.root, "refs")))
+        except FileNotFoundError:
+            return []
+
+    def versions(self, label):
+        """Version numbers of a menu, oldest first"""
+        try:
+            names = os.listdir(self._ref_dir(label))
+        except FileNotFoundError:
+            return []
+        return sorted(int(name[:-len('.json')]) for name in names
+                      if name.endswith('.json') and name[:-len('.json')].isdigit())
+
+    def version(self, label, number):
+        try:
+            with open(os.path.join(self._ref_dir(label), f"{number}.json"), 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise KeyError(f"{label} has no version {number}") from None
+
+    def head_version(self, label):
+        try:
+            with open(os.path.join(self._ref_dir(label), "HEAD"), 'r') as f:
+                return int(f.read())
+        except FileNotFoundError:
+            return None
+
+    def head(self, label):
+        """The published version record of a menu, or None before its first save"""
+        number = self.head_version(label)
+        return None if number is None else self.version(label, number)
+
+    def set_head(self, label, number):
+        """Publish a version: the pointer swap behind checkout and rollback"""
+        atomic_write(os.path.join(self._ref_dir(label), "HEAD"), f"{number}\n".encode('ascii'))
+
+    def _record(self, label, digest, size, message, tree=None, raw=None, ascii=False, newline=False):
+        """Write a version record and publish it; returns the record"""
+        versions = self.versions(label)
+        record = {
+            'version': versions[-1] + 1 if versions else 1,
+            'parent': self.head_version(label),
+            'tree': tree,
+            'hash': digest,
+            'bytes': size,
+            'ascii': ascii,
+            'newline': newline,
+            'time': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+            'message': message,
+        }
+        if raw is not None:
+            record['raw'] = raw
+        os.makedirs(self._ref_dir(label), exist_ok=True)
+        atomic_write(os.path.join(self._ref_dir(label), f"{record['version']}.json"),
+                     json.dumps(record, indent=2).encode('utf-8'))
+        self.set_head(label, record['version'])
+        return record
+
+    def commit(self, label, menu_data, data, message):
+        """
+        Record `data`, the serialized `menu_data` (None if it is not JSON), as
+        the next version of a menu and publish it. Returns (record, created);
+        nothing is recorded when the head already holds these bytes.
+        """
+        digest = bytes_hash(data)
+        head = self.head(label)
+        if head is not None and head['hash'] == digest:
+            return head, False
+        if not is_tree_menu(menu_data):
+            return self._record(label, digest, len(data), message, raw=self.put_bytes(data)), True
+        # Bytes that are all ASCII were written with escapes (or need none)
+        ascii, newline = data.isascii(), data.endswith(b"\n")
+        raw = None if render(menu_data, ascii, newline) == data else self.put_bytes(data)
+        tree = self.store_menu(menu_data)
+        return self._record(label, digest, len(data), message, tree, raw, ascii, newline), True
+
+    def commit_tree(self, label, tree, digest, size, message, ascii=True, newline=False):
+        """commit() for a menu stored through TreeBuilder and written as json.dump(indent=2)"""
+        head = self.head(label)
+        if head is not None and head['hash'] == digest:
+            return head, False
+        return self._record(label, digest, size, message, self.put(tree), None, ascii, newline), True
+
+    def track(self, label, path, data=None):
+        """
+        Record the menu file at `path` (its bytes may be passed in) if it is
+        not the published version, e.g. after a hand edit. Returns the new
+        record or None.
+        """
+        if data is None:
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+            except FileNotFoundError:
+                return None
+        head = self.head(label)
+        if head is not None and head['hash'] == bytes_hash(data):
+            return None
+        try:
+            menu_data = json.loads(data)
+        except ValueError:
+            menu_data = None
+        message = "imported" if head is None else "edited outside the store"
+        return self.commit(label, menu_data, data, message)[0]
+
+    def write(self, label, path, menu_data, data, message):
+        """
+        Save a menu: keep any unrecorded edit of the file, commit `data` and
+        write it to `path`. Returns (record, whether the file was written).
+        """
+        self.track(label, path)
+        record, _ = self.commit(label, menu_data, data, message)
+        return record, write_if_changed(path, data)
+
+    def materialize(self, record):
+        """A version's file bytes"""
+        if 'raw' in record:
+            data = self.get_bytes(record['raw'])
+        else:
+            data = render(self.load_tree(record['tree']), record['ascii'], record['newline'])
+        if bytes_hash(data) != record['hash']:
+            raise ValueError(f"version {record['version']} does not reproduce its recorded hash")
+        return data
+
+    def load(self, record):
+        """A version's menu data"""
+        if record.get('tree') is not None:
+            return self.load_tree(record['tree'])
+        return json.loads(self.get_bytes(record['raw']))
+
+    def checkout(self, label, number, path):
+        """
+        Publish an existing version: move HEAD to it and rewrite the menu
+        file. An unrecorded edit of the file is committed first so it can be
+        checked out again. Returns (record, whether the file was written).
+        """
+        record = self.version(label, number)
+        data = self.materialize(record)
+        self.track(label, path)
+        self.set_head(label, number)
+        return record, write_if_changed(path, data)
+
+    def rollback(self, label, path, steps=1):
+        """Check out the version `steps` parents back from HEAD"""
+        record = self.head(label)
+        if record is None:
+            raise KeyError(f"{label} has no versions")
+        for _ in range(steps):
+            if record['parent'] is None:
+                raise KeyError(f"{label} v{record['version']} is its first version")
+            record = self.version(label, record['parent'])
+        return self.checkout(label, record['version'], path)
+
+    def stats(self):
+        """Object count and bytes on disk against keeping every version as a whole file"""
+        objects = stored = 0
+        for directory, _, names in os.walk(os.path.join(self.root, "objects")):
+            for name in names:
+                if not name.startswith("."):
+                    objects += 1
+                    stored += os.path.getsize(os.path.join(directory, name))
+        versions = whole = 0
+        for label in self.labels():
+            for number in self.versions(label):
+                versions += 1
+                whole += self.version(label, number)['bytes']
+        return {'labels': len(self.labels()), 'versions': versions, 'objects': objects,
+                'storedBytes': stored, 'wholeFileBytes': whole}
+
+_stores = {}
+
+def open_store(menus_dir):
+    """The store next to the menus in menus_dir, one instance per process"""
+    root = os.path.join(os.path.abspath(menus_dir), STORE_DIR_NAME)
+    if root not in _stores:
+        _stores[root] = MenuStore(root)
+    return _stores[root]
+
+def save(path, menu_data, data, message):
+    """Save a serialized menu file through the store next to it; returns (record, written)"""
+    return open_store(os.path.dirname(path)).write(label_for(path), path, menu_data, data, message)
+
+def menu_files(menus_dir):
+    """Menu files the store keeps versions of: sources and enhanced menus"""
+    return sorted(os.path.join(menus_dir, name) for name in os.listdir(menus_dir)
+                  if name.endswith('.json') and not name.startswith('.') and not name.endswith(UNSTORED_NAMES))
+
+def print_record(record, head):
+    marker = "*" if record['version'] == head else " "
+    print(f"{marker} v{record['version']:<4} {record['time']}  {record['hash']}  "
+          f"{record['bytes'] / 1024:>7.1f} KB  {record['message']}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect, publish and roll back menu versions")
+    parser.add_argument('--menus-dir', default=MENUS_DIR, help="menus and their store (default: %(default)s)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    log_parser = commands.add_parser('log', help="list the versions of a menu, * marks HEAD")
+    log_parser.add_argument('label', help="menu file stem, e.g. food or food-enhanced")
+    show_parser = commands.add_parser('show', help="print a version of a menu")
+    show_parser.add_argument('label')
+    show_parser.add_argument('version', type=int, nargs='?', help="default: HEAD")
+    show_parser.add_argument('-o', '--output', help="write it here instead of stdout")
+    diff_parser = commands.add_parser('diff', help="summarize the changes between two versions")
+    diff_parser.add_argument('label')
+    diff_parser.add_argument('old', type=int, nargs='?', help="default: HEAD's parent")
+    diff_parser.add_argument('new', type=int, nargs='?', help="default: HEAD")
+    diff_parser.add_argument('-o', '--output', help="also write the patch (see menu_diff.py)")
+    checkout_parser = commands.add_parser('checkout', help="publish a version and rewrite the menu file")
+    checkout_parser.add_argument('label')
+    checkout_parser.add_argument('version', type=int)
+    rollback_parser = commands.add_parser('rollback', help="publish the version before HEAD")
+    rollback_parser.add_argument('label')
+    rollback_parser.add_argument('--steps', type=int, default=1, help="versions to go back (default: 1)")
+    import_parser = commands.add_parser('import', help="record menu files as they are now")
+    import_parser.add_argument('files', nargs='*', help="default: every source and enhanced menu")
+    commands.add_parser('stats', help="object count and deduplication")
+    args = parser.parse_args()
+
+    store = open_store(args.menus_dir)
+    try:
+        if args.command == 'log':
+            head = store.head_version(args.label)
+            numbers = store.versions(args.label)
+            if not numbers:
+                sys.exit(f"❌ No versions of {args.label}")
+            for number in reversed(numbers):
+                print_record(store.version(args.label, number), head)
+
+        elif args.command == 'show':
+            record = store.head(args.label) if args.version is None else store.version(args.label, args.version)
+            if record is None:
+                sys.exit(f"❌ No versions of {args.label}")
+            data = store.materialize(record)
+            if args.output:
+                atomic_write(args.output, data)
+            else:
+                sys.stdout.buffer.write(data)
+
+        elif args.command == 'diff':
+            from menu_diff import diff_menus, patch_summary, serialize_patch
+            head = store.head(args.label)
+            if head is None:
+                sys.exit(f"❌ No versions of {args.label}")
+            new = head if args.new is None else store.version(args.label, args.new)
+            old_number = args.old if args.old is not None else new['parent']
+            if old_number is None:
+                sys.exit(f"❌ {args.label} v{new['version']} is its first version")
+            old = store.version(args.label, old_number)
+            patch = diff_menus(store.load(old), store.load(new), old['hash'], new['hash'])
+            if args.output:
+                atomic_write(args.output, serialize_patch(patch))
+            print(f"📊 {args.label} v{old['version']} -> v{new['version']}: {patch_summary(patch)}")
+
+        elif args.command in ('checkout', 'rollback'):
+            path = os.path.join(args.menus_dir, f"{args.label}.json")
+            if args.command == 'checkout':
+                record, written = store.checkout(args.label, args.version, path)
+            else:
+                record, written = store.rollback(args.label, path, args.steps)
+            print(f"✅ {args.label} v{record['version']} published"
+                  + (f", {os.path.basename(path)} rewritten" if written else f", {os.path.basename(path)} unchanged"))
+            if written and not args.label.endswith("-enhanced"):
+                print("   Run enhance-menus.py --incremental to rebuild its enhanced menu")
+
+        elif args.command == 'import':
+            for path in args.files or menu_files(args.menus_dir):
+                record = store.track(label_for(path), path)
+                if record is None:
+                    print(f"   ✓ {os.path.basename(path)} unchanged")
+                else:
+                    print(f"   ✓ {os.path.basename(path)} recorded as v{record['version']}")
+
+        else:
+            stats = store.stats()
+            ratio = stats['storedBytes'] / stats['wholeFileBytes'] if stats['wholeFileBytes'] else 0
+            print(f"📊 {stats['labels']} menus, {stats['versions']} versions, {stats['objects']} objects")
+            print(f"📊 {stats['storedBytes'] / 1024:.1f} KB stored vs {stats['wholeFileBytes'] / 1024:.1f} KB "
+                  f"as whole files ({ratio:.0%})")
+    except (KeyError, ValueError) as e:
+        sys.exit(f"❌ {e.args[0] if e.args else e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Streaming reader/writer for menu JSON files.
+
+read_menu_events() walks a menu file chunk by chunk and yields one event per
+top-level field, category header, item and category trailer, so only a
+single item is ever parsed at a time. write_menu_events() turns the same
+event stream back into text that is byte-identical to
+json.dump(menu, f, indent=2).
+
+Events, in document order:
+    ("field", key, value)           top-level field other than "categories"
+    ("categories_start",)           the "categories" array opens
+    ("category_start", header)      category fields that come before "items"
+    ("item", item)
+    ("category_end", trailer, has_items)
+                                    category fields that come after "items";
+                                    has_items is False if the key was absent
+    ("categories_end",)
+"""
+
+import json
+
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\n\r"
+_decoder = json.JSONDecoder()
+
+class _Scanner:
+    """Minimal pull tokenizer over a text file read in chunks"""
+
+    def __init__(self, fp, chunk_size=CHUNK_SIZE, on_chunk=None):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.on_chunk = on_chunk
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        """Read another chunk, dropping the consumed prefix of the buffer"""
+        if self.eof:
+            return False
+        chunk = self.fp.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        if self.on_chunk is not None:
+            self.on_chunk(chunk)
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of menu JSON")
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' at offset {self.pos}, found '{found}'")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number at the very end of the buffer may continue in the next chunk
+            if end == len(self.buffer) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def key(self):
+        key = self.value()
+        if not isinstance(key, str):
+            raise ValueError(f"Expected an object key, found {key!r}")
+        self.expect(":")
+        return key
+
+    def more(self, closer):
+        """Consume a separating comma; False once the closing bracket is reached"""
+        char = self.peek()
+        if char == closer:
+            self.pos += 1
+            return False
+        if char == ",":
+            self.pos += 1
+        return True
+
+def read_menu_events(fp, chunk_size=CHUNK_SIZE, on_chunk=None):
+    """Yield menu events from a text file object without loading the whole document"""
+    scanner = _Scanner(fp, chunk_size, on_chunk)
+    scanner.expect("{")
+    while scanner.more("}"):
+        key = scanner.key()
+        if key != "categories":
+            yield ("field", key, scanner.value())
+            continue
+
+        yield ("categories_start",)
+        scanner.expect("[")
+        while scanner.more("]"):
+            scanner.expect("{")
+            header, trailer = {}, {}
+            fields = header
+            while scanner.more("}"):
+                key = scanner.key()
+                if key != "items":
+                    fields[key] = scanner.value()
+                    continue
+                yield ("category_start", header)
+                scanner.expect("[")
+                while scanner.more("]"):
+                    yield ("item", scanner.value())
+                fields = trailer
+            if fields is header:
+                # Category without an "items" array
+                yield ("category_start", header)
+                yield ("category_end", {}, False)
+            else:
+                yield ("category_end", trailer, True)
+        yield ("categories_end",)
+
+def _dump(value, level):
+    """json.dumps(indent=2) re-indented for nesting depth `level`"""
+    text = json.dumps(value, indent=2)
+    return text.replace("\n", "\n" + "  " * level) if level else text
+
+class MenuStreamWriter:
+    """Write menu events as text identical to json.dump(menu, fp, indent=2)"""
+
+    def __init__(self, write):
+        self.write = write
+        self.first_field = True
+        self.first_category = True
+        self.first_category_field = True
+        self.first_item = True
+        self.has_items = False
+
+    def _open_field(self, key, level, first):
+        self.write(("\n" if first else ",\n") + "  " * level + json.dumps(key) + ": ")
+
+    def start(self):
+        self.write("{")
+
+    def field(self, key, value):
+        self._open_field(key, 1, self.first_field)
+        self.first_field = False
+        self.write(_dump(value, 1))
+
+    def categories_start(self):
+        self._open_field("categories", 1, self.first_field)
+        self.first_field = False
+        self.first_category = True
+        self.write("[")
+
+    def category_start(self, header):
+        self.write(("\n" if self.first_category else ",\n") + "    {")
+        self.first_category = False
+        self.first_category_field = True
+        for key, value in header.items():
+            self._category_field(key, value)
+        self.has_items = False
+        self.first_item = True
+
+    def _category_field(self, key, value):
+        self._open_field(key, 3, self.first_category_field)
+        self.first_category_field = False
+        self.write(_dump(value, 3))
+
+    def item(self, item):
+        if not self.has_items:
+            self._open_field("items", 3, self.first_category_field)
+            self.first_category_field = False
+            self.write("[")
+            self.has_items = True
+        self.write(("\n" if self.first_item else ",\n") + "        " + _dump(item, 4))
+        self.first_item = False
+
+    def category_end(self, trailer, has_items_key=True):
+        if self.has_items:
+            self.write("\n      ]")
+        elif has_items_key:
+            self._open_field("items", 3, self.first_category_field)
+            self.first_category_field = False
+            self.write("[]")
+        for key, value in trailer.items():
+            self._category_field(key, value)
+        self.write("}" if self.first_category_field else "\n    }")
+
+    def categories_end(self):
+        self.write("]" if self.first_category else "\n  ]")
+
+    def end(self):
+        self.write("}" if self.first_field else "\n}")
+
+def write_menu_events(events, write):
+    """Drive a MenuStreamWriter from an event iterator; `write` takes str chunks"""
+    writer = MenuStreamWriter(write)
+    writer.start()
+    for event in events:
+        kind = event[0]
+        if kind == "field":
+            writer.field(event[1], event[2])
+        elif kind == "categories_start":
+            writer.categories_start()
+        elif kind == "category_start":
+            writer.category_start(event[1])
+        elif kind == "item":
+            writer.item(event[1])
+        elif kind == "category_end":
+            writer.category_end(*event[1:])
+        elif kind == "categories_end":
+            writer.categories_end()
+    writer.end()
+
+def map_items(events, transform):
+    """Generator stage applying transform(item, category_id) to every item event"""
+    category_id = None
+    for event in events:
+        if event[0] == "category_start":
+            category_id = event[1].get("id")
+        elif event[0] == "item":
+            event = ("item", transform(event[1], category_id))
+        yield event
+
+def insert_field(events, key, value):
+    """Generator stage adding a top-level field just before "categories" (or at the end without one)"""
+    inserted = False
+    for event in events:
+        if event[0] == "categories_start" and not inserted:
+            yield ("field", key, value)
+            inserted = True
+        yield event
+    if not inserted:
+        yield ("field", key, value)
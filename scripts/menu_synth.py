@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Synthetic menu generator for benchmarks.
+
+Produces food/bar/cafe-shaped menu JSON of any size, using the real
+category ids from the enhancer's mapping tables so every item exercises the
+same rule lookups as the production menus. Names and descriptions are drawn
+from a small dish vocabulary that hits the classifier keywords (onion,
+paneer, prawns, ...) at roughly the same rate as the real menus. Output is
+deterministic for a given seed.
+
+Usage:
+    python3 scripts/menu_synth.py food 10000 > /tmp/food-10k.json
+    python3 scripts/menu_synth.py bar 100 --seed 7 --output /tmp/bar.json
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import random
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+NAME_WORDS = {
+    'food': ["Paneer", "Chicken", "Mushroom", "Prawn", "Corn", "Lamb", "Tofu", "Aloo",
+             "Tikka", "Kebab", "Dimsum", "Risotto", "Pasta", "Curry", "Biryani", "Naan",
+             "Burger", "Pizza", "Salad", "Soup", "Makhani", "Masala", "Tandoori", "Garlic"],
+    'bar': ["Gin", "Rum", "Whisky", "Vodka", "Tequila", "Sling", "Sour", "Mule", "Spritz",
+            "Old Fashioned", "Negroni", "Margarita", "Lager", "Ale", "Merlot", "Shiraz"],
+    'cafe': ["Latte", "Cappuccino", "Espresso", "Mocha", "Cold Brew", "Frappe", "Chai",
+             "Matcha", "Hazelnut", "Caramel", "Vanilla", "Iced", "Hot", "Shake", "Tea"],
+}
+
+DESCRIPTION_WORDS = ["onion", "garlic", "cream", "butter", "cheese", "cashew", "egg",
+                     "wheat", "potato", "ginger", "chilli", "smoky", "tangy", "fresh",
+                     "herbs", "tomato", "mint", "lime", "honey", "milk", "spiced",
+                     "roasted", "crispy", "served", "with", "house", "sauce", "glaze"]
+
+ID_PREFIXES = {'food': "food", 'bar': "bar", 'cafe': "cafe"}
+
+# Which mapping table in enhance-menus.py holds each venue's category ids
+CATEGORY_TABLES = {'food': "CUISINE_MAPPINGS", 'bar': "BAR_TYPES", 'cafe': "CAFE_TYPES"}
+
+def load_script(filename):
+    """Import one of the hyphenated scripts in scripts/ as a module"""
+    name = os.path.splitext(filename)[0].replace('-', '_')
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, os.path.join(SCRIPT_DIR, filename))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+def venue_category_ids(venue):
+    """The real category ids the enhancer has rules for"""
+    enhancer = load_script("enhance-menus.py")
+    return list(getattr(enhancer, CATEGORY_TABLES[venue]))
+
+def generate_item(rng, venue, category_id, item_id):
+    words = NAME_WORDS.get(venue, NAME_WORDS['food'])
+    item = {
+        "id": item_id,
+        "name": " ".join(rng.sample(words, rng.randint(2, 3))),
+        "description": " ".join(rng.choice(DESCRIPTION_WORDS) for _ in range(rng.randint(4, 12))).capitalize(),
+        "price": rng.randrange(99, 1999, 10),
+        "category": category_id,
+    }
+    if venue == 'bar' and rng.random() < 0.3:
+        item["bottlePrice"] = item["price"] * rng.randint(8, 14)
+    if venue != 'bar':
+        item["dietary"] = ["veg"] if rng.random() < 0.6 else ["non-veg"]
+    if venue == 'food' and rng.random() < 0.5:
+        item["spiceLevel"] = rng.randint(1, 4)
+    if rng.random() < 0.15:
+        item["isRecommended"] = True
+    if rng.random() < 0.05:
+        item["isChefSpecial"] = True
+    item["isAvailable"] = rng.random() > 0.02
+    return item
+
+def generate_menu(venue, item_count, category_ids, seed=0):
+    """A menu with `item_count` items spread evenly over `category_ids`"""
+    rng = random.Random(seed)
+    prefix = ID_PREFIXES.get(venue, venue)
+    categories = []
+    per_category, extra = divmod(item_count, len(category_ids))
+    for order, category_id in enumerate(category_ids, start=1):
+        count = per_category + (1 if order <= extra else 0)
+        categories.append({
+            "id": category_id,
+            "name": category_id.replace('-', ' ').title(),
+            "description": "",
+            "displayOrder": order,
+            "items": [
+                generate_item(rng, venue, category_id, f"{prefix}-{category_id}-{seq:03d}")
+                for seq in range(1, count + 1)
+            ],
+        })
+    return {
+        "venue": venue,
+        "name": f"Synthetic {venue} menu",
+        "description": f"{item_count} generated items",
+        "tagline": "",
+        "categories": categories,
+        "lastUpdated": "2025-01-01",
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic menu JSON for benchmarks")
+    parser.add_argument('venue', choices=sorted(ID_PREFIXES))
+    parser.add_argument('items', type=int, help="number of items to generate")
+    parser.add_argument('--categories', help="comma separated category ids (default: the enhancer's tables)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="write here instead of stdout")
+    args = parser.parse_args()
+
+    if args.categories:
+        category_ids = args.categories.split(',')
+    else:
+        category_ids = venue_category_ids(args.venue)
+
+    menu = generate_menu(args.venue, args.items, category_ids, args.seed)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(menu, f, indent=2)
+    else:
+        json.dump(menu, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tag vocabulary for the menu enhancers.
+
+Every tag the mapping tables can contribute, plus the tags the enhancers
+derive themselves (popular, spicy, mild, premium), gets a fixed bit. While
+an item is enhanced its tags are held as one integer, so merging is `|` and
+membership is `&`, and the final array is always written in vocabulary
+order instead of whatever order a set happened to iterate in.
+
+Tags on a source item that no table knows about get no bit; they are kept
+and written after the known tags, sorted. With --tag-masks the enhanced
+menus also carry each item's `tagMask` and the menu's `tagVocabulary`, so a
+consumer can filter with `mask & wanted == wanted`.
+
+    from menu_tags import TagVocabulary
+    tags = TagVocabulary(["popular", "spicy", "mild"])
+    mask, extras = tags.mask(item['tags'])
+    item['tags'] = tags.tags_for(mask | tags.bit('popular'), extras)
+"""
+
+# Tags the enhancers add from item fields rather than from a mapping table
+DERIVED_TAGS = ("popular", "spicy", "mild", "premium")
+
+# Bar items priced at or above any of these get the derived "premium" tag
+PREMIUM_PRICES = {"price": 1000, "bottlePrice": 15000}
+
+def is_premium(item):
+    return any(item.get(field, 0) >= threshold for field, threshold in PREMIUM_PRICES.items())
+
+class TagVocabulary:
+    """Fixed tag -> bit assignment; bit order is output order"""
+
+    def __init__(self, tags):
+        self.tags = []
+        self.bits = {}
+        for tag in tags:
+            if tag not in self.bits:
+                self.bits[tag] = 1 << len(self.tags)
+                self.tags.append(tag)
+
+    @classmethod
+    def from_mappings(cls, *tables):
+        """Vocabulary of the derived tags plus every tag in the mapping tables, in first-seen order"""
+        tags = list(DERIVED_TAGS)
+        for table in tables:
+            for mapping in table.values():
+                tags.extend(mapping.get('tags', []))
+                for override in mapping.get('items', {}).values():
+                    tags.extend(override.get('tags', []))
+        return cls(tags)
+
+    def __len__(self):
+        return len(self.tags)
+
+    def bit(self, tag):
+        return self.bits[tag]
+
+    def mask(self, tags):
+        """(bitmask of the known tags, tuple of tags outside the vocabulary)"""
+        mask = 0
+        extras = []
+        for tag in tags:
+            bit = self.bits.get(tag)
+            if bit is None:
+                if tag not in extras:
+                    extras.append(tag)
+            else:
+                mask |= bit
+        return mask, tuple(extras)
+
+    def tags_for(self, mask, extras=()):
+        """Tag list for a mask: known tags in vocabulary order, then unknown ones sorted"""
+        tags = []
+        while mask:
+            low = mask & -mask
+            tags.append(self.tags[low.bit_length() - 1])
+            mask ^= low
+        tags.extend(sorted(extras))
+        return tags
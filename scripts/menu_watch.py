@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Directory watching for the long-running --watch mode of enhance-menus.py.
+
+On Linux the directory is watched with inotify (through ctypes, no extra
+packages); elsewhere, or if inotify is unavailable, it is polled by
+comparing (mtime, size) snapshots. Either way wait_for_changes() blocks
+until something changes, then keeps collecting until the directory has
+been quiet for a short while, so an editor's write-rename-chmod burst or a
+JS script rewriting several menus arrives as one batch of file names.
+
+    watcher = open_watcher("src/data/menus")
+    while True:
+        names = wait_for_changes(watcher)
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+
+# Coalescing: wait until nothing changed for QUIET seconds, but never longer than MAX_WAIT
+QUIET = 0.05
+MAX_WAIT = 0.5
+POLL_INTERVAL = 0.25
+
+# inotify(7) event masks
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE
+_EVENT = struct.Struct("iIII")
+
+class InotifyWatcher:
+    """Changed file names in one directory, from the kernel's inotify queue"""
+
+    kind = "inotify"
+
+    def __init__(self, directory):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.directory = directory
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK) < 0:
+            error = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(error, f"inotify_add_watch failed for {directory}")
+
+    def poll(self, timeout):
+        """Names changed within `timeout` seconds (None blocks); None means rescan everything"""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        names = set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return names
+        offset = 0
+        while offset < len(data):
+            _, mask, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            if mask & IN_Q_OVERFLOW:
+                return None
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if name:
+                names.add(os.fsdecode(name))
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+class PollingWatcher:
+    """Changed file names found by comparing directory snapshots"""
+
+    kind = "polling"
+
+    def __init__(self, directory, interval=POLL_INTERVAL):
+        self.directory = directory
+        self.interval = interval
+        self.snapshot = self.scan()
+
+    def scan(self):
+        snapshot = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    stat = entry.stat()
+                    snapshot[entry.name] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def poll(self, timeout):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            current = self.scan()
+            names = {name for name in current.keys() | self.snapshot.keys()
+                     if current.get(name) != self.snapshot.get(name)}
+            self.snapshot = current
+            if names:
+                return names
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            wait = self.interval if deadline is None else min(self.interval, max(0, deadline - time.monotonic()))
+            time.sleep(wait)
+
+    def close(self):
+        pass
+
+def open_watcher(directory, polling=False):
+    """An inotify watcher where the platform has one, else a polling watcher"""
+    if not polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(directory)
+        except (OSError, AttributeError) as e:
+            print(f"⚠️  inotify unavailable ({e}), polling {directory} instead", file=sys.stderr)
+    return PollingWatcher(directory)
+
+def wait_for_changes(watcher, quiet=QUIET, max_wait=MAX_WAIT):
+    """Block until files change, then coalesce the burst; None means rescan everything"""
+    names = watcher.poll(None)
+    deadline = time.monotonic() + max_wait
+    while names is not None:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        more = watcher.poll(min(quiet, remaining))
+        if more is None:
+            return None
+        if not more:
+            break
+        names |= more
+    return names
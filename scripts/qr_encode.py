@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+QR code encoder (ISO/IEC 18004, byte mode, versions 1-40) with a matrix cache.
+
+encode_text() turns a URL into a module matrix: a list of rows of booleans,
+True for dark modules, without the quiet zone. The smallest version that
+fits is used and the mask with the lowest penalty score is applied.
+Rendering is left to the caller (sticker_render.render_qr) so modules can be
+drawn straight at the target pixel size.
+
+MatrixCache keeps encoded matrices in .cache/qr-matrices.json keyed by
+error-correction level and text, so re-running the table stickers only
+encodes URLs that are new.
+
+Usage:
+    python3 scripts/qr_encode.py "https://amante.in/menu/food?table=12"
+    python3 scripts/qr_encode.py "https://amante.in/menu" --ecc M
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from menu_io import atomic_write
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+CACHE_PATH = os.path.join(PROJECT_DIR, ".cache/qr-matrices.json")
+
+# Bump if the encoder's output changes so cached matrices are re-encoded
+ENCODER_VERSION = 1
+
+ECC_LEVELS = ('L', 'M', 'Q', 'H')
+ECC_FORMAT_BITS = {'L': 1, 'M': 0, 'Q': 3, 'H': 2}
+
+# Per version 1-40 (index 0 unused), from the ISO/IEC 18004 capacity tables
+ECC_CODEWORDS_PER_BLOCK = {
+    'L': (-1, 7, 10, 15, 20, 26, 18, 20, 24, 30, 18, 20, 24, 26, 30, 22, 24, 28, 30, 28, 28,
+          28, 28, 30, 30, 26, 28, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30),
+    'M': (-1, 10, 16, 26, 18, 24, 16, 18, 22, 22, 26, 30, 22, 22, 24, 24, 28, 28, 26, 26, 26,
+          26, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28),
+    'Q': (-1, 13, 22, 18, 26, 18, 24, 18, 22, 20, 24, 28, 26, 24, 20, 30, 24, 28, 28, 26, 30,
+          28, 30, 30, 30, 30, 28, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30),
+    'H': (-1, 17, 28, 22, 16, 22, 28, 26, 26, 24, 28, 24, 28, 22, 24, 24, 30, 28, 28, 26, 28,
+          30, 24, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30),
+}
+NUM_ERROR_CORRECTION_BLOCKS = {
+    'L': (-1, 1, 1, 1, 1, 1, 2, 2, 2, 2, 4, 4, 4, 4, 4, 6, 6, 6, 6, 7, 8,
+          8, 9, 9, 10, 12, 12, 12, 13, 14, 15, 16, 17, 18, 19, 19, 20, 21, 22, 24, 25),
+    'M': (-1, 1, 1, 1, 2, 2, 4, 4, 4, 5, 5, 5, 8, 9, 9, 10, 10, 11, 13, 14, 16,
+          17, 17, 18, 20, 21, 23, 25, 26, 28, 29, 31, 33, 35, 37, 38, 40, 43, 45, 47, 49),
+    'Q': (-1, 1, 1, 2, 2, 4, 4, 6, 6, 8, 8, 8, 10, 12, 16, 12, 17, 16, 18, 21, 20,
+          23, 23, 25, 27, 29, 34, 34, 35, 38, 40, 43, 45, 48, 51, 53, 56, 59, 62, 65, 68),
+    'H': (-1, 1, 1, 2, 4, 4, 4, 5, 6, 8, 8, 11, 11, 16, 16, 18, 16, 19, 21, 25, 25,
+          25, 34, 30, 32, 35, 37, 40, 42, 45, 48, 51, 54, 57, 60, 63, 66, 70, 74, 77, 81),
+}
+
+MASKS = [
+    lambda x, y: (x + y) % 2 == 0,
+    lambda x, y: y % 2 == 0,
+    lambda x, y: x % 3 == 0,
+    lambda x, y: (x + y) % 3 == 0,
+    lambda x, y: (x // 3 + y // 2) % 2 == 0,
+    lambda x, y: x * y % 2 + x * y % 3 == 0,
+    lambda x, y: (x * y % 2 + x * y % 3) % 2 == 0,
+    lambda x, y: ((x + y) % 2 + x * y % 3) % 2 == 0,
+]
+
+def raw_data_modules(version):
+    """Modules left for data and ECC once the function patterns are placed"""
+    result = (16 * version + 128) * version + 64
+    if version >= 2:
+        alignments = version // 7 + 2
+        result -= (25 * alignments - 10) * alignments - 55
+        if version >= 7:
+            result -= 36
+    return result
+
+def data_codewords(version, ecc):
+    return (raw_data_modules(version) // 8
+            - ECC_CODEWORDS_PER_BLOCK[ecc][version] * NUM_ERROR_CORRECTION_BLOCKS[ecc][version])
+
+def alignment_positions(version):
+    if version == 1:
+        return []
+    count = version // 7 + 2
+    size = version * 4 + 17
+    step = (version * 8 + count * 3 + 5) // (count * 4 - 4) * 2
+    return [6] + sorted(size - 7 - i * step for i in range(count - 1))
+
+# GF(256) arithmetic for Reed-Solomon, reducing by x^8 + x^4 + x^3 + x^2 + 1
+def gf_multiply(x, y):
+    z = 0
+    for i in reversed(range(8)):
+        z = (z << 1) ^ ((z >> 7) * 0x11D)
+        z ^= ((y >> i) & 1) * x
+    return z
+
+def rs_divisor(degree):
+    result = [0] * (degree - 1) + [1]
+    root = 1
+    for _ in range(degree):
+        for j in range(degree):
+            result[j] = gf_multiply(result[j], root)
+            if j + 1 < degree:
+                result[j] ^= result[j + 1]
+        root = gf_multiply(root, 0x02)
+    return result
+
+def rs_remainder(data, divisor):
+    result = [0] * len(divisor)
+    for byte in data:
+        factor = byte ^ result.pop(0)
+        result.append(0)
+        for i, coefficient in enumerate(divisor):
+            result[i] ^= gf_multiply(coefficient, factor)
+    return result
+
+def encode_data(data, ecc):
+    """Pick the smallest version and build its interleaved codeword sequence"""
+    for version in range(1, 41):
+        count_bits = 8 if version <= 9 else 16
+        capacity = data_codewords(version, ecc) * 8
+        if 4 + count_bits + len(data) * 8 <= capacity:
+            break
+    else:
+        raise ValueError(f"{len(data)} bytes is too long for a QR code at ECC level {ecc}")
+
+    bits = [0, 1, 0, 0]  # byte mode indicator
+    bits += [(len(data) >> i) & 1 for i in reversed(range(count_bits))]
+    for byte in data:
+        bits += [(byte >> i) & 1 for i in reversed(range(8))]
+    bits += [0] * min(4, capacity - len(bits))
+    bits += [0] * (-len(bits) % 8)
+    codewords = [int("".join(map(str, bits[i:i + 8])), 2) for i in range(0, len(bits), 8)]
+    for pad in (0xEC, 0x11) * capacity:
+        if len(codewords) * 8 >= capacity:
+            break
+        codewords.append(pad)
+
+    # Split into blocks, append each block's ECC, then interleave
+    num_blocks = NUM_ERROR_CORRECTION_BLOCKS[ecc][version]
+    block_ecc = ECC_CODEWORDS_PER_BLOCK[ecc][version]
+    raw_codewords = raw_data_modules(version) // 8
+    short_blocks = num_blocks - raw_codewords % num_blocks
+    short_length = raw_codewords // num_blocks
+    divisor = rs_divisor(block_ecc)
+    blocks, offset = [], 0
+    for i in range(num_blocks):
+        length = short_length - block_ecc + (0 if i < short_blocks else 1)
+        block = codewords[offset:offset + length]
+        offset += length
+        ecc_bytes = rs_remainder(block, divisor)
+        if i < short_blocks:
+            block = block + [None]
+        blocks.append(block + ecc_bytes)
+
+    result = [block[i] for i in range(len(blocks[0])) for block in blocks if block[i] is not None]
+    return version, result
+
+class _Matrix:
+    def __init__(self, version):
+        self.size = version * 4 + 17
+        self.modules = [[False] * self.size for _ in range(self.size)]
+        self.function = [[False] * self.size for _ in range(self.size)]
+
+    def set_function(self, x, y, dark):
+        self.modules[y][x] = dark
+        self.function[y][x] = True
+
+    def draw_function_patterns(self, version):
+        size = self.size
+        for i in range(size):
+            self.set_function(6, i, i % 2 == 0)
+            self.set_function(i, 6, i % 2 == 0)
+        for cx, cy in ((3, 3), (size - 4, 3), (3, size - 4)):
+            # Finder pattern plus its separator
+            for dy in range(-4, 5):
+                for dx in range(-4, 5):
+                    x, y = cx + dx, cy + dy
+                    if 0 <= x < size and 0 <= y < size:
+                        distance = max(abs(dx), abs(dy))
+                        self.set_function(x, y, distance not in (2, 4))
+        positions = alignment_positions(version)
+        last = len(positions) - 1
+        for i, cx in enumerate(positions):
+            for j, cy in enumerate(positions):
+                if (i, j) in ((0, 0), (0, last), (last, 0)):
+                    continue
+                for dy in range(-2, 3):
+                    for dx in range(-2, 3):
+                        self.set_function(cx + dx, cy + dy, max(abs(dx), abs(dy)) != 1)
+        # Reserve the format areas; the real bits are drawn once the mask is known
+        self.draw_format_bits('L', 0)
+        if version >= 7:
+            remainder = version
+            for _ in range(12):
+                remainder = (remainder << 1) ^ ((remainder >> 11) * 0x1F25)
+            bits = version << 12 | remainder
+            for i in range(18):
+                dark = (bits >> i) & 1 == 1
+                a, b = size - 11 + i % 3, i // 3
+                self.set_function(a, b, dark)
+                self.set_function(b, a, dark)
+
+    def draw_format_bits(self, ecc, mask):
+        data = ECC_FORMAT_BITS[ecc] << 3 | mask
+        remainder = data
+        for _ in range(10):
+            remainder = (remainder << 1) ^ ((remainder >> 9) * 0x537)
+        bits = (data << 10 | remainder) ^ 0x5412
+
+        def bit(i):
+            return (bits >> i) & 1 == 1
+
+        size = self.size
+        for i in range(6):
+            self.set_function(8, i, bit(i))
+        self.set_function(8, 7, bit(6))
+        self.set_function(8, 8, bit(7))
+        self.set_function(7, 8, bit(8))
+        for i in range(9, 15):
+            self.set_function(14 - i, 8, bit(i))
+        for i in range(8):
+            self.set_function(size - 1 - i, 8, bit(i))
+        for i in range(8, 15):
+            self.set_function(8, size - 15 + i, bit(i))
+        self.set_function(8, size - 8, True)
+
+    def draw_codewords(self, codewords):
+        size, i, total = self.size, 0, len(codewords) * 8
+        right = size - 1
+        while right >= 1:
+            if right == 6:
+                right = 5
+            upward = (right + 1) & 2 == 0
+            for vertical in range(size):
+                y = size - 1 - vertical if upward else vertical
+                for x in (right, right - 1):
+                    if not self.function[y][x] and i < total:
+                        self.modules[y][x] = (codewords[i >> 3] >> (7 - (i & 7))) & 1 == 1
+                        i += 1
+            right -= 2
+
+    def apply_mask(self, mask):
+        test = MASKS[mask]
+        for y in range(self.size):
+            row, function = self.modules[y], self.function[y]
+            for x in range(self.size):
+                if not function[x] and test(x, y):
+                    row[x] = not row[x]
+
+    def penalty(self):
+        """Penalty score from the four rules in the standard; lower is better"""
+        size, modules = self.size, self.modules
+        score = 0
+        lines = modules + [list(column) for column in zip(*modules)]
+        finder_like = ([True, False, True, True, True, False, True, False, False, False, False],
+                       [False, False, False, False, True, False, True, True, True, False, True])
+        for line in lines:
+            run_colour, run_length = None, 0
+            for module in line:
+                if module == run_colour:
+                    run_length += 1
+                    if run_length == 5:
+                        score += 3
+                    elif run_length > 5:
+                        score += 1
+                else:
+                    run_colour, run_length = module, 1
+            for start in range(size - 10):
+                if line[start:start + 11] in finder_like:
+                    score += 40
+        for y in range(size - 1):
+            for x in range(size - 1):
+                colour = modules[y][x]
+                if colour == modules[y][x + 1] == modules[y + 1][x] == modules[y + 1][x + 1]:
+                    score += 3
+        dark = sum(map(sum, modules))
+        total = size * size
+        score += ((abs(dark * 20 - total * 10) + total - 1) // total - 1) * 10
+        return score
+
+def encode_text(text, ecc='H', mask=None):
+    """
+    The module matrix for `text` as a list of rows of booleans (no quiet
+    zone), with `mask` (0-7) instead of the lowest-penalty one if given.
+    """
+    if ecc not in ECC_LEVELS:
+        raise ValueError(f"unknown error correction level {ecc!r}; use one of {', '.join(ECC_LEVELS)}")
+    version, codewords = encode_data(text.encode('utf-8'), ecc)
+    best, best_score = None, None
+    for mask in range(8) if mask is None else (mask,):
+        matrix = _Matrix(version)
+        matrix.draw_function_patterns(version)
+        matrix.draw_codewords(codewords)
+        matrix.apply_mask(mask)
+        matrix.draw_format_bits(ecc, mask)
+        score = matrix.penalty()
+        if best_score is None or score < best_score:
+            best, best_score = matrix, score
+    return best.modules
+
+def pack_rows(matrix):
+    return [format(int("".join('1' if dark else '0' for dark in row), 2), 'x') for row in matrix]
+
+def unpack_rows(rows, size):
+    return [[bit == '1' for bit in format(int(row, 16), f'0{size}b')] for row in rows]
+
+class MatrixCache:
+    """Encoded matrices keyed by ECC level and text, persisted as JSON"""
+
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        self.entries = {}
+        self.dirty = False
+        self.hits = self.misses = 0
+        try:
+            with open(path, 'r') as f:
+                cached = json.load(f)
+            if cached.get('version') == ENCODER_VERSION:
+                self.entries = cached['matrices']
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def get(self, text, ecc='H'):
+        key = f"{ecc}:{text}"
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            return unpack_rows(entry['rows'], entry['size'])
+        self.misses += 1
+        matrix = encode_text(text, ecc)
+        self.entries[key] = {'size': len(matrix), 'rows': pack_rows(matrix)}
+        self.dirty = True
+        return matrix
+
+    def save(self):
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        data = {'version': ENCODER_VERSION, 'matrices': self.entries}
+        atomic_write(self.path, json.dumps(data, sort_keys=True).encode('utf-8'))
+        self.dirty = False
+
+def main():
+    parser = argparse.ArgumentParser(description="Encode text as a QR code and print it to the terminal")
+    parser.add_argument('text')
+    parser.add_argument('--ecc', choices=ECC_LEVELS, default='H', help="error correction level (default: %(default)s)")
+    args = parser.parse_args()
+
+    matrix = encode_text(args.text, args.ecc)
+    quiet = [False] * (len(matrix) + 4)
+    padded = [quiet, quiet] + [[False, False] + row + [False, False] for row in matrix] + [quiet, quiet, quiet]
+    # Two rows per line using half blocks; light-on-dark terminals need inverted colours
+    for top, bottom in zip(padded[::2], padded[1::2]):
+        sys.stdout.write("".join(" ▀▄█"[top[x] + 2 * bottom[x]] for x in range(len(top))) + "\n")
+    version = (len(matrix) - 17) // 4
+    print(f"\n📊 Version {version} ({len(matrix)}x{len(matrix)} modules), ECC {args.ecc}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Reprice every venue menu from one rule set.
+
+All source menus under src/data/menus (or the ones given) are loaded into
+one PriceTable (see menu_pricing.py) and the rule set is applied as masked
+array operations: percentage changes by menu, venue, category, tag or id,
+rounding to ₹x9 / ₹x99 endings, and floors and caps on the final price.
+The run prints a diff of every changed price, and which bar items gain or
+lose the price-derived "premium" tag, before anything is written. It then saves the changed menus
+as their next versions in the menu store (menu_store.py), each file
+rewritten atomically and only after all of them have been serialized, and
+re-runs enhance-menus.py on them so the enhanced files pick up the new
+prices and tags. `menu_store.py rollback <menu>` undoes a repricing.
+
+A rule set file looks like:
+
+    {
+      "round": "x9",
+      "rules": [
+        {"venue": "bar", "percent": 6},
+        {"venue": "bar", "fields": ["bottlePrice"], "percent": 4, "round": "x99"},
+        {"menu": "food", "category": ["indian-mains", "rice-biryani"], "percent": 5, "floor": 249},
+        {"tag": "premium", "percent": 3, "cap": 29999}
+      ]
+    }
+
+Usage:
+    python3 scripts/reprice-menus.py q1-2026.json --dry-run
+    python3 scripts/reprice-menus.py q1-2026.json --diff q1-2026-diff.json
+    python3 scripts/reprice-menus.py bar-bump.json src/data/menus/bar.json --no-enhance
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from menu_io import atomic_write, dump_menu, read_menu
+from menu_store import save
+from menu_synth import load_script
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+MENUS_DIR = os.path.join(PROJECT_DIR, "src/data/menus")
+
+def load_menus(paths, enhancer):
+    """(label, venue, menu, {id: enhanced tags}, trailing newline) for each source menu"""
+    menus = []
+    for path in paths:
+        menu_data, trailing_newline = read_menu(path)
+        tags_by_id = {}
+        try:
+            with open(enhancer.derived_path(path, enhancer.ENHANCED_SUFFIX), 'r', encoding='utf-8') as f:
+                enhanced = json.load(f)
+            tags_by_id = {item['id']: item.get('tags', []) for category in enhanced['categories']
+                          for item in category['items'] if item.get('id')}
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            pass
+        menus.append((enhancer.menu_label(path), menu_data.get('venue'), menu_data, tags_by_id, trailing_newline))
+    return menus
+
+def diff_rows(table, new_prices):
+    """One dict per changed price, in menu order"""
+    rows = []
+    for index in table.changes(new_prices):
+        item = table.items[table.item[index]]
+        old, new = table.prices[index], new_prices[index]
+        rows.append({
+            'menu': table.menus[table.menu[index]][0],
+            'id': item.get('id'),
+            'name': item.get('name'),
+            'field': table.field_name(index),
+            'old': int(old),
+            'new': int(new),
+            'change': round((new - old) / old * 100, 2) if old else None,
+        })
+    return rows
+
+def print_diff(rows, show):
+    print(f"\n{'Menu':<14} {'Item':<34} {'Field':<12} {'Old':>8} {'New':>8} {'Change':>8}")
+    for row in rows[:show]:
+        change = f"{row['change']:+.1f}%" if row['change'] is not None else "-"
+        print(f"{row['menu']:<14} {str(row['name'])[:34]:<34} {row['field']:<12} "
+              f"{row['old']:>8} {row['new']:>8} {change:>8}")
+    if len(rows) > show:
+        print(f"… {len(rows) - show} more (see --diff for all)")
+
+    by_menu = {}
+    for row in rows:
+        by_menu.setdefault(row['menu'], []).append(row)
+    print()
+    for menu, menu_rows in by_menu.items():
+        changes = [row['change'] for row in menu_rows if row['change'] is not None]
+        print(f"📊 {menu}: {len(menu_rows)} prices, {min(changes):+.1f}% to {max(changes):+.1f}% "
+              f"(mean {sum(changes) / len(changes):+.1f}%)" if changes else f"📊 {menu}: {len(menu_rows)} prices")
+
+def main():
+    parser = argparse.ArgumentParser(description="Reprice menus from a rule set, with a dry-run diff")
+    parser.add_argument('rules', help="rule set JSON (see the module docstring)")
+    parser.add_argument('menus', nargs='*', help="source menus to reprice (default: every menu under --menus-dir)")
+    parser.add_argument('--menus-dir', default=MENUS_DIR,
+                        help="where to discover menus, and where the re-enhance writes its outputs "
+                             "(default: %(default)s)")
+    parser.add_argument('--manifest', help="incremental manifest for the re-enhance "
+                                           "(default: the enhancer's, under --menus-dir)")
+    parser.add_argument('--dry-run', action='store_true', help="print the diff and write nothing")
+    parser.add_argument('--diff', metavar='FILE', help="also write every change as JSON")
+    parser.add_argument('--show', type=int, default=40, help="changed prices to print (default: %(default)s)")
+    parser.add_argument('--no-enhance', action='store_true',
+                        help="do not re-run enhance-menus.py on the repriced menus")
+    parser.add_argument('--no-store', action='store_true',
+                        help="overwrite the menus without saving versions in the menu store (also for the re-enhance)")
+    args = parser.parse_args()
+
+    try:
+        import menu_pricing as pricing
+    except ImportError:
+        sys.exit("❌ Repricing needs numpy: pip install numpy")
+    with open(args.rules, 'r', encoding='utf-8') as f:
+        rule_set = json.load(f)
+    try:
+        pricing.validate_rules(rule_set)
+    except ValueError as e:
+        sys.exit(f"❌ {args.rules}: {e}")
+
+    start = time.perf_counter()
+    enhancer = load_script("enhance-menus.py")
+    paths = args.menus or [path for path, _ in enhancer.discover_menus(args.menus_dir)]
+    menus = load_menus(paths, enhancer)
+    table = pricing.PriceTable([menu[:4] for menu in menus])
+    loaded = time.perf_counter()
+
+    new_prices = table.apply_rules(rule_set)
+    premium_before = table.premium(table.prices)
+    premium_after = table.premium(new_prices)
+    applied = time.perf_counter()
+
+    rows = diff_rows(table, new_prices)
+    print(f"Repricing {len(table)} prices on {len(menus)} menus with {len(rule_set['rules'])} rules "
+          f"(load {(loaded - start) * 1000:.0f} ms, apply {(applied - loaded) * 1000:.1f} ms)")
+    if not rows:
+        print("\n✅ No price changes")
+        return
+    print_diff(rows, args.show)
+    for label, flags in (("gain", premium_after & ~premium_before), ("lose", premium_before & ~premium_after)):
+        names = [table.items[i].get('name') for i in flags.nonzero()[0]]
+        if names:
+            print(f"🏷  {len(names)} items {label} the price-derived premium tag: {', '.join(names[:10])}"
+                  + (" …" if len(names) > 10 else ""))
+    if args.diff:
+        atomic_write(args.diff, (json.dumps(rows, indent=2, ensure_ascii=False) + "\n").encode('utf-8'))
+        print(f"📄 Diff written to {args.diff}")
+
+    if args.dry_run:
+        print(f"\n🔍 Dry run: {len(rows)} prices would change, nothing written")
+        return
+
+    # Serialize everything first so a bad menu cannot leave the set half-written
+    changed = table.write_back(new_prices)
+    payloads = [(paths[index], menus[index][2], dump_menu(menus[index][2], menus[index][4])) for index in changed]
+    for path, menu_data, data in payloads:
+        if args.no_store:
+            atomic_write(path, data)
+            print(f"   ✓ Repriced {os.path.relpath(path, PROJECT_DIR)}")
+        else:
+            record, _ = save(path, menu_data, data, f"reprice-menus.py: {os.path.basename(args.rules)}")
+            print(f"   ✓ Repriced {os.path.relpath(path, PROJECT_DIR)} (v{record['version']})")
+
+    if not args.no_enhance:
+        print("\nRe-enhancing repriced menus...")
+        command = [sys.executable, os.path.join(SCRIPT_DIR, "enhance-menus.py"), '--incremental',
+                   '--menus-dir', args.menus_dir, *[path for path, _, _ in payloads]]
+        if args.manifest:
+            command.extend(['--manifest', args.manifest])
+        if args.no_store:
+            command.append('--no-store')
+        result = subprocess.run(command, capture_output=True, text=True)
+        if result.returncode != 0:
+            print(result.stdout + result.stderr)
+            sys.exit("❌ enhance-menus.py failed; the source menus are repriced, re-run it by hand")
+        print("   ✓ Enhanced menus and search indexes updated")
+
+    print(f"\n✅ {len(rows)} prices changed on {len(payloads)} menus in {(time.perf_counter() - start):.2f}s")
+
+if __name__ == "__main__":
+    main()
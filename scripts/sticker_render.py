@@ -0,0 +1,476 @@
+#!/usr/bin/env python3
+"""
+Sticker layout and rendering.
+
+The sticker is described once, in design units: an A4 portrait page of
+1240 x 1754 units (150 units per inch). layout() turns that description into
+drawing primitives at any scale. render_template() rasterises them with PIL
+and render_svg() writes them out as SVG, so print, web and vector outputs all
+come from the same layout.
+
+Everything except the QR square (frames, diamonds, title, tagline, button) is
+drawn once per set of template parameters and cached, in memory and as a PNG
+under .cache/sticker-templates keyed by a hash of those parameters. Each
+raster sticker is then one copy of the cached base plus one QR paste.
+
+A QR source is either an image path or a QrCode(url, ecc, logo). URL sources
+are encoded with qr_encode (matrices cached per URL and ECC level) and drawn
+module by module at the exact pixel size of each target, with no resampling;
+in SVG they come out as vector rectangles.
+"""
+
+import base64
+import hashlib
+import io
+import json
+import os
+import time
+from collections import namedtuple
+from functools import lru_cache
+from xml.sax.saxutils import escape, quoteattr
+
+from PIL import Image, ImageDraw
+from PIL.PngImagePlugin import PngInfo
+
+from font_registry import get_font
+from menu_io import atomic_write
+from qr_encode import MatrixCache
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+TEMPLATE_CACHE_DIR = os.path.join(PROJECT_DIR, ".cache/sticker-templates")
+
+# Page in design units: A4 portrait at 150 units per inch
+UNITS_PER_INCH = 150
+PAGE_WIDTH = 1240
+PAGE_HEIGHT = 1754
+QR_SIZE = 700
+
+# Brand color
+BRAND_RED = (139, 21, 56)  # #8B1538
+
+# Bump when the layout changes so cached templates are redrawn
+TEMPLATE_VERSION = 2
+
+# Text used when a sticker leaves a field out
+DEFAULT_TEXT = {
+    'title': "AMANTE",
+    'tagline': "A World of Flavor, Just a Scan Away.",
+    'button': "SCAN ME",
+    'subtitle': "View Our Menu",
+}
+
+# Georgia where installed, else the closest serif (DejaVu Serif on Linux), else a sans
+FONT_FAMILIES = ["serif", "sans-serif"]
+# text role -> (size in design units, weight)
+FONT_SPECS = {'title': (100, 400), 'tagline': (36, 400), 'button': (50, 700), 'subtitle': (32, 400)}
+
+# Same defaults as scripts/generate-qr.js: high error correction, 2 module margin
+QR_ECC = 'H'
+QR_QUIET_ZONE = 2
+# The logo covers at most this fraction of the QR width; ECC H recovers up to 30% damage
+QR_LOGO_FRACTION = 0.22
+
+PRINT_DPI = 300
+PRINT_WIDTH = round(PAGE_WIDTH * PRINT_DPI / UNITS_PER_INCH)
+WEB_WIDTHS = (480, 768, 1240)
+
+# target name -> [(format, pixel width)]; SVG has no pixel width
+TARGETS = {
+    'print': [('png', PRINT_WIDTH), ('pdf', PRINT_WIDTH)],
+    'web': [(fmt, web_width) for web_width in WEB_WIDTHS for fmt in ('png', 'webp')],
+    'svg': [('svg', None)],
+}
+
+@lru_cache(maxsize=None)
+def load_fonts(scale=1.0):
+    """Fonts for each text role at `scale` pixels per design unit"""
+    return {
+        role: get_font(FONT_FAMILIES, max(1, round(size * scale)), weight=weight)
+        for role, (size, weight) in FONT_SPECS.items()
+    }
+
+# Text is measured on a scratch canvas so layout() needs no target image
+_measure = ImageDraw.Draw(Image.new('RGB', (1, 1)))
+
+def layout(texts, scale=1.0):
+    """
+    Drawing primitives for one sticker at `scale` pixels per design unit,
+    as (kind, geometry, style) tuples in paint order. Returns
+    (canvas size, primitives).
+    """
+    def px(value):
+        return round(value * scale)
+
+    def stroke(value):
+        return max(1, px(value))
+
+    canvas_width, canvas_height = px(PAGE_WIDTH), px(PAGE_HEIGHT)
+    fonts = load_fonts(scale)
+    shapes = []
+
+    def text(role, value, x, y, fill):
+        ascent = fonts[role].getmetrics()[0] if hasattr(fonts[role], 'getmetrics') else 0
+        shapes.append(('text', (x, y), {'text': value, 'role': role, 'fill': fill, 'ascent': ascent}))
+
+    def centered(role, value):
+        bbox = _measure.textbbox((0, 0), value, font=fonts[role])
+        return bbox, (canvas_width - (bbox[2] - bbox[0])) // 2
+
+    # Decorative double frame at the top
+    frame_y = px(180)
+    frame_height = px(120)
+    frame_padding = px(200)
+    inner_padding = px(10)
+    shapes.append(('rounded_rectangle',
+                   (frame_padding, frame_y, canvas_width - frame_padding, frame_y + frame_height),
+                   {'radius': px(20), 'outline': BRAND_RED, 'width': stroke(3)}))
+    shapes.append(('rounded_rectangle',
+                   (frame_padding + inner_padding, frame_y + inner_padding,
+                    canvas_width - frame_padding - inner_padding, frame_y + frame_height - inner_padding),
+                   {'radius': px(15), 'outline': BRAND_RED, 'width': stroke(2)}))
+
+    # Diamonds at the frame corners and above and below it
+    diamond_size = px(15)
+    diamond_positions = [
+        (frame_padding - px(25), frame_y + px(20)),
+        (frame_padding - px(25), frame_y + frame_height - px(20)),
+        (canvas_width - frame_padding + px(25), frame_y + px(20)),
+        (canvas_width - frame_padding + px(25), frame_y + frame_height - px(20)),
+        (canvas_width // 2, frame_y - px(25)),
+        (canvas_width // 2, frame_y + frame_height + px(25)),
+    ]
+    for x, y in diamond_positions:
+        points = [(x, y - diamond_size), (x + diamond_size, y), (x, y + diamond_size), (x - diamond_size, y)]
+        shapes.append(('polygon', points, {'outline': BRAND_RED, 'width': stroke(2)}))
+
+    # Title centred in the frame
+    title_bbox, title_x = centered('title', texts['title'])
+    title_y = frame_y + (frame_height - (title_bbox[3] - title_bbox[1])) // 2
+    text('title', texts['title'], title_x, title_y, BRAND_RED)
+
+    # Tagline
+    _, tagline_x = centered('tagline', texts['tagline'])
+    tagline_y = frame_y + frame_height + px(80)
+    text('tagline', texts['tagline'], tagline_x, tagline_y, BRAND_RED)
+
+    # QR square
+    qr_size = px(QR_SIZE)
+    qr_x = (canvas_width - qr_size) // 2
+    qr_y = tagline_y + px(100)
+    shapes.append(('qr', (qr_x, qr_y, qr_size), {}))
+
+    # Rounded button below the QR code
+    button_y = qr_y + qr_size + px(60)
+    button_width = px(450)
+    button_height = px(90)
+    button_x = (canvas_width - button_width) // 2
+    shapes.append(('rounded_rectangle',
+                   (button_x, button_y, button_x + button_width, button_y + button_height),
+                   {'radius': px(45), 'fill': BRAND_RED}))
+    button_bbox = _measure.textbbox((0, 0), texts['button'], font=fonts['button'])
+    button_text_x = button_x + (button_width - (button_bbox[2] - button_bbox[0])) // 2
+    button_text_y = button_y + (button_height - (button_bbox[3] - button_bbox[1])) // 2
+    text('button', texts['button'], button_text_x, button_text_y, (255, 255, 255))
+
+    # Subtitle below the button
+    _, subtitle_x = centered('subtitle', texts['subtitle'])
+    subtitle_y = button_y + button_height + px(30)
+    text('subtitle', texts['subtitle'], subtitle_x, subtitle_y, BRAND_RED)
+
+    return (canvas_width, canvas_height), shapes
+
+def render_template(texts, scale=1.0):
+    """Draw everything but the QR code; returns (image, QR box as (x, y, size))"""
+    size, shapes = layout(texts, scale)
+    fonts = load_fonts(scale)
+    sticker = Image.new('RGB', size, 'white')
+    draw = ImageDraw.Draw(sticker)
+    qr_box = None
+    for kind, geometry, style in shapes:
+        if kind == 'rounded_rectangle':
+            draw.rounded_rectangle(geometry, radius=style['radius'], outline=style.get('outline'),
+                                   fill=style.get('fill'), width=style.get('width', 1))
+        elif kind == 'polygon':
+            draw.polygon(geometry, outline=style['outline'], width=style['width'])
+        elif kind == 'text':
+            draw.text(geometry, style['text'], font=fonts[style['role']], fill=style['fill'])
+        elif kind == 'qr':
+            # Left blank; render_sticker pastes the code in
+            qr_box = geometry
+    return sticker, qr_box
+
+def template_key(texts, scale):
+    """Hash of everything that affects the static layer"""
+    # load_default() fonts carry a BytesIO rather than a file path
+    fonts = [(str(getattr(font, 'path', 'default')), getattr(font, 'size', None))
+             for font in load_fonts(scale).values()]
+    params = [TEMPLATE_VERSION, PAGE_WIDTH, PAGE_HEIGHT, QR_SIZE, scale, BRAND_RED,
+              [texts[field] for field in DEFAULT_TEXT], fonts]
+    return hashlib.sha256(json.dumps(params).encode('utf-8')).hexdigest()[:16]
+
+_templates = {}
+
+def get_template(texts, scale=1.0, use_disk_cache=True):
+    """The static layer for a set of texts and scale, from memory, then disk, then drawn"""
+    key = template_key(texts, scale)
+    if key in _templates:
+        return _templates[key]
+
+    cache_path = os.path.join(TEMPLATE_CACHE_DIR, f"{key}.png")
+    template = None
+    if use_disk_cache and os.path.exists(cache_path):
+        try:
+            with Image.open(cache_path) as cached:
+                cached.load()
+                qr_box = tuple(int(v) for v in cached.info['qr_box'].split(','))
+                template = cached.copy(), qr_box
+        except (OSError, KeyError, ValueError):
+            template = None
+    if template is None:
+        template = render_template(texts, scale)
+        if use_disk_cache:
+            save_template(cache_path, *template)
+
+    _templates[key] = template
+    return template
+
+def save_template(cache_path, image, qr_box):
+    info = PngInfo()
+    info.add_text('qr_box', ",".join(str(v) for v in qr_box))
+    buffer = io.BytesIO()
+    # Fast compression: this is a cache, decode speed matters more than size
+    image.save(buffer, 'PNG', pnginfo=info, compress_level=1)
+    os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+    atomic_write(cache_path, buffer.getvalue())
+
+# A QR code generated from a URL rather than read from an image file
+QrCode = namedtuple('QrCode', ['url', 'ecc', 'logo'], defaults=[QR_ECC, None])
+
+_matrix_cache = None
+
+def qr_matrices():
+    """The process-wide QR matrix cache, loaded from disk on first use"""
+    global _matrix_cache
+    if _matrix_cache is None:
+        _matrix_cache = MatrixCache()
+    return _matrix_cache
+
+def qr_module_edges(matrix, size):
+    """Pixel edges of each module column/row, quiet zone included, spanning exactly `size` px"""
+    modules = len(matrix) + 2 * QR_QUIET_ZONE
+    return [round(i * size / modules) for i in range(modules + 1)]
+
+def render_qr(matrix, size, logo=None):
+    """Draw a QR matrix straight at `size` px: brand-red modules, each run one rectangle"""
+    qr_code = Image.new('RGB', (size, size), 'white')
+    draw = ImageDraw.Draw(qr_code)
+    edges = qr_module_edges(matrix, size)
+    for y, row in enumerate(matrix, start=QR_QUIET_ZONE):
+        x = 0
+        while x < len(row):
+            if not row[x]:
+                x += 1
+                continue
+            run_start = x
+            while x < len(row) and row[x]:
+                x += 1
+            draw.rectangle((edges[run_start + QR_QUIET_ZONE], edges[y],
+                            edges[x + QR_QUIET_ZONE] - 1, edges[y + 1] - 1), fill=BRAND_RED)
+    if logo:
+        paste_logo(qr_code, logo)
+    return qr_code
+
+def paste_logo(qr_code, logo_path):
+    size = qr_code.size[0]
+    logo_size = round(size * QR_LOGO_FRACTION)
+    padding = max(1, logo_size // 10)
+    with Image.open(logo_path) as logo:
+        logo = logo.convert('RGBA')
+        logo.thumbnail((logo_size - 2 * padding, logo_size - 2 * padding), Image.Resampling.LANCZOS)
+    box = (size - logo_size) // 2
+    ImageDraw.Draw(qr_code).rounded_rectangle((box, box, box + logo_size, box + logo_size),
+                                              radius=padding, fill='white')
+    qr_code.paste(logo, ((size - logo.width) // 2, (size - logo.height) // 2), logo)
+
+@lru_cache(maxsize=None)
+def decode_qr(path):
+    """Decode a QR source image once per path"""
+    qr_code = Image.open(path)
+    qr_code.load()
+    return qr_code
+
+def load_qr(source, size):
+    """
+    A QR source at `size` pixels. Generated codes are drawn on every call
+    (their matrices are cached, one image per table would not be); image
+    files are decoded and fitted once per (path, size).
+    """
+    if isinstance(source, QrCode):
+        return render_qr(qr_matrices().get(source.url, source.ecc), size, source.logo)
+    return fitted_qr(source, size)
+
+@lru_cache(maxsize=None)
+def fitted_qr(path, size):
+    return fit_qr(decode_qr(path), size)
+
+def fit_qr(qr_code, size):
+    if qr_code.size == (size, size):
+        return qr_code
+    return qr_code.resize((size, size), Image.Resampling.LANCZOS)
+
+def render_sticker(qr_code, texts=DEFAULT_TEXT, scale=1.0, use_disk_cache=True):
+    """Render the full sticker around a QR code image; returns the PIL image"""
+    base, (qr_x, qr_y, qr_size) = get_template(texts, scale, use_disk_cache)
+    sticker = base.copy()
+    qr_resized = fit_qr(qr_code, qr_size)
+    sticker.paste(qr_resized, (qr_x, qr_y), qr_resized if qr_resized.mode == 'RGBA' else None)
+    return sticker
+
+def hex_color(color):
+    return "#{:02x}{:02x}{:02x}".format(*color)
+
+def svg_qr(source, x, y, size):
+    """SVG for the QR square: vector modules for URL sources, an embedded PNG for image files"""
+    if not isinstance(source, QrCode):
+        # Embed at print resolution so the vector output prints as well as the PNG
+        buffer = io.BytesIO()
+        load_qr(source, round(size * PRINT_WIDTH / PAGE_WIDTH)).save(buffer, 'PNG', optimize=True)
+        data = base64.b64encode(buffer.getvalue()).decode('ascii')
+        return [f'<image x="{x}" y="{y}" width="{size}" height="{size}" href="data:image/png;base64,{data}"/>']
+
+    matrix = qr_matrices().get(source.url, source.ecc)
+    module = size / (len(matrix) + 2 * QR_QUIET_ZONE)
+    path = []
+    for row_index, row in enumerate(matrix):
+        column = 0
+        while column < len(row):
+            if row[column]:
+                run_start = column
+                while column < len(row) and row[column]:
+                    column += 1
+                path.append(f"M{run_start + QR_QUIET_ZONE} {row_index + QR_QUIET_ZONE}"
+                            f"h{column - run_start}v1h-{column - run_start}z")
+            column += 1
+    # Draw in module units and scale once, so the path stays short
+    lines = [f'<g transform="translate({x} {y}) scale({module:.6f})">',
+             f'<path d="{"".join(path)}" fill="{hex_color(BRAND_RED)}" shape-rendering="crispEdges"/>']
+    if source.logo:
+        total = len(matrix) + 2 * QR_QUIET_ZONE
+        logo_size = total * QR_LOGO_FRACTION
+        buffer = io.BytesIO()
+        with Image.open(source.logo) as logo:
+            logo.save(buffer, 'PNG')
+        data = base64.b64encode(buffer.getvalue()).decode('ascii')
+        offset = (total - logo_size) / 2
+        lines.append(f'<rect x="{offset:.3f}" y="{offset:.3f}" width="{logo_size:.3f}" height="{logo_size:.3f}" '
+                     f'rx="{logo_size / 10:.3f}" fill="#ffffff"/>')
+        inner = logo_size * 0.8
+        lines.append(f'<image x="{offset + logo_size * 0.1:.3f}" y="{offset + logo_size * 0.1:.3f}" '
+                     f'width="{inner:.3f}" height="{inner:.3f}" href="data:image/png;base64,{data}"/>')
+    lines.append('</g>')
+    return lines
+
+def render_svg(texts, qr_source):
+    """The sticker as SVG in design units"""
+    (canvas_width, canvas_height), shapes = layout(texts, 1.0)
+    fonts = load_fonts(1.0)
+    inches = (canvas_width / UNITS_PER_INCH, canvas_height / UNITS_PER_INCH)
+    lines = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{inches[0]:.3f}in" height="{inches[1]:.3f}in" '
+        f'viewBox="0 0 {canvas_width} {canvas_height}">',
+        f'<rect width="{canvas_width}" height="{canvas_height}" fill="#ffffff"/>',
+    ]
+    for kind, geometry, style in shapes:
+        if kind == 'rounded_rectangle':
+            x1, y1, x2, y2 = geometry
+            if 'fill' in style:
+                paint = f'fill="{hex_color(style["fill"])}"'
+                inset = 0
+            else:
+                # PIL draws outlines inside the box; SVG strokes straddle the edge
+                inset = style['width'] / 2
+                paint = f'fill="none" stroke="{hex_color(style["outline"])}" stroke-width="{style["width"]}"'
+            lines.append(f'<rect x="{x1 + inset}" y="{y1 + inset}" width="{x2 - x1 - 2 * inset}" '
+                         f'height="{y2 - y1 - 2 * inset}" rx="{style["radius"]}" {paint}/>')
+        elif kind == 'polygon':
+            points = " ".join(f"{x},{y}" for x, y in geometry)
+            lines.append(f'<polygon points="{points}" fill="none" stroke="{hex_color(style["outline"])}" '
+                         f'stroke-width="{style["width"]}"/>')
+        elif kind == 'text':
+            font = fonts[style['role']]
+            family = font.getname()[0] if hasattr(font, 'getname') else "serif"
+            size, weight = FONT_SPECS[style['role']]
+            x, y = geometry
+            lines.append(f'<text x="{x}" y="{y + style["ascent"]}" '
+                         f'font-family={quoteattr(f"{family}, Georgia, serif")} font-size="{size}" '
+                         f'font-weight="{weight}" fill="{hex_color(style["fill"])}">{escape(style["text"])}</text>')
+        elif kind == 'qr':
+            lines.extend(svg_qr(qr_source, *geometry))
+    lines.append('</svg>')
+    return ("\n".join(lines) + "\n").encode('utf-8')
+
+def encode(image, fmt, purpose):
+    """Encode a rendered sticker; `purpose` picks print or web encoder settings"""
+    buffer = io.BytesIO()
+    if fmt == 'png' and purpose == 'web':
+        # Two brand colours plus anti-aliasing fit a 256 colour palette with no visible loss
+        image.quantize(256).save(buffer, 'PNG', optimize=True)
+    elif fmt == 'png':
+        options = {'dpi': (PRINT_DPI, PRINT_DPI)} if purpose == 'print' else {}
+        image.save(buffer, 'PNG', **options)
+    elif fmt == 'webp':
+        image.save(buffer, 'WEBP', quality=85, method=6)
+    elif fmt == 'pdf':
+        image.save(buffer, 'PDF', resolution=PRINT_DPI)
+    else:
+        raise ValueError(f"unknown sticker format {fmt!r}")
+    return buffer.getvalue()
+
+def target_path(stem, target, fmt, pixel_width):
+    if target == 'print':
+        return f"{stem}-print.{fmt}"
+    if target == 'web':
+        return f"{stem}-{pixel_width}w.{fmt}"
+    return f"{stem}.{fmt}"
+
+def render_targets(qr_source, texts, stem, targets, use_disk_cache=True):
+    """
+    Render one sticker to every format of every target, writing
+    <stem>-print.png, <stem>-480w.webp, <stem>.svg and so on. Each pixel
+    width is rendered once and shared by its formats, and the QR code is
+    resampled (image sources) or drawn (URL sources) once per width. Returns
+    one report dict per file written.
+    """
+    outputs = {}
+    for target in targets:
+        for fmt, pixel_width in TARGETS[target]:
+            outputs.setdefault(pixel_width, []).append((target, fmt))
+
+    reports = []
+    os.makedirs(os.path.dirname(os.path.abspath(stem)), exist_ok=True)
+    for pixel_width, formats in outputs.items():
+        start = time.perf_counter()
+        if pixel_width is None:
+            image = None
+        else:
+            scale = pixel_width / PAGE_WIDTH
+            image = render_sticker(load_qr(qr_source, round(QR_SIZE * scale)), texts, scale, use_disk_cache)
+        render_time = time.perf_counter() - start
+
+        for target, fmt in formats:
+            start = time.perf_counter()
+            if fmt == 'svg':
+                data = render_svg(texts, qr_source)
+            else:
+                data = encode(image, fmt, target)
+            encode_time = time.perf_counter() - start
+
+            path = target_path(stem, target, fmt, pixel_width)
+            atomic_write(path, data)
+            reports.append({
+                'path': path, 'target': target, 'format': fmt,
+                'size': image.size if image else (PAGE_WIDTH, PAGE_HEIGHT),
+                'bytes': len(data), 'render': render_time, 'encode': encode_time,
+            })
+    return reports
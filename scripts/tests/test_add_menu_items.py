@@ -0,0 +1,40 @@
+import pytest
+
+from menu_synth import load_script
+
+importer = load_script("add-menu-items.py")
+
+@pytest.mark.parametrize("value, expected", [
+    (599, 599),
+    ("599", 599),
+    ("₹ 1,299", 1299),
+    ("Rs. 450/-", 450),
+    ("12.5", 12.5),
+    (" 349 ", 349),
+])
+def test_parse_number(value, expected):
+    assert importer.parse_number(value) == expected
+
+@pytest.mark.parametrize("value, message", [
+    (-50, "negative"),
+    ("-50", "negative"),
+    ("₹ -20", "negative"),
+    ("1.2.3", "not a number"),
+    ("Rs.", "not a number"),
+    ("5-0", "not a number"),
+    (float("nan"), "not a number"),
+])
+def test_parse_number_rejects(value, message):
+    with pytest.raises(ValueError, match=message):
+        importer.parse_number(value)
+
+def test_bad_prices_are_row_errors():
+    menu = {"venue": "food", "categories": [{"id": "breads", "name": "Breads", "items": []}]}
+    rows = [
+        {"category": "breads", "name": "Missi Roti", "price": "-50"},
+        {"category": "breads", "name": "Lachha Paratha", "price": "1.2.3"},
+        {"category": "breads", "name": "Butter Naan", "price": "99"},
+    ]
+    inserts, _, errors = importer.plan_import(menu, rows)
+    assert [item["name"] for _, item in inserts] == ["Butter Naan"]
+    assert errors == ["row 1: bad price, negative: '-50'", "row 2: bad price, not a number: '1.2.3'"]
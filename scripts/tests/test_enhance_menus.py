@@ -0,0 +1,26 @@
+import pytest
+
+from menu_synth import load_script
+
+enhancer = load_script("enhance-menus.py")
+
+def spice_tags(**item):
+    item.setdefault("description", "")
+    tags = enhancer.enhance_food_item(item, "appetizers")['tags']
+    return [tag for tag in tags if tag in ("spicy", "mild")]
+
+@pytest.mark.parametrize("item, expected", [
+    ({"name": "Bharwan Tandoori Aloo", "spiceLevel": 3}, ["spicy"]),
+    ({"name": "Dahi Ke Kebab", "spiceLevel": 1}, ["mild"]),
+    ({"name": "Dahi Ke Kebab"}, ["mild"]),
+    # No level: spice words decide
+    ({"name": "Hunan Chilli Tofu"}, ["spicy"]),
+    ({"name": "Penne Arrabbiata", "description": "Peri-peri tomato sauce"}, ["spicy"]),
+    # A set level outranks the words
+    ({"name": "Crispy Chilli Baby Corn", "spiceLevel": 1}, ["mild"]),
+    ({"name": "Hunan Chilli Tofu", "spiceLevel": 2}, []),
+    # So does a tag the item already carries
+    ({"name": "Sweet Chilli Paneer", "tags": ["mild"]}, ["mild"]),
+])
+def test_spice_tags(item, expected):
+    assert spice_tags(**item) == expected
@@ -0,0 +1,12 @@
+from menu_classifier import DEFAULT_CLASSIFIER
+
+def test_multi_word_keywords():
+    assert DEFAULT_CLASSIFIER.classify("Kamal Kakdi Chaat") == {"root-vegetable"}
+    assert DEFAULT_CLASSIFIER.classify("Crispy lotus-stem") == {"root-vegetable"}
+    assert "spicy" in DEFAULT_CLASSIFIER.classify("Peri  Peri Fries")
+
+def test_keywords_do_not_span_texts():
+    # A name ending in the first word and a description starting with the second
+    assert DEFAULT_CLASSIFIER.classify("Kamal", "kakdi") == set()
+    assert DEFAULT_CLASSIFIER.classify("Honey Glazed Lotus", "stem of the day, served warm") == set()
+    assert DEFAULT_CLASSIFIER.classify_item({"name": "Crispy Lotus", "description": "Stem fried"}) == set()
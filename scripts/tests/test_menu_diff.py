@@ -0,0 +1,132 @@
+import copy
+import json
+
+import pytest
+
+from menu_diff import apply_patch, diff_menus, serialize_menu, serialize_patch
+
+def base_menu():
+    return {
+        "venue": "food",
+        "title": "Food Menu",
+        "categories": [
+            {"id": "soups", "name": "Soups", "items": [
+                {"id": "food-soup-001", "name": "Tomato Shorba", "price": 249},
+                {"id": "food-soup-002", "name": "Manchow Soup", "price": 269, "isVeg": True},
+            ]},
+            {"id": "appetizers", "name": "Appetizers", "items": [
+                {"id": "food-app-001", "name": "Paneer Tikka", "price": 349, "tags": ["popular"]},
+                {"id": "food-app-001", "name": "Paneer Tikka (Half)", "price": 199},
+                {"name": "Papad Basket", "price": 99},
+            ]},
+            {"id": "breads", "name": "Breads", "items": [
+                {"id": "food-bread-001", "name": "Missi Roti", "price": 79.5},
+            ]},
+        ],
+    }
+
+def remove_category(menu):
+    del menu["categories"][1]
+
+def add_category(menu):
+    menu["categories"].insert(1, {"id": "desserts", "name": "Desserts", "items": [
+        {"id": "food-des-001", "name": "Gulab Jamun", "price": 149},
+    ]})
+
+def add_empty_category(menu):
+    menu["categories"].append({"id": "specials", "name": "Specials", "items": []})
+
+def reorder_categories(menu):
+    menu["categories"].reverse()
+
+def replace_category(menu):
+    menu["categories"][0] = {"id": "salads", "name": "Salads", "items": [
+        {"id": "food-soup-001", "name": "Tomato Shorba", "price": 249},
+    ]}
+
+def reorder_item_keys(menu):
+    item = menu["categories"][0]["items"][0]
+    menu["categories"][0]["items"][0] = {key: item[key] for key in reversed(list(item))}
+
+def reorder_category_keys(menu):
+    category = menu["categories"][2]
+    menu["categories"][2] = {"items": category["items"], "name": category["name"], "id": category["id"]}
+
+def reorder_menu_keys(menu):
+    categories = menu.pop("categories")
+    menu["categories"] = categories
+    menu["venue"] = menu.pop("venue")
+
+def int_to_float(menu):
+    menu["categories"][0]["items"][0]["price"] = 249.0
+
+def float_to_int(menu):
+    menu["categories"][2]["items"][0]["price"] = 80
+
+def bool_to_int(menu):
+    menu["categories"][0]["items"][1]["isVeg"] = 1
+
+def change_first_duplicate(menu):
+    menu["categories"][1]["items"][0]["price"] = 369
+
+def remove_first_duplicate(menu):
+    del menu["categories"][1]["items"][0]
+
+def swap_duplicates(menu):
+    items = menu["categories"][1]["items"]
+    items[0], items[1] = items[1], items[0]
+
+def add_third_duplicate(menu):
+    menu["categories"][2]["items"].append({"id": "food-app-001", "name": "Paneer Tikka Roll", "price": 229})
+
+def move_item_between_categories(menu):
+    menu["categories"][2]["items"].append(menu["categories"][0]["items"].pop())
+
+def rename_item_without_id(menu):
+    menu["categories"][1]["items"][2]["name"] = "Masala Papad"
+
+def remove_and_add_fields(menu):
+    item = menu["categories"][1]["items"][0]
+    del item["tags"]
+    item["spiceLevel"] = 2
+    menu["subtitle"] = "All day"
+    del menu["title"]
+
+def everything(menu):
+    for edit in (remove_and_add_fields, swap_duplicates, reorder_item_keys, int_to_float,
+                 reorder_categories, remove_category, add_category):
+        edit(menu)
+
+EDITS = [remove_category, add_category, add_empty_category, reorder_categories, replace_category,
+         reorder_item_keys, reorder_category_keys, reorder_menu_keys, int_to_float, float_to_int,
+         bool_to_int, change_first_duplicate, remove_first_duplicate, swap_duplicates,
+         add_third_duplicate, move_item_between_categories, rename_item_without_id,
+         remove_and_add_fields, everything]
+
+@pytest.mark.parametrize("edit", EDITS, ids=lambda edit: edit.__name__)
+def test_apply_patch_reproduces_new_bytes(edit):
+    old = base_menu()
+    new = base_menu()
+    edit(new)
+    assert serialize_menu(old) != serialize_menu(new)
+    # Patches reach clients as JSON, so replay the parsed copy
+    patch = json.loads(serialize_patch(diff_menus(old, new)))
+    assert serialize_menu(apply_patch(old, patch)) == serialize_menu(new)
+    assert old == base_menu()
+
+@pytest.mark.parametrize("edit", EDITS, ids=lambda edit: edit.__name__)
+def test_reverse_patch_reproduces_old_bytes(edit):
+    old = base_menu()
+    new = base_menu()
+    edit(new)
+    patch = diff_menus(new, old)
+    assert serialize_menu(apply_patch(copy.deepcopy(new), patch)) == serialize_menu(old)
+
+def test_identical_menus_give_an_empty_patch():
+    patch = diff_menus(base_menu(), base_menu())
+    assert set(patch) == {"format", "from", "to"}
+    assert serialize_menu(apply_patch(base_menu(), patch)) == serialize_menu(base_menu())
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError):
+        apply_patch(base_menu(), {"format": 99})
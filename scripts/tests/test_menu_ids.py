@@ -0,0 +1,36 @@
+from menu_ids import MenuIdIndex
+from menu_synth import load_script
+
+def sample_menu():
+    return {
+        "venue": "food",
+        "categories": [
+            {"id": "appetizers", "items": [
+                {"id": "food-app-001", "name": "Hummus"},
+                {"id": "food-app-002", "name": "Crispy Corn"},
+            ]},
+        ],
+    }
+
+def test_allocate_continues_after_reserved_id():
+    index = MenuIdIndex(sample_menu())
+    assert index.reserve("food-app-003")
+    assert index.allocate("appetizers", 2) == ["food-app-004", "food-app-005"]
+    assert not index.reserve("food-app-004")
+
+def test_allocate_never_returns_a_taken_id():
+    index = MenuIdIndex(sample_menu())
+    index.ids.add("food-app-003")
+    assert index.allocate("appetizers") == ["food-app-004"]
+
+def test_import_rows_with_and_without_ids():
+    importer = load_script("add-menu-items.py")
+    rows = [
+        {"category": "appetizers", "name": "Paneer Tikka", "price": "349", "id": "food-app-003"},
+        {"category": "appetizers", "name": "Hara Bhara Kebab", "price": "299"},
+        {"category": "appetizers", "name": "Veg Spring Roll", "price": "279", "id": "food-app-001"},
+    ]
+    inserts, skipped, errors = importer.plan_import(sample_menu(), rows)
+    assert [item["id"] for _, item in inserts] == ["food-app-003", "food-app-004"]
+    assert skipped == []
+    assert errors == ["row 3: id food-app-001 is already taken"]
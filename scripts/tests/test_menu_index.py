@@ -0,0 +1,23 @@
+from bisect import bisect_left, bisect_right
+
+from menu_index import build_search_index
+
+def band(index, low, high):
+    """Item ids with a price in [low, high], the way the menu page queries the index"""
+    values = index['price']['values']
+    positions = index['price']['positions'][bisect_left(values, low):bisect_right(values, high)]
+    return sorted({index['items'][position] for position in positions})
+
+def test_sized_items_are_found_by_every_size_price():
+    menu = {"venue": "food", "categories": [{"id": "pizza", "items": [
+        {"id": "food-pizza-001", "name": "Margherita",
+         "sizes": [{"name": "6 inch", "price": 399}, {"name": "12 inch", "price": 599}]},
+        {"id": "food-pizza-002", "name": "Farm House", "price": 449,
+         "sizes": [{"name": "6 inch", "price": 449}, {"name": "12 inch", "price": 649}]},
+        {"id": "food-pizza-003", "name": "Garlic Bread", "price": 249},
+    ]}]}
+    index = build_search_index(menu)
+    assert index['price']['values'] == [249, 399, 449, 599, 649]
+    assert band(index, 300, 420) == ["food-pizza-001"]
+    assert band(index, 550, 700) == ["food-pizza-001", "food-pizza-002"]
+    assert band(index, 0, 300) == ["food-pizza-003"]
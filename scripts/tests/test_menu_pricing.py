@@ -0,0 +1,36 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from menu_pricing import PriceTable
+
+def table_for(items, venue="food"):
+    menu = {"venue": venue, "categories": [{"id": "mains", "items": items}]}
+    return PriceTable([(venue, venue, menu, {})])
+
+def test_sizes_are_priced_and_written_back():
+    pizza = {"id": "food-pizza-001", "name": "Margherita",
+             "sizes": [{"name": "6 inch", "price": 399}, {"name": "12 inch", "price": 599}]}
+    table = table_for([{"id": "food-main-001", "name": "Dal Makhani", "price": 349}, pizza])
+    assert table.prices.tolist() == [349, 399, 599]
+    assert [table.field_name(index) for index in range(len(table))] == ["price", "sizes[0]", "sizes[1]"]
+
+    new_prices = table.apply_rules({"round": "x9", "rules": [{"fields": ["sizes"], "percent": 10}]})
+    assert new_prices.tolist() == [349, 439, 659]
+    assert table.write_back(new_prices) == [0]
+    assert [size["price"] for size in pizza["sizes"]] == [439, 659]
+
+def test_floor_and_cap_bound_the_final_price():
+    table = table_for([{"name": "Lachha Paratha", "price": 110},
+                       {"name": "Butter Naan", "price": 249},
+                       {"name": "Raan Biryani", "price": 1899}])
+    rules = {"round": "x9", "rules": [{"percent": 4, "floor": 199, "cap": 1499}]}
+    assert table.apply_rules(rules).tolist() == [199, 259, 1499]
+
+def test_floor_only_rule_lifts_cheaper_prices():
+    table = table_for([{"name": "Tandoori Roti", "price": 60}, {"name": "Garlic Naan", "price": 129}])
+    assert table.apply_rules({"rules": [{"floor": 99}]}).tolist() == [99, 129]
+
+def test_rounding_does_not_turn_an_increase_into_a_cut():
+    table = table_for([{"name": "Kulhad Chai", "price": 100}])
+    assert table.apply_rules({"round": "x9", "rules": [{"percent": 2}]}).tolist() == [100]
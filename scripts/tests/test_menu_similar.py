@@ -0,0 +1,29 @@
+from menu_similar import similar_items
+
+def dish(name, description, **extra):
+    return {"name": name, "description": description, **extra}
+
+def test_a_repeated_name_is_recommended_once():
+    items = [
+        dish("Paneer Tikka", "smoky cottage cheese grilled in the tandoor"),
+        dish("Hunan Chilli Tofu", "wok tossed tofu in a hot hunan chilli sauce"),
+        dish("Hunan Chilli Tofu", "wok tossed tofu in a hot hunan chilli sauce"),
+        dish("Chilli Paneer", "wok tossed cottage cheese in a hot chilli sauce"),
+        dish("Tofu Satay", "grilled tofu skewers with chilli peanut sauce"),
+    ]
+    indices, _ = similar_items(items, k=4, category_ids=["starters"] * len(items))
+    for row, neighbours in enumerate(indices):
+        names = [items[i]["name"] for i in neighbours if i >= 0]
+        assert len(names) == len(set(names))
+        assert items[row]["name"] not in names
+    assert 2 not in indices
+
+def test_an_unavailable_first_occurrence_leaves_the_repeat():
+    items = [
+        dish("Missi Roti", "gram flour flatbread", isAvailable=False),
+        dish("Missi Roti", "gram flour flatbread"),
+        dish("Tandoori Roti", "whole wheat flatbread from the tandoor"),
+    ]
+    indices, _ = similar_items(items, k=2, category_ids=["breads"] * len(items))
+    assert 1 in indices[2]
+    assert 0 not in indices
@@ -0,0 +1,105 @@
+"""
+qr_encode against fixed vectors, and against segno's encoder where it is
+installed. segno evaluates mask penalties slightly differently (no format
+bits, finder-like runs at the symbol edge), so the reference comparison
+forces each mask and the vectors pin the mask our penalty rules choose.
+"""
+
+import hashlib
+
+import pytest
+
+import qr_encode
+
+# (text, ECC level, version, mask chosen, digest of the packed rows)
+VECTORS = [
+    ("https://amante.in", 'L', 1, 4, "5e3f630962c82c0f"),
+    ("https://amante.in/menu/food?table=12", 'H', 5, 1, "87bbf3965f80275e"),
+    ("https://amante.in/menu/bar?table=7&utm_source=qr", 'M', 4, 5, "72eafee46db352ea"),
+    ("https://amante.in/menu/cafe?table=42&utm_source=table-sticker&utm_medium=qr&utm_campaign=launch",
+     'Q', 8, 6, "e4ae95d7010356e3"),
+    ("Amante Bhopal · Café & Bar · " * 6, 'H', 14, 2, "a9e0977b5562bff1"),
+    ("https://amante.in/" + "menu/" * 60, 'L', 11, 1, "d82779803fd56c5b"),
+]
+
+def matrix_digest(matrix):
+    return hashlib.sha256("\n".join(qr_encode.pack_rows(matrix)).encode('ascii')).hexdigest()[:16]
+
+def data_bits(text, ecc, version):
+    """Byte-mode data codewords built straight from ISO/IEC 18004 7.4, independently of encode_data"""
+    data = text.encode('utf-8')
+    capacity = qr_encode.data_codewords(version, ecc) * 8
+    count_bits = 8 if version <= 9 else 16
+    bits = [0, 1, 0, 0] + [(len(data) >> i) & 1 for i in reversed(range(count_bits))]
+    for byte in data:
+        bits += [(byte >> i) & 1 for i in reversed(range(8))]
+    bits += [0] * min(4, capacity - len(bits))
+    bits += [0] * (-len(bits) % 8)
+    pads = ([1, 1, 1, 0, 1, 1, 0, 0], [0, 0, 0, 1, 0, 0, 0, 1])
+    i = 0
+    while len(bits) < capacity:
+        bits += pads[i % 2]
+        i += 1
+    return bits
+
+def test_reed_solomon_known_vector():
+    # "HELLO WORLD" at 1-M: the worked example's data and ECC codewords
+    data = [32, 91, 11, 120, 209, 114, 220, 77, 67, 64, 236, 17, 236, 17, 236, 17]
+    assert qr_encode.rs_remainder(data, qr_encode.rs_divisor(10)) == [196, 35, 39, 119, 235, 215, 231, 226, 93, 23]
+
+def test_capacity_tables():
+    # Data codewords from the standard's capacity table
+    assert [qr_encode.data_codewords(1, ecc) for ecc in "LMQH"] == [19, 16, 13, 9]
+    assert [qr_encode.data_codewords(10, ecc) for ecc in "LMQH"] == [274, 216, 154, 122]
+    assert [qr_encode.data_codewords(40, ecc) for ecc in "LMQH"] == [2956, 2334, 1666, 1276]
+
+def penalty(rows):
+    matrix = qr_encode._Matrix(1)
+    matrix.modules = rows
+    return matrix.penalty()
+
+def test_penalty_rules():
+    size = 21
+    # Runs: 42 lines of 21 (3 + 16 each); blocks: 20 x 20 2x2 squares at 3; balance: 0% dark, k = 9
+    assert penalty([[False] * size for _ in range(size)]) == 42 * 19 + 400 * 3 + 90
+    # Checkerboard: no runs, no blocks, 221 of 441 dark
+    assert penalty([[(x + y) % 2 == 0 for x in range(size)] for y in range(size)]) == 0
+    # Vertical stripes: 21 columns of 21, nothing else
+    assert penalty([[x % 2 == 0 for x in range(size)] for y in range(size)]) == 21 * 19
+
+@pytest.mark.parametrize("text, ecc, version, mask, digest", VECTORS)
+def test_known_vectors(text, ecc, version, mask, digest):
+    matrix = qr_encode.encode_text(text, ecc)
+    assert len(matrix) == version * 4 + 17
+    assert matrix == qr_encode.encode_text(text, ecc, mask)
+    assert matrix_digest(matrix) == digest
+
+@pytest.mark.parametrize("text, ecc, version, mask, digest", VECTORS)
+def test_matches_reference_encoder(text, ecc, version, mask, digest):
+    encoder = pytest.importorskip("segno.encoder")
+    consts = pytest.importorskip("segno.consts")
+    error = getattr(consts, f"ERROR_LEVEL_{ecc}")
+
+    buffer = encoder.Buffer(data_bits(text, ecc, version))
+    final = encoder.make_final_message(version, error, buffer)
+    _, codewords = qr_encode.encode_data(text.encode('utf-8'), ecc)
+    assert list(final.toints())[:len(codewords)] == codewords
+
+    size = encoder.calc_matrix_size(version)
+    for forced in range(8):
+        reference = encoder.make_matrix(size, size)
+        encoder.add_finder_patterns(reference, size, size)
+        encoder.add_alignment_patterns(reference, size, size)
+        encoder.add_codewords(reference, final, version)
+        _, reference = encoder.find_and_apply_best_mask(reference, size, size, forced)
+        encoder.add_format_info(reference, version, error, forced)
+        encoder.add_version_info(reference, version)
+        assert qr_encode.encode_text(text, ecc, forced) == [[bool(module) for module in row] for row in reference]
+
+def test_matrix_cache_round_trip(tmp_path):
+    cache = qr_encode.MatrixCache(str(tmp_path / "qr.json"))
+    matrix = cache.get("https://amante.in/menu", 'M')
+    cache.save()
+    reloaded = qr_encode.MatrixCache(str(tmp_path / "qr.json"))
+    assert reloaded.get("https://amante.in/menu", 'M') == matrix
+    assert (reloaded.hits, reloaded.misses) == (1, 0)
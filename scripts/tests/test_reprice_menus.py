@@ -0,0 +1,34 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip("numpy")
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MENUS_DIR = os.path.join(os.path.dirname(SCRIPTS_DIR), "src", "data", "menus")
+
+def snapshot(directory):
+    return {name: os.stat(os.path.join(directory, name)).st_mtime_ns for name in os.listdir(directory)}
+
+@pytest.mark.parametrize("manifest", [None, "manifest.json"])
+def test_reenhance_writes_into_the_given_menus_dir(tmp_path, manifest):
+    menus_dir = tmp_path / "menus"
+    menus_dir.mkdir()
+    shutil.copy(os.path.join(MENUS_DIR, "cafe.json"), menus_dir)
+    rules = tmp_path / "rules.json"
+    rules.write_text(json.dumps({"round": "x9", "rules": [{"menu": "cafe", "percent": 5}]}))
+    before = snapshot(MENUS_DIR)
+
+    result = subprocess.run([sys.executable, os.path.join(SCRIPTS_DIR, "reprice-menus.py"), str(rules),
+                             "--menus-dir", str(menus_dir), "--no-store",
+                             *(["--manifest", str(tmp_path / manifest)] if manifest else [])],
+                            capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert (menus_dir / "cafe-enhanced.json").exists()
+    assert (tmp_path / manifest if manifest else menus_dir / ".enhance-manifest.json").exists()
+    assert snapshot(MENUS_DIR) == before